@@ -0,0 +1,10 @@
+# Package:  benchmarks
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""spyda benchmarks
+
+Each module is runnable from the source tree, e.g.::
+
+    $ python -m benchmarks.crawl_seen
+"""
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Module:   crawl_seen
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: per-link cost of the crawler's seen/visited bookkeeping
+
+Crawls a synthetic in-memory site (no network) of increasing size and
+reports the average time spent per extracted link. With hashed
+membership tests the per-link cost should stay flat as the crawl grows.
+
+Usage: python -m benchmarks.crawl_seen [pages ...]
+"""
+
+import sys
+from time import time
+from random import Random
+
+import spyda.crawler
+
+
+HOST = "http://bench.local"
+FANOUT = 20
+
+
+class Response(dict):
+
+    status = 200
+    reason = "OK"
+
+
+def site(pages, seed=0):
+    random = Random(seed)
+    nav = ["/page/{0:d}".format(i) for i in range(5)]
+    return dict(
+        ("{0:s}/page/{1:d}".format(HOST, i), nav + ["/page/{0:d}".format(random.randrange(pages)) for _ in range(FANOUT)])
+        for i in range(pages)
+    )
+
+
+def run(pages):
+    links = site(pages)
+    response = Response({"content-type": "text/html"})
+    count = [0]
+
+    def fetch_url(url, content_types=None, **kwargs):
+        return response, url
+
+    def get_links(url, backend=None):
+        count[0] += len(links.get(url, ()))
+        return iter(links.get(url, ()))
+
+    def head_content_type(url):
+        return "text/html"
+
+    spyda.crawler.fetch_url = fetch_url
+    spyda.crawler.get_links = get_links
+    spyda.crawler.head_content_type = head_content_type
+    spyda.crawler.status = lambda *args: None
+
+    stime = time()
+    spyda.crawler.crawl("{0:s}/page/0".format(HOST), max_pages=pages)
+    duration = time() - stime
+
+    return count[0], duration
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 2000, 4000, 8000, 16000]
+
+    print("{0:>8s} {1:>10s} {2:>10s} {3:>12s}".format("pages", "links", "seconds", "us/link"))
+    for pages in sizes:
+        links, duration = run(pages)
+        print("{0:8d} {1:10d} {2:10.2f} {3:12.2f}".format(pages, links, duration, duration / links * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# Module:   links
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: link extraction backends
+
+Extracts the links of every page under ``tests/docroot`` with each
+backend of :mod:`spyda.links` and reports the average time per page.
+Each page is optionally repeated to simulate larger pages.
+
+Usage: python -m benchmarks.links [repeat ...]
+"""
+
+import sys
+from os import path, walk
+from time import time
+
+from spyda.links import BACKENDS, get_links
+
+
+DOCROOT = path.join(path.dirname(path.dirname(path.abspath(__file__))), "tests", "docroot")
+
+ROUNDS = 200
+
+
+def pages(repeat):
+    for root, dirs, files in walk(DOCROOT):
+        for name in files:
+            if name.endswith(".html"):
+                with open(path.join(root, name), "rb") as f:
+                    html = f.read()
+                head, sep, body = html.partition("<body>")
+                yield head + sep + body.replace("</body>", "") * repeat if sep else html * repeat
+
+
+def main():
+    repeats = [int(x) for x in sys.argv[1:]] or [1, 10, 100]
+    backends = sorted(BACKENDS)
+
+    print("{0:>8s} {1:>8s} {2:s}".format("repeat", "links", " ".join("{0:>12s}".format(b + " us") for b in backends)))
+    for repeat in repeats:
+        html = list(pages(repeat))
+        rounds = max(ROUNDS // repeat, 1)
+
+        timings = []
+        for backend in backends:
+            stime = time()
+            for i in range(rounds):
+                links = sum(len(list(get_links(page, backend=backend))) for page in html)
+            timings.append((time() - stime) / rounds / len(html) * 1e6)
+
+        print("{0:8d} {1:8d} {2:s}".format(repeat, links, " ".join("{0:12.1f}".format(t) for t in timings)))
+
+
+if __name__ == "__main__":
+    main()
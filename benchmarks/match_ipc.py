@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# Module:   match_ipc
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: data sets sent to the match tool's worker processes
+
+Measures the bytes pickled to send 1000 source files to a pool of 4
+workers as :func:`spyda.matcher.main` used to (the data sets bound to
+every chunk of tasks with :func:`functools.partial`) and as it does now
+(the data sets given once to each worker by
+:func:`~spyda.matcher.init_worker`), for data sets of synthetic names,
+and the time a pool takes to map the sources to a no-op either way.
+
+Usage: python -m benchmarks.match_ipc [names ...]
+"""
+
+import sys
+from time import time
+from functools import partial
+from optparse import Values
+from multiprocessing.pool import mapstar, Pool
+from cPickle import dumps, HIGHEST_PROTOCOL
+
+from spyda.index import NGramIndex
+from spyda.matcher import init_worker, job
+
+from .matches import names
+
+
+PROCESSES = 4
+SOURCES = ["/data/extracted/{0:08d}.json".format(i) for i in range(1000)]
+
+
+def noop(*args):
+    pass
+
+
+def task_bytes(func, sources):
+    """Return the no. of bytes pickled by Pool.map to send the tasks"""
+
+    chunksize, extra = divmod(len(sources), PROCESSES * 4)
+    chunksize += bool(extra)
+
+    chunks = [tuple(sources[i:i + chunksize]) for i in range(0, len(sources), chunksize)]
+    return sum(len(dumps((0, i, mapstar, ((func, chunk),), {}), HIGHEST_PROTOCOL)) for i, chunk in enumerate(chunks))
+
+
+def run(datasets, shared):
+    stime = time()
+    if shared:
+        pool = Pool(PROCESSES, init_worker, (datasets,))
+        pool.map(noop, SOURCES)
+    else:
+        pool = Pool(PROCESSES)
+        pool.map(partial(noop, datasets), SOURCES)
+    pool.close()
+    pool.join()
+    return time() - stime
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+
+    opts = Values({"cutoff": 0.85, "source_key": "entities", "output_key": "entities", "verbose": False})
+
+    print("{0:>8s} {1:>14s} {2:>14s} {3:>12s} {4:>12s}".format(
+        "names", "per task KB", "shared KB", "per task ms", "shared ms"
+    ))
+    for size in sizes:
+        dataset = dict((name, "http://example.com/{0:d}".format(i)) for i, name in enumerate(names(size)))
+        datasets = [("names:0", dataset, NGramIndex(dataset))]
+
+        before = task_bytes(partial(job, opts, datasets), SOURCES)
+        after = task_bytes(partial(job, opts), SOURCES)
+
+        print("{0:8d} {1:14.1f} {2:14.1f} {3:12.1f} {4:12.1f}".format(
+            size, before / 1024.0, after / 1024.0, run(datasets, False) * 1e3, run(datasets, True) * 1e3
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Module:   matches
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: close matches of entities in a list of names
+
+Generates synthetic "first last" names and queries made of names with a
+few typos and of unknown names, then finds their close matches by
+scoring every name (as :func:`spyda.utils.get_close_matches` does given
+a list) and only the candidates of an :class:`spyda.index.NGramIndex`.
+Checks both find the same matches and reports the time to build the
+index, the average time per query and the average no. of candidates.
+
+Usage: python -m benchmarks.matches [names ...]
+"""
+
+import sys
+from time import time
+from random import Random
+
+from spyda.index import NGramIndex
+from spyda.utils import get_close_matches
+
+
+CUTOFF = 0.85  # The default cutoff of the match tool
+QUERIES = 50
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+SYLLABLES = (
+    "an", "ber", "bra", "ca", "chi", "da", "del", "do", "el", "fer", "gan", "ha", "is", "jo", "ka", "ker",
+    "la", "li", "lo", "ma", "mi", "mon", "na", "nor", "o", "pe", "ra", "ri", "ro", "sa", "son", "ste",
+    "ta", "ten", "to", "u", "va", "vi", "wa", "win", "ya", "zi"
+)
+
+
+def name(random):
+    def word():
+        return "".join(random.choice(SYLLABLES) for i in range(random.randint(2, 4))).capitalize()
+    return "{0:s} {1:s}".format(word(), word())
+
+
+def typo(random, s):
+    s = list(s)
+    for i in range(random.randint(1, 2)):
+        s[random.randrange(len(s))] = random.choice(LETTERS)
+    return "".join(s)
+
+
+def names(n, seed=0):
+    random = Random(seed)
+    return [name(random) for i in range(n)]
+
+
+def queries(possibilities, n=QUERIES, seed=1):
+    random = Random(seed)
+    return [
+        typo(random, random.choice(possibilities)) if i % 2 else name(random)
+        for i in range(n)
+    ]
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print("{0:>8s} {1:>10s} {2:>10s} {3:>10s} {4:>10s} {5:>8s}".format(
+        "names", "build ms", "scan ms", "index ms", "candidates", "speedup"
+    ))
+    for size in sizes:
+        possibilities = names(size)
+        words = queries(possibilities)
+
+        stime = time()
+        index = NGramIndex(possibilities)
+        build = time() - stime
+
+        stime = time()
+        expected = [get_close_matches(word, possibilities, cutoff=CUTOFF) for word in words]
+        scan = (time() - stime) / len(words)
+
+        stime = time()
+        matches = [get_close_matches(word, index, cutoff=CUTOFF) for word in words]
+        indexed = (time() - stime) / len(words)
+
+        assert matches == expected
+
+        candidates = sum(len(index.candidates(word, CUTOFF)) for word in words) // len(words)
+
+        print("{0:8d} {1:10.1f} {2:10.2f} {3:10.2f} {4:10d} {5:7.1f}x".format(
+            size, build * 1e3, scan * 1e3, indexed * 1e3, candidates, scan / indexed
+        ))
+
+
+if __name__ == "__main__":
+    main()
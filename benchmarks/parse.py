@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# Module:   parse
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: HTML parsing for extraction
+
+Parses every page under ``tests/docroot`` the way the extractor used to
+(decoding the body to unicode and parsing it with BeautifulSoup via
+``lxml.html.soupparser``) and with :func:`spyda.utils.parse_html` (the
+raw bytes and their charset given to libxml2's native parser) and
+reports the average time per page. Each page is optionally repeated to
+simulate larger pages.
+
+Usage: python -m benchmarks.parse [repeat ...]
+"""
+
+import sys
+from os import path, walk
+from time import time
+
+from spyda.utils import html_to_doc, parse_html
+
+from .links import DOCROOT
+
+
+ROUNDS = 200
+
+CHARSET = "utf-8"
+
+
+def pages(repeat):
+    for root, dirs, files in walk(DOCROOT):
+        for name in files:
+            if name.endswith(".html"):
+                with open(path.join(root, name), "rb") as f:
+                    html = f.read()
+                head, sep, body = html.partition("<body>")
+                body = body.replace("</body>", "").replace("</html>", "")
+                yield head + sep + body * repeat + "</body></html>"
+
+
+def soup(html):
+    return html_to_doc(html.decode(CHARSET))
+
+
+def native(html):
+    return parse_html(html, CHARSET)
+
+
+def main():
+    repeats = [int(x) for x in sys.argv[1:]] or [1, 10, 100]
+    parsers = (("soup", soup), ("native", native))
+
+    print("{0:>8s} {1:>8s} {2:s} {3:>8s}".format(
+        "repeat", "bytes", " ".join("{0:>12s}".format(name + " us") for name, parse in parsers), "speedup"
+    ))
+    for repeat in repeats:
+        html = list(pages(repeat))
+        rounds = max(ROUNDS // repeat, 1)
+
+        timings = []
+        for name, parse in parsers:
+            stime = time()
+            for i in range(rounds):
+                for page in html:
+                    parse(page)
+            timings.append((time() - stime) / rounds / len(html) * 1e6)
+
+        print("{0:8d} {1:8d} {2:s} {3:7.1f}x".format(
+            repeat, sum(len(page) for page in html) // len(html),
+            " ".join("{0:12.1f}".format(t) for t in timings), timings[0] / timings[1]
+        ))
+
+
+if __name__ == "__main__":
+    main()
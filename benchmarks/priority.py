@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# Module:   priority
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: pages fetched to find matching urls, breadth vs best first
+
+Crawls a synthetic in-memory site (no network) of ``SECTIONS`` sections
+of ``PAGES`` pages each where only the pages of one section link to the
+documents matching the pattern, and reports how many pages were fetched
+before the first N documents were found in breadth-first and in
+best-first (``priority``) order.
+
+Usage: python -m benchmarks.priority [found ...]
+"""
+
+import sys
+from random import Random
+
+import spyda.crawler
+
+
+HOST = "http://bench.local"
+SECTIONS = 50
+PAGES = 40
+TARGET = SECTIONS - 1
+
+PATTERN = r"^http://bench\.local/section/{0:d}/files/.*\.pdf$".format(TARGET)
+
+
+class Response(dict):
+
+    status = 200
+    reason = "OK"
+
+
+def site(seed=0):
+    random = Random(seed)
+    sections = ["/section/{0:d}/".format(i) for i in range(SECTIONS)]
+
+    links = {HOST + "/": sections}
+    for i in range(SECTIONS):
+        pages = ["/section/{0:d}/page/{1:d}".format(i, j) for j in range(PAGES)]
+        links["{0:s}/section/{1:d}/".format(HOST, i)] = sections + pages
+        for page in pages:
+            hrefs = sections + random.sample(pages, 5)
+            if i == TARGET:
+                hrefs.append("/section/{0:d}/files/{1:d}.pdf".format(i, random.randrange(1 << 20)))
+            links[HOST + page] = hrefs
+
+    return links
+
+
+def run(found, priority):
+    links = site()
+    response = Response({"content-type": "text/html"})
+    fetched = [0]
+
+    def fetch_url(url, content_types=None, **kwargs):
+        fetched[0] += 1
+        return response, url
+
+    def get_links(url, backend=None):
+        return iter(links.get(url, ()))
+
+    def head_content_type(url):
+        return "application/pdf" if url.endswith(".pdf") else "text/html"
+
+    spyda.crawler.fetch_url = fetch_url
+    spyda.crawler.get_links = get_links
+    spyda.crawler.head_content_type = head_content_type
+    spyda.crawler.status = lambda *args: None
+
+    n = 0
+    for kind, value in spyda.crawler.crawl_iter(HOST + "/", patterns=[PATTERN], priority=priority):
+        n += 1
+        if n >= found:
+            break
+
+    return fetched[0]
+
+
+def main():
+    counts = [int(x) for x in sys.argv[1:]] or [1, 10, 20]
+
+    print("{0:>8s} {1:>10s} {2:>10s}".format("found", "breadth", "best"))
+    for found in counts:
+        print("{0:8d} {1:10d} {2:10d}".format(found, run(found, False), run(found, True)))
+
+
+if __name__ == "__main__":
+    main()
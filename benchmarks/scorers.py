@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Module:   scorers
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: accuracy and speed of the match tool's scorers
+
+Generates synthetic "first last" names and documents of entities, half
+of them names with a few typos (whose match is the name) and half
+unknown names (which should not match), then matches them with
+``SequenceMatcher.ratio()`` (:func:`spyda.utils.get_close_matches` with
+an :class:`spyda.index.NGramIndex`) and by cosine similarity
+(:func:`spyda.vectors.get_vector_matches`) at several cutoffs. Reports
+the percentage of entities given the right match (or none), of the
+misspelled names found and of the unknown names rejected and the
+average time per document.
+
+Usage: python -m benchmarks.scorers [names ...]
+"""
+
+import sys
+from time import time
+from random import Random
+
+from spyda.index import NGramIndex
+from spyda.utils import get_close_matches
+from spyda.vectors import get_vector_matches, VectorIndex
+
+from .matches import name, names, typo
+
+
+DOCUMENTS = 20
+ENTITIES = 50  # No. of entities per document
+
+SCORERS = (("ratio", 0.85), ("ratio", 0.7), ("vector", 0.7), ("vector", 0.6), ("vector", 0.5), ("vector", 0.4))
+
+
+def documents(possibilities, seed=2):
+    random = Random(seed)
+    known = set(possibilities)
+
+    for i in range(DOCUMENTS):
+        document = []
+        for j in range(ENTITIES):
+            if j % 2:
+                expected = random.choice(possibilities)
+                document.append((typo(random, expected), expected))
+            else:
+                entity = name(random)
+                document.append((entity, entity if entity in known else None))
+        yield document
+
+
+def ratio(index, entities, cutoff):
+    return [get_close_matches(entity, index, n=1, cutoff=cutoff) for entity in entities]
+
+
+def vector(index, entities, cutoff):
+    return get_vector_matches(entities, index, n=1, cutoff=cutoff)
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print("{0:>8s} {1:>8s} {2:>8s} {3:>10s} {4:>10s} {5:>10s} {6:>10s}".format(
+        "names", "scorer", "cutoff", "accuracy %", "found %", "rejected %", "doc ms"
+    ))
+    for size in sizes:
+        possibilities = names(size)
+        docs = list(documents(possibilities))
+        indexes = {"ratio": NGramIndex(possibilities), "vector": VectorIndex(possibilities)}
+        scorers = {"ratio": ratio, "vector": vector}
+
+        for scorer, cutoff in SCORERS:
+            right = found = rejected = 0
+
+            stime = time()
+            for document in docs:
+                entities = [entity for entity, expected in document]
+                for (entity, expected), matches in zip(document, scorers[scorer](indexes[scorer], entities, cutoff)):
+                    match = matches[0][0] if matches else None
+                    right += match == expected
+                    found += expected is not None and match == expected
+                    rejected += expected is None and match is None
+            duration = (time() - stime) / len(docs)
+
+            total = len(docs) * ENTITIES
+            misspelled = sum(expected is not None for document in docs for entity, expected in document)
+
+            print("{0:8d} {1:>8s} {2:8.2f} {3:10.1f} {4:10.1f} {5:10.1f} {6:10.1f}".format(
+                size, scorer, cutoff, 100.0 * right / total, 100.0 * found / misspelled,
+                100.0 * rejected / (total - misspelled), duration * 1e3
+            ))
+
+
+if __name__ == "__main__":
+    main()
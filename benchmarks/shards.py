@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Module:   shards
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: sharded crawling across worker processes
+
+Crawls a synthetic in-memory site spread over many hosts (no network)
+with an increasing no. of workers and reports the pages crawled per
+second. Pages are real HTML parsed by the default link extraction
+backend, so with enough cores the rate should grow with the workers.
+
+Usage: python -m benchmarks.shards [workers ...]
+"""
+
+import sys
+from time import time
+from random import Random
+
+import spyda.crawler
+
+
+HOSTS = 16
+PAGES = 200  # Per host
+FANOUT = 50
+
+
+class Response(dict):
+
+    status = 200
+    reason = "OK"
+
+
+def page(url, random):
+    links = (
+        "http://host{0:d}.local/page/{1:d}".format(random.randrange(HOSTS), random.randrange(PAGES))
+        for _ in range(FANOUT)
+    )
+    return "<html><body>{0:s}</body></html>".format(
+        "".join("<p>Lorem ipsum <a href=\"{0:s}\">dolor</a> sit amet</p>".format(link) for link in links)
+    )
+
+
+def run(workers):
+    response = Response({"content-type": "text/html"})
+
+    def fetch_url(url, content_types=None, **kwargs):
+        return response, page(url, Random(url))
+
+    def head_content_type(url):
+        return "text/html"
+
+    spyda.crawler.fetch_url = fetch_url
+    spyda.crawler.head_content_type = head_content_type
+    spyda.crawler.status = lambda *args: None
+
+    stime = time()
+    result = spyda.crawler.crawl("http://host0.local/page/0", workers=workers)
+    duration = time() - stime
+
+    return len(result["urls"]), duration
+
+
+def main():
+    workers = [int(x) for x in sys.argv[1:]] or [1, 2, 4]
+
+    print("{0:>8s} {1:>8s} {2:>10s} {3:>10s}".format("workers", "urls", "seconds", "urls/s"))
+    for n in workers:
+        urls, duration = run(n)
+        print("{0:8d} {1:8d} {2:10.2f} {3:10.0f}".format(n, urls, duration, urls / duration))
+
+
+if __name__ == "__main__":
+    main()
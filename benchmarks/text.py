@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# Module:   text
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: text extraction of a document
+
+Extracts the text of every page under ``tests/docroot`` as
+:func:`spyda.utils.doc_to_text` used to (serializing the document,
+unescaping entities, stripping markup with nltk's ``clean_html`` regexes
+and replacing unicode characters one at a time) and with the single
+pass :func:`~spyda.utils.doc_to_text` (the markup stripped by an XSLT
+stylesheet), checks they are the same and
+reports the average time per page. Each page is optionally repeated to
+simulate larger pages.
+
+Usage: python -m benchmarks.text [repeat ...]
+"""
+
+import re
+import sys
+from time import time
+
+from lxml.html import tostring
+
+from spyda.utils import doc_to_text, parse_html, unescape, UNICHAR_REPLACEMENTS
+
+from .parse import pages, CHARSET
+
+
+ROUNDS = 200
+
+
+def clean_html(html):
+    """nltk 2.0.4's ``clean_html``"""
+
+    cleaned = re.sub(r"(?is)<(script|style).*?>.*?(</\1>)", "", html.strip())
+    cleaned = re.sub(r"(?s)<!--(.*?)-->[\n]?", "", cleaned)
+    cleaned = re.sub(r"(?s)<.*?>", " ", cleaned)
+    cleaned = re.sub(r"&nbsp;", " ", cleaned)
+    cleaned = re.sub(r"  ", " ", cleaned)
+    cleaned = re.sub(r"  ", " ", cleaned)
+    return cleaned.strip()
+
+
+def chain(doc):
+    text = clean_html(unescape(tostring(doc)))
+    for replacement in UNICHAR_REPLACEMENTS:
+        text = text.replace(*replacement)
+    return text
+
+
+def main():
+    repeats = [int(x) for x in sys.argv[1:]] or [1, 10, 100, 1000]
+    extractors = (("chain", chain), ("single", doc_to_text))
+
+    print("{0:>8s} {1:>8s} {2:s} {3:>8s}".format(
+        "repeat", "chars", " ".join("{0:>12s}".format(name + " us") for name, extract in extractors), "speedup"
+    ))
+    for repeat in repeats:
+        docs = [parse_html(page, CHARSET) for page in pages(repeat)]
+        rounds = max(ROUNDS // repeat, 1)
+
+        texts = [doc_to_text(doc) for doc in docs]
+        assert texts == [chain(doc) for doc in docs]
+
+        timings = []
+        for name, extract in extractors:
+            stime = time()
+            for i in range(rounds):
+                for doc in docs:
+                    extract(doc)
+            timings.append((time() - stime) / rounds / len(docs) * 1e6)
+
+        print("{0:8d} {1:8d} {2:s} {3:7.1f}x".format(
+            repeat, sum(len(text) for text in texts) // len(texts),
+            " ".join("{0:12.1f}".format(t) for t in timings), timings[0] / timings[1]
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Module:   url_rules
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Benchmark: matching urls against patterns, blacklist and whitelist
+
+Compares the compiled single-pass :class:`spyda.rules.Rules` against
+the previous approach of trying every regex of each list in turn, for
+rule lists of increasing size over a fixed set of urls.
+
+Usage: python -m benchmarks.url_rules [rules ...]
+"""
+
+import re
+import sys
+from time import time
+from random import Random
+
+from spyda.rules import Rules
+
+
+URLS = 20000
+
+
+def make_rules(n, random):
+    patterns = [r"http://site{0:d}\.example\.com/.*\.html$".format(i) for i in range(n)]
+    blacklist = [r"http://site{0:d}\.example\.com/private/".format(i) for i in range(n)]
+    whitelist = [r"http://site{0:d}\.example\.com/private/public-{1:d}".format(i, i) for i in range(n)]
+    return patterns, blacklist, whitelist
+
+
+def make_urls(n, random):
+    paths = ["/index.html", "/private/secret.html", "/private/public-{0:d}.html", "/images/logo.png"]
+    return [
+        "http://site{0:d}.{1:s}.com{2:s}".format(
+            i, random.choice(("example", "example", "other")), random.choice(paths).format(i)
+        )
+        for i in (random.randrange(n * 2) for _ in range(URLS))
+    ]
+
+
+def loops(patterns, blacklist, whitelist):
+    patterns = [re.compile(regex) for regex in patterns]
+    blacklist = [re.compile(regex) for regex in blacklist]
+    whitelist = [re.compile(regex) for regex in whitelist]
+
+    def match(url):
+        return (
+            not patterns or any(regex.match(url) is not None for regex in patterns),
+            any(regex.match(url) is not None for regex in blacklist),
+            any(regex.match(url) is not None for regex in whitelist),
+        )
+
+    return match
+
+
+def timeit(match, urls):
+    stime = time()
+    results = [match(url) for url in urls]
+    return results, time() - stime
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [10, 100, 1000]
+    random = Random(0)
+
+    print("{0:>8s} {1:>12s} {2:>12s} {3:>10s}".format("rules", "loops us", "rules us", "speedup"))
+    for n in sizes:
+        lists = make_rules(n, random)
+        urls = make_urls(n, random)
+
+        expected, before = timeit(loops(*lists), urls)
+        results, after = timeit(Rules(*lists).match, urls)
+
+        assert results == expected
+
+        print("{0:8d} {1:12.2f} {2:12.2f} {3:9.1f}x".format(
+            n, before / len(urls) * 1e6, after / len(urls) * 1e6, before / after
+        ))
+
+
+if __name__ == "__main__":
+    main()
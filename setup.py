@@ -64,12 +64,13 @@ setup(
     install_requires=[
         "url==0.1.0",
         "lxml==3.2.1",
-        "nltk==2.0.4",
         "cssselect==0.8",
         "requests==2.2.1",
-        "restclient==0.11.0",
         "BeautifulSoup==3.2.1",
     ],
+    extras_require={
+        "vector": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "crawl=spyda.crawler:main",
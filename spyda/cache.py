@@ -0,0 +1,323 @@
+# Module:   cache
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""HTTP Cache
+
+An optional on-disk cache of response bodies shared by the crawler,
+extractor and matcher. Responses carrying an ``ETag`` or
+``Last-Modified`` header are stored and revalidated on the next fetch of
+the same url with ``If-None-Match`` / ``If-Modified-Since``, so a
+``304 Not Modified`` is served from the cache instead of downloading
+the body again.
+
+Bodies are stored as files under the cache directory with an SQLite
+index of their urls, validators, headers and sizes. When the cache
+grows beyond its size limit the least recently used entries are
+evicted. The cache may be shared by several processes.
+"""
+
+
+import sqlite3
+from json import dumps, loads
+from hashlib import sha1
+from uuid import uuid4 as uuid
+from threading import Lock
+from optparse import OptionGroup
+from os import getpid, makedirs, path, remove, rename
+
+
+DATABASE = "index.db"
+
+SIZE = 1 << 30  # Maximum size of the cache in bytes
+
+
+CACHE_OPTIONS = ("cache_dir", "cache_size")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    status INTEGER,
+    reason TEXT,
+    headers TEXT,
+    size INTEGER,
+    used INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('size', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('clock', 0);
+"""
+
+
+_lock = Lock()
+_cache = None
+_options = {
+    "cache_dir": None,
+    "cache_size": SIZE,
+}
+
+_stats_lock = Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def get_key(url):
+    return sha1(url.encode("utf-8") if isinstance(url, unicode) else url).hexdigest()
+
+
+class Entry(object):
+    """A cached response with the attributes of a requests Response"""
+
+    def __init__(self, filename, url, status_code, reason, headers):
+        self.filename = filename
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+
+    @property
+    def content(self):
+        with open(self.filename, "rb") as f:
+            return f.read()
+
+    def validators(self):
+        """Return the request headers to revalidate this entry with"""
+
+        headers = {}
+
+        for name, header in (("etag", "If-None-Match"), ("last-modified", "If-Modified-Since")):
+            for key, value in self.headers.items():
+                if key.lower() == name:
+                    headers[header] = value
+
+        return headers
+
+
+class HTTPCache(object):
+    """Size bounded cache of HTTP responses stored in ``directory``.
+
+    :param directory: Directory to store the cache in.
+    :type  directory: str
+
+    :param size:      Maximum total size of the cached bodies in bytes.
+    :type  size:      int
+    """
+
+    def __init__(self, directory, size=SIZE):
+        self.directory = directory
+        self.size = size
+
+        if not path.isdir(directory):
+            makedirs(directory)
+
+        self.lock = Lock()
+
+        self.db = sqlite3.connect(path.join(directory, DATABASE), timeout=60, check_same_thread=False)
+        self.db.text_factory = str
+        with self.db:
+            self.db.executescript(SCHEMA)
+
+    def _filename(self, key):
+        return path.join(self.directory, key[:2], key)
+
+    def _tick(self):
+        self.db.execute("UPDATE meta SET value = value + 1 WHERE key = 'clock'")
+        return self.db.execute("SELECT value FROM meta WHERE key = 'clock'").fetchone()[0]
+
+    def _evict(self):
+        total = self.db.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()[0]
+
+        rows = self.db.execute("SELECT key, size FROM entries ORDER BY used")
+        evicted = []
+        for key, size in rows:
+            if total <= self.size:
+                break
+            evicted.append(key)
+            total -= size
+        rows.close()
+
+        for key in evicted:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            try:
+                remove(self._filename(key))
+            except OSError:  # pragma: no cover
+                pass
+
+        self.db.execute("UPDATE meta SET value = ? WHERE key = 'size'", (total,))
+
+        count("evictions", len(evicted))
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def total(self):
+        """Total size of the cached bodies in bytes"""
+
+        with self.lock:
+            return self.db.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()[0]
+
+    def get(self, url):
+        """Return the cached :class:`Entry` of ``url`` or ``None``"""
+
+        key = get_key(url)
+
+        with self.lock:
+            with self.db:
+                row = self.db.execute("SELECT status, reason, headers FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self.db.execute("UPDATE entries SET used = ? WHERE key = ?", (self._tick(), key))
+
+        status, reason, headers = row
+
+        return Entry(self._filename(key), url, status, reason, loads(headers))
+
+    def put(self, url, response, content):
+        """Store a response and its body if it can be revalidated.
+
+        :param response: A requests Response (or :class:`Entry`).
+        :param content:  The body of the response as bytes.
+
+        :returns: ``True`` if the response was stored.
+        :rtype:   bool
+        """
+
+        headers = dict(response.headers.items())
+        names = set(name.lower() for name in headers)
+
+        if response.status_code != 200 or not names & set(("etag", "last-modified")) or len(content) > self.size:
+            return False
+
+        key = get_key(url)
+        filename = self._filename(key)
+
+        if not path.isdir(path.dirname(filename)):
+            try:
+                makedirs(path.dirname(filename))
+            except OSError:  # pragma: no cover
+                pass
+
+        tmpname = "{0:s}.{1:s}.tmp".format(filename, uuid().hex)
+        with open(tmpname, "wb") as f:
+            f.write(content)
+
+        with self.lock:
+            with self.db:
+                row = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                delta = len(content) - (row[0] if row is not None else 0)
+
+                rename(tmpname, filename)
+
+                self.db.execute(
+                    "INSERT OR REPLACE INTO entries (key, url, status, reason, headers, size, used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, response.status_code, response.reason, dumps(headers), len(content), self._tick())
+                )
+                self.db.execute("UPDATE meta SET value = value + ? WHERE key = 'size'", (delta,))
+
+                self._evict()
+
+        count("stores")
+
+        return True
+
+    def close(self):
+        self.db.close()
+
+
+def configure(**options):
+    """Configure the shared cache.
+
+    :param cache_dir:  Directory to store the cache in or ``None`` to
+                       disable caching.
+    :type  cache_dir:  str or None
+
+    :param cache_size: Maximum size of the cache in bytes.
+    :type  cache_size: int
+    """
+
+    global _cache
+
+    with _lock:
+        _options.update(options)
+        if _cache is not None:
+            _cache[1].close()
+            _cache = None
+
+
+def get_cache():
+    """Return the shared cache or ``None`` if caching is disabled.
+
+    Each process opens its own connection to the cache.
+    """
+
+    global _cache
+
+    with _lock:
+        if _options["cache_dir"] is None:
+            return None
+
+        if _cache is None or _cache[0] != getpid():
+            _cache = getpid(), HTTPCache(_options["cache_dir"], _options["cache_size"])
+
+        return _cache[1]
+
+
+def get_stats():
+    """Return statistics of the shared cache.
+
+    :returns: A dict of the no. of responses served from the cache
+              (``hits``), fetched in full (``misses``), ``stores`` and
+              ``evictions``.
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        return _stats.copy()
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def store_megabytes(option, opt, value, parser):
+    setattr(parser.values, option.dest, value << 20)
+
+
+def cache_options(parser):
+    group = OptionGroup(
+        parser,
+        "Cache Options",
+        "These options control the on-disk HTTP cache used to "
+        "revalidate previously fetched pages with conditional requests."
+    )
+
+    group.add_option(
+        "", "--cache-dir",
+        action="store", type="string", metavar="PATH", default=None, dest="cache_dir",
+        help="Cache responses in PATH"
+    )
+
+    group.add_option(
+        "", "--cache-size",
+        action="callback", callback=store_megabytes, type="int", metavar="MB", default=SIZE, dest="cache_size",
+        help="Maximum size of the cache in MB (Default: {0:d})".format(SIZE >> 20)
+    )
+
+    parser.add_option_group(group)
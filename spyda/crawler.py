@@ -10,17 +10,30 @@
 import sys
 from warnings import warn
 from time import clock, time
-from collections import deque
+from time import sleep
+from Queue import Empty, Queue
+from mimetypes import guess_type
 from optparse import OptionParser
-from re import compile as compile_regex
+from itertools import izip, repeat
+from multiprocessing.pool import ThreadPool
 
 
-from requests import head
 from url import parse as parse_url
 
 
-from . import __version__
-from .utils import error, fetch_url, get_links, log, status
+from . import __version__, metrics
+from .rules import Rules, Scorer
+from .shards import crawl_shards
+from .normalize import get_stats as get_url_stats, Normalizer, SIZE as URL_CACHE
+from .links import BACKENDS as LINK_BACKENDS, DEFAULT_BACKEND as LINK_BACKEND, LinkParser
+from .state import State
+from .frontier import Frontier
+from .dedup import Duplicates, Fingerprint, get_stats as get_dedup_stats, MODES as DEDUP_MODES, NEAR
+from .sessions import configure, get_session, get_stats, session_options, SESSION_OPTIONS
+from .cache import cache_options, configure as configure_cache, get_stats as get_cache_stats, store_megabytes, CACHE_OPTIONS
+from .metrics import metrics_options, METRICS_OPTIONS
+from .warc import configure as configure_warc, get_stats as get_warc_stats, warc_options, WARC_OPTIONS
+from .utils import error, fetch_url, get_links, get_mimetype, log, status, LRUCache
 
 
 USAGE = "%prog [options] <url>"
@@ -29,15 +42,100 @@ VERSION = "%prog v" + __version__
 
 CONTENT_TYPES = ["text/html", "text/xml"]
 
+DYNAMIC_EXTENSIONS = (".asp", ".aspx", ".cgi", ".jsp", ".php", ".pl", ".py")
+
+CHECKPOINT = 100
+
+MAX_SIZE = 1 << 25  # Maximum size of a page in bytes
+
+TIMEOUT = 1 << 31
+
 HEADERS = {
     "User-Agent": "{0} v{1}".format(__name__, __version__)
 }
 
 
-def crawl(root_url, allowed_urls=None, blacklist=None,
-          content_types=CONTENT_TYPES, max_depth=0,
-          patterns=None, verbose=False, whitelist=None):
-    """Crawl a given url recursively for urls.
+def predict_content_type(url):
+    """Predict the content type of a url from its file extension.
+
+    Returns ``None`` if the extension is unknown or is commonly used
+    for dynamically generated content.
+    """
+
+    path = parse_url(url)._path.lower()
+    if path.endswith(DYNAMIC_EXTENSIONS):
+        return None
+
+    return guess_type(path)[0]
+
+
+def head_content_type(url):
+    """Return the Content-Type of the given url with a HEAD request."""
+
+    try:
+        response = get_session().head(url, headers=HEADERS)
+        response.raise_for_status()
+        return response.headers.get("Content-Type", None)
+    except:
+        return None
+
+
+def fetch_links(url, content_types=None, link_parser=LINK_BACKEND, max_size=0, dedup=None):
+    """Fetch the given url and extract its links.
+
+    :param url:           A parsed URL to fetch.
+
+    :param content_types: If given the body is only downloaded if the
+                          response's Content-Type is one of these.
+    :type  content_types: list or None
+
+    :param link_parser:   Name of the link extraction backend
+                          (see :mod:`spyda.links`). With ``lxml`` the
+                          page is parsed as it is downloaded.
+    :type  link_parser:   str
+
+    :param max_size:      Maximum size of the page in bytes,
+                          0 for unlimited.
+    :type  max_size:      int
+
+    :param dedup:         If given the :class:`~spyda.dedup.Fingerprint`
+                          of the page is set as the response's
+                          ``fingerprint``, with a simhash if ``"near"``.
+    :type  dedup:         str or None
+
+    :returns:             A 3-item tuple of (url, response, links).
+                          links is ``None`` if the body was not
+                          downloaded or the exception raised if
+                          fetching or parsing failed.
+    :rtype:               tuple
+    """
+
+    try:
+        parser = LinkParser() if link_parser == "lxml" else None
+        response, content = fetch_url(url.utf8(), content_types=content_types, max_size=max_size, parser=parser)
+        if content is None:
+            return url, response, None
+        if response.status != 200:
+            return url, response, []
+        if dedup is not None:
+            response.fingerprint = Fingerprint(content, near=dedup == NEAR)
+        start = time()
+        links = parser.close() if parser is not None else None
+        if links is None:
+            links = list(get_links(content, backend=link_parser))
+        metrics.enabled() and metrics.observe("parse", time() - start)
+        return url, response, links
+    except Exception as e:  # pragma: no cover
+        return url, None, e
+
+
+def crawl_iter(root_url, allowed_urls=None, blacklist=None, checkpoint=CHECKPOINT,
+               concurrency=1, content_types=CONTENT_TYPES, dedup=None, expand_duplicates=False,
+               host_burst=1, host_concurrency=0, host_rate=0, link_parser=LINK_BACKEND,
+               max_depth=0, max_pages=0, max_size=MAX_SIZE, patterns=None, predict_types=False,
+               priority=False, state_dir=None, url_cache=URL_CACHE, use_head=True,
+               verbose=False, whitelist=None, workers=1, shard=None):
+    """Crawl a given url recursively yielding urls and errors as found.
 
     :param root_url:      Root URL to start crawling from.
     :type  root_url:      str
@@ -51,30 +149,104 @@ def crawl(root_url, allowed_urls=None, blacklist=None,
                           to not traverse.
     :type  blacklist:     list or None
 
+    :param checkpoint:    No. of pages between checkpoints of the
+                          crawl state (see ``state_dir``).
+    :type  checkpoint:    int
+
+    :param concurrency:   Number of pages to fetch concurrently.
+    :type  concurrency:   int
+
     :param content_types: A list of allowable content types to follow.
     :type  content_types: list or CONTENT_TYPES
 
-    :param max_depth:     Maximum depth to follow, 0 for unlimited depth.
-    :param max_depth:     int
+    :param dedup:         Detect ``"exact"`` or ``"near"`` duplicate
+                          pages (see :mod:`spyda.dedup`) and do not
+                          follow their links. ``None`` to disable.
+                          With ``workers`` duplicates are only
+                          detected among the hosts of each worker.
+    :type  dedup:         str or None
+
+    :param expand_duplicates: If ``True`` still follow the links of
+                          duplicate pages.
+    :type  expand_duplicates: bool
+
+    :param host_burst:    No. of requests a host may receive at once
+                          before ``host_rate`` applies.
+    :type  host_burst:    int
+
+    :param host_concurrency: Maximum no. of requests in flight per
+                          host, 0 for unlimited.
+    :type  host_concurrency: int
+
+    :param host_rate:     Maximum requests per second per host,
+                          0 for unlimited.
+    :type  host_rate:     float
+
+    :param link_parser:   Name of the link extraction backend
+                          (see :mod:`spyda.links`).
+    :type  link_parser:   str
+
+    :param max_depth:     Maximum link depth to follow, 0 for unlimited
+                          depth. The root url is at depth 0 and links
+                          found at depth ``max_depth`` are not fetched.
+    :type  max_depth:     int
+
+    :param max_pages:     Maximum no. of pages to fetch, 0 for unlimited.
+    :type  max_pages:     int
+
+    :param max_size:      Maximum size of a page in bytes, 0 for
+                          unlimited. Larger pages are not downloaded
+                          in full and their links are not followed.
+    :type  max_size:      int
 
     :param patterns:      A list of regex patterns to match urls against.
                           If evaluates to ``False``, matches all urls.
     :type  patterns:      list or None or False
 
+    :param predict_types: If ``True`` predict content types from the
+                          file extension of urls where possible.
+    :type  predict_types: bool
+
+    :param priority:      If ``True`` crawl best-first, fetching the urls
+                          closest to ``patterns`` first
+                          (see :class:`~spyda.rules.Scorer`).
+    :type  priority:      bool
+
+    :param state_dir:     A directory to store the state of the crawl in.
+                          If the directory holds the state of an
+                          interrupted crawl it is resumed.
+    :type  state_dir:     str or None
+
+    :param url_cache:     No. of normalized urls (see
+                          :mod:`spyda.normalize`) and of content types
+                          of urls to cache.
+    :type  url_cache:     int
+
+    :param use_head:      If ``True`` content types are checked with a
+                          HEAD request before a url is followed.
+                          Otherwise they are checked on the response
+                          of the GET and the body is not downloaded if
+                          not allowed.
+    :type  use_head:      bool
+
     :param verbose:       If ``True`` will print verbose logging
     :param verbose:       bool
 
+    :param workers:       No. of processes to crawl with
+                          (see :mod:`spyda.shards`).
+    :type  workers:       int
+
+    :param shard:         Used by worker processes of a sharded crawl.
+
     :param whitelist:     A list of whitelisted urls (matched by regex)
                           to traverse.
     :type  whitelist:     list or None
 
-    :returns:             A dict in the form:
-                          {"error": set(...), "urls": set(...)}
-                          The errors set contains 2-item tuples
-                          of (status, url)
-                          The urls set contains 2-item tuples of
-                          (rel_url,abs_url)
-    :rtype:               dict
+    :returns:             A generator of 2-item tuples of either
+                          ("url", url) for each url found or
+                          ("error", (status, url)) for each url
+                          that could not be fetched.
+    :rtype:               generator
 
     In verbose mode the following single-character letters are used
     to denonate meaning for URLs being processed:
@@ -87,135 +259,330 @@ def crawl(root_url, allowed_urls=None, blacklist=None,
      - (V) URL already (V)isitied
      - (B) URL blacklisted
      - (W) URL whitelisted
+     - (D) URL beyond the maximum (D)epth
+     - (U) Page is a d(U)plicate of a page already fetched
 
     Also in verbose mode each followed URL is printed in the form:
     <status> <reason> <type> <length> <link> <url>
+
+    With a ``concurrency`` greater than 1 pages are fetched and parsed
+    by a pool of threads while links are processed as each page
+    completes, so the order of ``urls`` is no longer deterministic.
+
+    Urls are fetched round-robin across hosts subject to the per-host
+    limits (see :class:`~spyda.frontier.Frontier`), or lowest scoring
+    url first with ``priority``.
+
+    If metrics are enabled (see :mod:`spyda.metrics`) the time spent
+    in each phase of the crawl is recorded.
+
+    With a ``state_dir`` the frontier, seen and visited urls and the
+    results are kept on disk instead of in memory (see
+    :mod:`spyda.state`). Urls and errors are then only yielded once
+    they have been checkpointed and an interrupted crawl resumes from
+    its last checkpoint, so none is yielded twice across resumes.
     """
 
-    blacklist = [
-        compile_regex(regex)
-        for regex in blacklist] if blacklist else [
-    ]
+    if workers > 1:
+        options = dict(locals())
+        for key in ("root_url", "workers", "shard"):
+            del options[key]
 
-    patterns = [
-        compile_regex(regex)
-        for regex in patterns] if patterns else [
-    ]
+        for result in crawl_shards(root_url, workers, options):
+            yield result
+        return
 
     root_url = parse_url(root_url)
-    queue = deque([root_url])
-    visited = []
-    errors = []
-    urls = []
-    n = 0
-    l = 0
-
-    if whitelist:
-        whitelist.extend(allowed_urls)
-
-    whitelist = [
-        compile_regex(regex)
-        for regex in whitelist] if whitelist else [
-    ]
 
-    while queue:
-        try:
-            if max_depth and n >= max_depth:
-                break
+    limits = {
+        "rate": host_rate,
+        "burst": host_burst,
+        "max_per_host": host_concurrency,
+        "score": Scorer(patterns, root_url) if priority else None,
+    }
 
-            n += 1
-            current_url = queue.popleft()
-            _current_url = current_url.utf8()
-            visited.append(_current_url)
+    if state_dir is not None:
+        state = State(state_dir, **limits)
+        queue, visited, seen, limited = state.frontier, state.visited, state.seen, state.limited
+    else:
+        state = None
+        queue = Frontier(**limits)
+        visited, seen, limited = set(), set(), set()
 
-            response, content = fetch_url(_current_url)
+    if (state is None or state.new) and (shard is None or shard.owns(root_url)):
+        queue.push(root_url, 0)
 
-            if not response.status == 200:
-                errors.append((response.status, _current_url))
-                links = []
-            else:
-                links = list(get_links(content))
+    n = state.fetched if state is not None else 0
+    l = len(state.urls) if state is not None else 0
+    c = 0
 
-            verbose and log(
-                " {0:d} {1:s} {2:s} {3:s} {4:d} {5:s}",
-                response.status, response.reason,
-                response["content-type"], response.get("content-length", ""),
-                len(links), current_url.utf8()
-            )
+    found = []
+    interrupted = False
+    held = False
 
-            for link in links:
-                url = current_url.relative(link).defrag().canonical()
-                _url = url.utf8()
+    if whitelist and allowed_urls:
+        whitelist.extend(allowed_urls)
 
-                if _url in urls:
-                    verbose and log("  (S): {0}", _url)
+    rules = Rules(patterns, blacklist, whitelist)
+    normalizer = Normalizer(url_cache)
+    duplicates = Duplicates() if dedup is not None else None
+
+    timing = metrics.enabled()
+
+    cache = LRUCache(url_cache)  # Content types of urls to follow
+    pool = ThreadPool(concurrency) if concurrency > 1 else None
+    results = Queue()
+    pending = 0
+
+    if shard is not None:
+        shard.listen(results)
+
+    def submit(url, depth):
+        args = (url, None if use_head else content_types, link_parser, max_size, dedup)
+        if pool is not None:
+            pool.apply_async(fetch_links, args, callback=lambda result: results.put(result + (depth,)))
+        else:
+            results.put(fetch_links(*args) + (depth,))
+
+    def follow(url):
+        if url in cache:
+            content_type = cache.get(url)
+        else:
+            content_type = predict_content_type(url) if predict_types else None
+            if content_type is None and use_head:
+                start = timing and time()
+                content_type = head_content_type(url)
+                timing and metrics.observe("head", time() - start)
+            cache[url] = content_type
+
+        return content_type is None or get_mimetype(content_type) in content_types
+
+    try:
+        while queue or pending or shard is not None:
+            try:
+                while queue and pending < concurrency:
+                    if max_pages and shard is None and n >= max_pages:
+                        break
+
+                    entry = queue.pop()
+                    if entry is None:
+                        break
+
+                    if shard is not None and not shard.take(max_pages):
+                        break
+
+                    current_url, depth = entry
+
+                    n += 1
+                    visited.add(current_url.utf8())
+
+                    submit(current_url, depth)
+                    pending += 1
+
+                if not pending and shard is None:
+                    if queue and not (max_pages and n >= max_pages):
+                        sleep(queue.delay() or 0)
+                        continue
+                    break
+
+                # A timeout keeps the wait interruptible by KeyboardInterrupt
+                # and lets us hand out urls of hosts that become ready.
+                try:
+                    current_url, response, links, depth = results.get(True, queue.delay() or TIMEOUT)
+                except Empty:
                     continue
 
-                if url._scheme not in ("http", "https"):
-                    verbose and log("  (I): {0}", _url)
-                    continue
+                if current_url is None:
+                    # (url, depth) of links forwarded by another shard
+                    # or the end of the crawl
+                    if response is None:
+                        break
+                    links = response
 
-                if _url in visited:
-                    verbose and log("  (V): {0}", _url)
-                    continue
+                held, pushed = shard is not None, 0
 
-                if patterns and not any(
-                        (regex.match(_url) is not None)
-                        for regex in patterns
-                        ):
-                    verbose and log("  (P): {0}", _url)
-                else:
-                    verbose and log("  (F): {0}", _url)
-                    urls.append(_url)
-                    l += 1
-
-                response = head(_url)
-                try:
-                    response.raise_for_status()
-                    content_type = response.headers.get("Content-Type", None)
-                except:
-                    content_type = None
-
-                if blacklist and any((
-                        regex.match(_url) is not None)
-                        for regex in blacklist
-                        ):
-                    if whitelist and any(
-                            (regex.match(_url) is not None)
-                            for regex in whitelist
-                            ):
-                        if content_type is None or (
-                                content_type and content_type in content_types
-                                ):
-                            queue.append(url)
-                            verbose and log("  (W): {0}", _url)
+                if current_url is not None:
+                    pending -= 1
+                    queue.done(current_url)
+
+                    if isinstance(links, Exception):
+                        raise links
+
+                    timing and metrics.count("pages")
+
+                    if not response.status == 200:
+                        timing and metrics.count("errors")
+                        if state is not None:
+                            state.errors.append((response.status, current_url.utf8()))
+                            found.append(("error", (response.status, current_url.utf8())))
                         else:
-                            verbose and log("  (C): {0}", _url)
-                    else:
-                        visited.append(_url)
-                        verbose and log("  (B): {0}", _url)
-                else:
-                    if content_type is None or (
-                            content_type and content_type in content_types
-                            ):
-                        queue.append(url)
+                            yield "error", (response.status, current_url.utf8())
+
+                    verbose and log(
+                        " {0:d} {1:s} {2:s} {3:s} {4:d} {5:s}",
+                        response.status, response.reason,
+                        response["content-type"], response.get("content-length", ""),
+                        len(links or ()), current_url.utf8()
+                    )
+
+                    if duplicates is not None and response.status == 200 and links is not None:
+                        duplicate = duplicates.check(current_url.utf8(), response.fingerprint)
+                        if duplicate is not None:
+                            verbose and log("  (U): {0} {1} duplicate of {2}", current_url.utf8(), *duplicate)
+                            if not expand_duplicates:
+                                links = []
+
+                    if links is None:
+                        verbose and log("  (C): {0}", current_url.utf8())
+                        links = []
+
+                    timing and metrics.count("links", len(links))
+                    links = izip(links, repeat(depth + 1))
+
+                for link, depth in links:
+                    start = timing and time()
+                    url, _url = normalizer.normalize(current_url, link)
+                    timing and metrics.observe("normalize", time() - start)
+
+                    if shard is not None and not shard.owns(url):
+                        shard.forward(url, depth)
+                        continue
+
+                    # Matched urls found at the depth limit are reported but
+                    # are still followed if found again at a shallower depth
+                    reported = _url in seen
+                    if reported and ((max_depth and depth >= max_depth) or _url not in limited):
+                        verbose and log("  (S): {0}", _url)
+                        continue
+
+                    if url._scheme not in ("http", "https"):
+                        verbose and log("  (I): {0}", _url)
+                        continue
+
+                    if _url in visited:
+                        verbose and log("  (V): {0}", _url)
+                        continue
+
+                    start = timing and time()
+                    matched, blacklisted, whitelisted = rules.match(_url)
+                    timing and metrics.observe("match", time() - start)
+
+                    if not matched:
+                        verbose and log("  (P): {0}", _url)
+                    elif not reported:
+                        verbose and log("  (F): {0}", _url)
+                        seen.add(_url)
+                        l += 1
+                        timing and metrics.count("urls")
+                        if state is not None:
+                            state.urls.append(_url)
+                            found.append(("url", _url))
+                        else:
+                            yield "url", _url
+
+                    if max_depth and depth >= max_depth:
+                        if matched:
+                            limited.add(_url)
+                        verbose and log("  (D): {0}", _url)
+                        continue
+
+                    if reported:
+                        limited.discard(_url)
+
+                    if blacklisted:
+                        if whitelisted:
+                            if follow(_url):
+                                queue.push(url, depth)
+                                pushed += 1
+                                verbose and log("  (W): {0}", _url)
+                            else:
+                                verbose and log("  (C): {0}", _url)
+                        else:
+                            visited.add(_url)
+                            verbose and log("  (B): {0}", _url)
                     else:
-                        verbose and log("  (C): {0}", _url)
+                        if follow(_url):
+                            queue.push(url, depth)
+                            pushed += 1
+                        else:
+                            verbose and log("  (C): {0}", _url)
 
-            not verbose and status(
-                "Q: {0:d} F: {1:d} V: {2:d} L: {3:d}",
-                len(queue), n, len(visited), l
-            )
-        except Exception as e:  # pragma: no cover
-            error(e)
-        except KeyboardInterrupt:  # pragma: no cover
-            break
-
-    return {
-        "urls": urls,
-        "errors": errors
+                if held:
+                    held = False
+                    shard.done(pushed)
+
+                if current_url is None:
+                    continue
+
+                c += 1
+                if state is not None and not c % checkpoint:
+                    state.fetched = n
+                    state.checkpoint()
+
+                    for result in found:
+                        yield result
+                    del found[:]
+
+                not verbose and shard is None and status(
+                    "Q: {0:d} F: {1:d} V: {2:d} L: {3:d}",
+                    len(queue), n, len(visited), l
+                )
+            except Exception as e:  # pragma: no cover
+                if held:
+                    held = False
+                    shard.done(pushed)
+                error(e)
+            except KeyboardInterrupt:  # pragma: no cover
+                interrupted = True
+                break
+
+        if state is not None and not interrupted:
+            state.fetched = n
+            state.checkpoint()
+
+            for result in found:
+                yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+        if state is not None:
+            state.close(checkpoint=False)
+
+        normalizer.close()
+
+
+def crawl(root_url, **kwargs):
+    """Crawl a given url recursively for urls.
+
+    Takes the same arguments as :func:`crawl_iter`.
+
+    :returns: A dict in the form:
+              {"errors": [...], "urls": [...]}
+              The errors list contains 2-item tuples of (status, url)
+              The urls list contains the urls found.
+    :rtype:   dict
+
+    With a ``state_dir`` the result includes the urls and errors found
+    before the crawl was resumed.
+    """
+
+    result = {
+        "urls": [],
+        "errors": []
     }
 
+    for kind, value in crawl_iter(root_url, **kwargs):
+        result["urls" if kind == "url" else "errors"].append(value)
+
+    state_dir = kwargs.get("state_dir")
+    if state_dir is not None:
+        state = State(state_dir)
+        result["urls"], result["errors"] = list(state.urls), list(state.errors)
+        state.close()
+
+    return result
+
 
 def parse_options():
     parser = OptionParser(usage=USAGE, version=VERSION)
@@ -226,10 +593,77 @@ def parse_options():
         help="Blacklisted URL to not traverse (multiple allowed)."
     )
 
+    parser.add_option(
+        "", "--checkpoint",
+        action="store", type=int, default=CHECKPOINT, dest="checkpoint",
+        help="No. of pages between checkpoints of --state-dir"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type=int, default=1, dest="concurrency",
+        help="Number of pages to fetch concurrently"
+    )
+
+    parser.add_option(
+        "", "--dedup",
+        action="store", type="choice", choices=DEDUP_MODES, default=None, dest="dedup", metavar="MODE",
+        help="Do not follow links of exact or near duplicate pages (exact or near)"
+    )
+
+    parser.add_option(
+        "", "--expand-duplicates",
+        action="store_true", default=False, dest="expand_duplicates",
+        help="Follow links of duplicate pages found with --dedup"
+    )
+
     parser.add_option(
         "-d", "--max_depth",
         action="store", type=int, default=0, dest="max_depth",
-        help="Maximum depth to follow (0 for unlimited)"
+        help="Maximum link depth to follow (0 for unlimited)"
+    )
+
+    parser.add_option(
+        "", "--max-pages",
+        action="store", type=int, default=0, dest="max_pages",
+        help="Maximum no. of pages to fetch (0 for unlimited)"
+    )
+
+    parser.add_option(
+        "", "--max-size",
+        action="callback", callback=store_megabytes, type="int", metavar="MB", default=MAX_SIZE, dest="max_size",
+        help="Maximum size of a page in MB (0 for unlimited, Default: {0:d})".format(MAX_SIZE >> 20)
+    )
+
+    parser.add_option(
+        "", "--no-head",
+        action="store_false", default=True, dest="use_head",
+        help="Check content types on the GET response instead of a HEAD request"
+    )
+
+    parser.add_option(
+        "", "--host-burst",
+        action="store", type=int, default=1, dest="host_burst",
+        help="No. of requests a host may receive at once before --host-rate applies"
+    )
+
+    parser.add_option(
+        "", "--host-concurrency",
+        action="store", type=int, default=0, dest="host_concurrency",
+        help="Maximum requests in flight per host (0 for unlimited)"
+    )
+
+    parser.add_option(
+        "", "--host-rate",
+        action="store", type=float, default=0, dest="host_rate",
+        help="Maximum requests per second per host (0 for unlimited)"
+    )
+
+    parser.add_option(
+        "", "--link-parser",
+        action="store", type="choice", choices=sorted(LINK_BACKENDS), default=LINK_BACKEND,
+        dest="link_parser", metavar="BACKEND",
+        help="Link extraction backend: lxml, stream or soup (Default: lxml)"
     )
 
     parser.add_option(
@@ -238,12 +672,42 @@ def parse_options():
         help="URL pattern to match (multiple allowed)."
     )
 
+    parser.add_option(
+        "", "--priority",
+        action="store_true", default=False, dest="priority",
+        help="Crawl best-first, fetching urls closest to the patterns first"
+    )
+
+    parser.add_option(
+        "-s", "--state-dir",
+        action="store", default=None, dest="state_dir", metavar="PATH",
+        help="Store the crawl state in PATH and resume from it"
+    )
+
     parser.add_option(
         "-t", "--contenttype",
         action="append", default=CONTENT_TYPES, dest="content_types",
         help="Content Type(s) to follow (multiple allowed)."
     )
 
+    parser.add_option(
+        "", "--predict-types",
+        action="store_true", default=False, dest="predict_types",
+        help="Predict content types from url file extensions"
+    )
+
+    parser.add_option(
+        "", "--workers",
+        action="store", type=int, default=1, dest="workers",
+        help="No. of processes to crawl with, partitioning hosts between them"
+    )
+
+    parser.add_option(
+        "", "--url-cache",
+        action="store", type=int, default=URL_CACHE, dest="url_cache", metavar="SIZE",
+        help="No. of normalized urls and content types of urls to cache (0 to disable)"
+    )
+
     parser.add_option(
         "-v", "--verbose",
         action="store_true", default=False, dest="verbose",
@@ -256,12 +720,22 @@ def parse_options():
         help="Whitelisted URL to traverse (multiple allowed)."
     )
 
+    session_options(parser)
+    cache_options(parser)
+    warc_options(parser)
+    metrics_options(parser)
+
     opts, args = parser.parse_args()
 
     if len(args) < 1:
         parser.print_help()
         raise SystemExit(1)
 
+    if opts.workers > 1 and opts.state_dir is not None:
+        print("ERROR: --workers cannot be used with -s/--state-dir")
+        parser.print_help()
+        raise SystemExit(1)
+
     return opts, args
 
 
@@ -270,31 +744,38 @@ def main():
 
     url = args[0]
 
+    options = opts.__dict__
+    configure(**dict((key, options.pop(key)) for key in SESSION_OPTIONS))
+    cache = dict((key, options.pop(key)) for key in CACHE_OPTIONS)
+    configure_cache(**cache)
+    warc = dict((key, options.pop(key)) for key in WARC_OPTIONS)
+    configure_warc(**warc)
+    metrics.configure(**dict((key, options.pop(key)) for key in METRICS_OPTIONS))
+
     if opts.verbose:
         print("Crawling {0:s}".format(url))
 
     stime = time()
-    result = crawl(url, **opts.__dict__)
+    urls = 0
+
+    try:
+        for kind, value in crawl_iter(url, **options):
+            if kind == "url":
+                print(value)
+                sys.stdout.flush()
+                urls += 1
+            else:
+                print >> sys.stderr, " {0:d} {1:s}".format(*value)
+    finally:
+        metrics.stop()
+        configure_warc(warc=None)
 
-    if result["urls"]:
-        if opts.verbose:
-            print("URL(s):")
-        print("\n".join(result["urls"]))
-    else:
-        if opts.verbose:
-            print("No URL(s) found!")
-
-    if result["errors"]:
-        if opts.verbose:
-            print >> sys.stderr, "Error(s):"
-        print >> sys.stderr, "\n".join(
-            " {0:d} {1:s}".format(*url) for url in result["errors"]
-        )
+    if not urls and opts.verbose:
+        print("No URL(s) found!")
 
     if opts.verbose:
         cputime = clock()
         duration = time() - stime
-        urls = len(result["urls"])
         urls_per_second = int(urls / duration)
 
         print(
@@ -303,5 +784,50 @@ def main():
             )
         )
 
+        stats = get_stats()
+        print(
+            "{0:d} requests over {1:d} connections ({2:d} reused)".format(
+                stats["requests"], stats["connections"], stats["reused"]
+            )
+        )
+        print(
+            "{0:d} bytes received, {1:d} bytes decoded ({2:0.1f}x), {3:d} bytes saved ({4:d} bodies not downloaded)".format(
+                stats["received"], stats["decoded"],
+                float(stats["decoded"]) / stats["received"] if stats["received"] else 1.0,
+                stats["saved"], stats["aborted"]
+            )
+        )
+
+        stats = get_cache_stats()
+        if cache["cache_dir"] is not None:
+            print(
+                "{0:d} responses served from cache, {1:d} fetched ({2:d} stored, {3:d} evicted)".format(
+                    stats["hits"], stats["misses"], stats["stores"], stats["evictions"]
+                )
+            )
+
+        stats = get_warc_stats()
+        if warc["warc"] is not None:
+            print(
+                "{0:d} responses archived in {1:d} WARC files".format(
+                    stats["records"], stats["files"]
+                )
+            )
+
+        stats = get_dedup_stats()
+        if opts.dedup is not None:
+            print(
+                "{0:d} exact and {1:d} near duplicates of {2:d} pages".format(
+                    stats["exact"], stats["near"], stats["pages"]
+                )
+            )
+
+        stats = get_url_stats()
+        print(
+            "{0:d} of {1:d} links normalized from cache ({2:0.1f}%)".format(
+                stats["hits"], stats["hits"] + stats["misses"], stats["hit_rate"] * 100
+            )
+        )
+
 if __name__ == "__main__":
     main()
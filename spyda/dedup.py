@@ -0,0 +1,205 @@
+# Module:   dedup
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Duplicate Detection
+
+Fingerprints the text of fetched pages so the crawler can recognise
+content it has already seen under another url (mirrors, printer
+friendly variants, session ids in urls) and not expand its links again.
+
+A :class:`Fingerprint` holds a SHA-1 hash of the page's words, which
+identifies exact duplicates, and optionally a 64 bit simhash of its
+word shingles, which differs in only a few bits between pages that
+differ in only a few words. Near duplicates are found in an index of
+the simhashes split into bands: two simhashes within ``distance`` bits
+of each other have at least one of ``distance + 1`` bands in common.
+"""
+
+
+import re
+from hashlib import md5, sha1
+from threading import Lock
+from operator import itemgetter
+
+
+EXACT, NEAR = "exact", "near"
+
+MODES = (EXACT, NEAR)
+
+DISTANCE = 5      # Maximum no. of differing bits of near duplicates
+SHINGLE = 4       # No. of words per shingle
+MIN_SHINGLES = 8  # Pages with fewer shingles are only checked exactly
+
+BITS = 64
+
+
+# Getters of the tallies of the byte values with each bit set
+BIT_TALLIES = [itemgetter(*[byte for byte in range(256) if byte >> bit & 1]) for bit in range(8)]
+
+
+MARKUP = re.compile(r"<!--.*?-->|<(script|style)\b.*?</\1\s*>|<[^>]*>", re.IGNORECASE | re.DOTALL)
+
+WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+_stats_lock = Lock()
+_stats = {
+    "pages": 0,
+    "exact": 0,
+    "near": 0,
+}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def get_words(html):
+    """Return the lower cased words of the text of a page"""
+
+    return WORDS.findall(MARKUP.sub(" ", html).lower())
+
+
+def simhash(words, size=SHINGLE):
+    """Return the 64 bit simhash of the ``size`` word shingles of ``words``.
+
+    Each byte of every shingle's hash is tallied per position and the
+    bit counts are only summed from the tallies at the end, which is
+    much cheaper than updating 64 counters per shingle.
+    """
+
+    tallies = [[0] * 256 for i in range(BITS // 8)]
+    shingles = max(len(words) - size + 1, 1)
+
+    for i in range(shingles):
+        digest = md5(" ".join(words[i:i + size])).digest()
+        for tally, byte in zip(tallies, bytearray(digest[:BITS // 8])):
+            tally[byte] += 1
+
+    result = 0
+    for position, tally in enumerate(tallies):
+        for bit, getter in enumerate(BIT_TALLIES):
+            if sum(getter(tally)) * 2 > shingles:
+                result |= 1 << (position * 8 + bit)
+
+    return result
+
+
+class Fingerprint(object):
+    """Fingerprint of the text of a page.
+
+    :param html: The page as a str or unicode.
+
+    :param near: If ``True`` also compute the simhash of the page.
+    :type  near: bool
+    """
+
+    def __init__(self, html, near=False):
+        words = get_words(html)
+        text = u" ".join(words) if isinstance(html, unicode) else " ".join(words)
+        if isinstance(text, unicode):
+            text = text.encode("utf-8")
+            words = [word.encode("utf-8") for word in words]
+
+        self.empty = not words
+        self.digest = sha1(text).digest()
+        self.simhash = simhash(words) if near and len(words) - SHINGLE + 1 >= MIN_SHINGLES else None
+
+
+def distance(a, b):
+    """Return the no. of differing bits of two simhashes"""
+
+    return bin(a ^ b).count("1")
+
+
+class SimhashIndex(object):
+    """Index of simhashes finding those within ``distance`` bits of a simhash"""
+
+    def __init__(self, distance=DISTANCE):
+        self.distance = distance
+        self.width = BITS // (distance + 1)
+        self.mask = (1 << self.width) - 1
+        self.bands = [{} for i in range(distance + 1)]
+
+    def _keys(self, simhash):
+        return [(simhash >> (i * self.width)) & self.mask for i in range(len(self.bands))]
+
+    def find(self, simhash):
+        """Return the value of a simhash within ``distance`` bits or ``None``"""
+
+        for band, key in zip(self.bands, self._keys(simhash)):
+            for other, value in band.get(key, ()):
+                if distance(simhash, other) <= self.distance:
+                    return value
+        return None
+
+    def add(self, simhash, value):
+        for band, key in zip(self.bands, self._keys(simhash)):
+            band.setdefault(key, []).append((simhash, value))
+
+
+class Duplicates(object):
+    """Fingerprints of the pages of a crawl.
+
+    :param distance: Maximum no. of differing simhash bits of near
+                     duplicates.
+    :type  distance: int
+    """
+
+    def __init__(self, distance=DISTANCE):
+        self.digests = {}
+        self.simhashes = SimhashIndex(distance)
+
+    def check(self, url, fingerprint):
+        """Check whether a page is a duplicate of one checked before.
+
+        :param url:         The url of the page.
+        :param fingerprint: The :class:`Fingerprint` of the page.
+
+        :returns:           A 2-item tuple of (kind, url) of the kind of
+                            duplicate (``"exact"`` or ``"near"``) and
+                            the url of the page it duplicates, or
+                            ``None`` if it is not a duplicate.
+        :rtype:             tuple or None
+        """
+
+        if fingerprint.empty:
+            return None
+
+        count("pages")
+
+        original = self.digests.get(fingerprint.digest)
+        if original is not None:
+            count(EXACT)
+            return EXACT, original
+
+        self.digests[fingerprint.digest] = url
+
+        if fingerprint.simhash is not None:
+            original = self.simhashes.find(fingerprint.simhash)
+            if original is not None:
+                count(NEAR)
+                return NEAR, original
+            self.simhashes.add(fingerprint.simhash, url)
+
+        return None
+
+
+def get_stats():
+    """Return duplicate statistics of all crawls.
+
+    :returns: A dict of the no. of ``pages`` checked and of ``exact``
+              and ``near`` duplicates found.
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        return _stats.copy()
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -11,6 +11,7 @@ from os import environ, path
 from time import clock, time
 from functools import partial
 from uuid import uuid4 as uuid
+from itertools import islice
 from collections import defaultdict
 from multiprocessing.pool import ThreadPool
 from optparse import OptionGroup, OptionParser
@@ -18,7 +19,10 @@ from optparse import OptionGroup, OptionParser
 from lxml.html import tostring as doc_to_str
 
 from . import __version__
-from .utils import dict_to_text, doc_to_text, fetch_url, is_url, log, parse_html
+from .sessions import configure, get_stats, session_options, SESSION_OPTIONS
+from .cache import cache_options, configure as configure_cache, get_stats as get_cache_stats, CACHE_OPTIONS
+from .warc import is_warc, read_records, Record
+from .utils import dict_to_text, doc_to_text, fetch_url, get_charset, is_url, log, parse_html
 
 try:
     from calais import Calais
@@ -26,7 +30,7 @@ try:
 except ImportError:
     Calais = None  # NOQA
 
-USAGE = "%prog [options] [file | url | -]"
+USAGE = "%prog [options] [file | url | -] | [warc ...]"
 VERSION = "%prog v" + __version__
 DESCRIPTION = (
     "Tool to extract fragments of a given document by use of CSS Selector(s). "
@@ -34,9 +38,14 @@ DESCRIPTION = (
     "Example: -f \"key[.attribute]=expression\""
     "If - is provided as the only argument, then for each line of standard output "
     "(assumed to be a url) and the -o/--output option, extraction of each url "
-    "will be processed and dumped to the given output path."
+    "will be processed and dumped to the given output path. "
+    "If one or more WARC files (written by crawl --warc) are given, "
+    "extraction is performed on each successful response archived in them "
+    "without fetching any url."
 )
 
+BATCH = 1000  # No. of sources processed at a time
+
 
 def calais_options(parser):
     group = OptionGroup(
@@ -90,6 +99,9 @@ def parse_options():
         help="Enable verbose logging"
     )
 
+    session_options(parser)
+    cache_options(parser)
+
     if Calais is not None:
         calais_options(parser)
 
@@ -99,6 +111,11 @@ def parse_options():
         parser.print_help()
         raise SystemExit(1)
 
+    if len(args) > 1 and not all(is_warc(arg) for arg in args):
+        print("ERROR: only WARC files can be given as more than one argument")
+        parser.print_help()
+        raise SystemExit(1)
+
     if args and args[0] == "-" and not opts.output:
         print("ERROR: -o/--output is required for when using standard input")
         parser.print_help()
@@ -114,10 +131,30 @@ def parse_options():
     return opts, args
 
 
-def extract(source, filters):
+def extract(source, filters, content=None, encoding=None):
+    """Extract fragments of a document matching the given filters.
+
+    :param source:   A url or file name.
+
+    :param filters:  A list of filters in the form key[.attribute]=expression.
+    :type  filters:  list
+
+    :param content:  The document itself, in which case ``source`` is
+                     neither fetched nor read.
+
+    :param encoding: The encoding of ``content`` if given as bytes or
+                     ``None`` to detect it.
+    :type  encoding: str or None
+    """
+
     filters = dict(filter.split("=") for filter in filters)
-    s = fetch_url(source)[1] if is_url(source) else open(source, "r").read()
-    doc = parse_html(s)
+    if content is None:
+        if is_url(source):
+            response, content = fetch_url(source, decode=False)
+            encoding = get_charset(response)
+        else:
+            content = open(source, "rb").read()
+    doc = parse_html(content, encoding)
 
     result = {}
     for k, v in filters.items():
@@ -134,11 +171,30 @@ def extract(source, filters):
     return result
 
 
-def job(opts, source):
+def get_sources(args):
+    """Return an iterable of the sources to process: urls or files or
+    the records of successful responses in WARC files.
+    """
+
+    if args[0] == "-":
+        return (line.strip() for line in sys.stdin)
+
+    if all(is_warc(arg) for arg in args):
+        return (record for arg in args for record in read_records(arg) if record.status == 200)
+
+    return args[:1]
+
+
+def job(opts, item):
+    if isinstance(item, Record):
+        source, content, encoding = item.url, item.content, get_charset(item.headers)
+    else:
+        source, content, encoding = item, None, None
+
     try:
         opts.verbose and log("Processing: {0:s}", source)
 
-        result = extract(source, opts.filters)
+        result = extract(source, opts.filters, content, encoding)
 
         if Calais is not None and opts.calais:
             result.update(process_calais(dict_to_text(result), key=opts.calais_key))
@@ -150,39 +206,60 @@ def job(opts, source):
                 f.write(dumps(result))
         else:
             print(dumps(result))
-        return True, source
+        return True, item
     except Exception as e:
         log("Error Processing {0:s} {1:s}", source, e)
-        return False, source
+        return False, item
 
 
 def main():
     opts, args = parse_options()
 
-    source = args[0]
+    configure(**dict((key, getattr(opts, key)) for key in SESSION_OPTIONS))
+    configure_cache(**dict((key, getattr(opts, key)) for key in CACHE_OPTIONS))
 
     stime = time()
 
-    sources = (line.strip() for line in sys.stdin) if source == "-" else (source,)
+    sources = iter(get_sources(args))
 
     pool = ThreadPool(opts.jobs)
 
     retries = defaultdict(int)
 
-    while sources:
+    def run(sources):
         results = pool.map(partial(job, opts), sources)
         [retries.pop(source, None) for success, source in results if success]
         retries.update((source, (retries[source] + 1)) for success, source in results if not success)
+
+    # Sources are read in batches so WARC files are streamed
+    for batch in iter(lambda: list(islice(sources, BATCH)), []):
+        run(batch)
+
+    sources = [source for source, tries in retries.items() if tries < 3]
+    while sources:
+        run(sources)
         sources = [source for source, tries in retries.items() if tries < 3]
 
     opts.verbose and log("Error(s):")
-    [log(source) for source, tries in retries.items() if tries >= 3]
+    [log(getattr(source, "url", source)) for source, tries in retries.items() if tries >= 3]
 
     cputime = clock()
     duration = time() - stime
 
     opts.verbose and log("Processed in in {0:0.2f}s using {1:0.2f}s of CPU time.", duration, cputime)
 
+    stats = get_stats()
+    opts.verbose and log(
+        "{0:d} requests over {1:d} connections ({2:d} reused)",
+        stats["requests"], stats["connections"], stats["reused"]
+    )
+
+    stats = get_cache_stats()
+    opts.verbose and opts.cache_dir is not None and log(
+        "{0:d} responses served from cache, {1:d} fetched ({2:d} stored, {3:d} evicted)",
+        stats["hits"], stats["misses"], stats["stores"], stats["evictions"]
+    )
+
 
 if __name__ == "__main__":
     main()
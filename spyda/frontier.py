@@ -0,0 +1,215 @@
+# Module:   frontier
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Crawl Frontier
+
+The frontier holds the urls waiting to be fetched in a queue per host
+and hands them out in round-robin order across the hosts that are ready,
+so a crawl of many hosts keeps all of them busy without overloading any
+single one. A host is ready when it has fewer than ``max_per_host``
+requests in flight and its token bucket (``rate`` requests per second
+with bursts of up to ``burst`` requests) has a token available.
+
+Each url is queued with its link depth (0 for the root url). Given a
+``score`` function the frontier is best-first instead: each host's
+queue is a heap ordered by the score of its urls and the ready host
+with the lowest scoring url is served next.
+"""
+
+
+from time import time
+from itertools import count
+from collections import deque
+from heapq import heappop, heappush
+
+
+def get_host(url):
+    """Return the (host, port) of a parsed url"""
+
+    return url._host, url._port
+
+
+class TokenBucket(object):
+    """Token bucket allowing ``rate`` requests per second in bursts of ``burst``"""
+
+    def __init__(self, rate, burst=1, clock=time):
+        self.rate = float(rate)
+        self.burst = max(burst, 1)
+        self.clock = clock
+
+        self.tokens = float(self.burst)
+        self.stamp = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self):
+        """Return the no. of seconds until a token is available"""
+
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class Frontier(object):
+    """Per-host crawl frontier.
+
+    :param rate:         Maximum requests per second per host.
+                         0 for unlimited.
+    :type  rate:         float
+
+    :param burst:        No. of requests a host may receive at once
+                         before ``rate`` applies.
+    :type  burst:        int
+
+    :param max_per_host: Maximum requests in flight per host.
+                         0 for unlimited.
+    :type  max_per_host: int
+
+    :param score:        A function of (url, depth) returning the
+                         priority of a url, lowest first, or ``None``
+                         for first-in first-out order.
+    :type  score:        callable or None
+    """
+
+    def __init__(self, rate=0, burst=1, max_per_host=0, clock=time, score=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.clock = clock
+        self.score = score
+
+        self.sequence = count()
+
+        self.queues = {}
+        self.hosts = deque()
+        self.counts = {}
+        self.buckets = {}
+        self.inflight = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+        return self.buckets[host]
+
+    def _blocked(self, host):
+        return self.max_per_host and self.inflight.get(host, 0) >= self.max_per_host
+
+    def _ready(self, host):
+        return not (self._blocked(host) or (self.rate and self._bucket(host).delay()))
+
+    def _put(self, host, url, depth):
+        if self.score is None:
+            if host not in self.queues:
+                self.queues[host] = deque()
+            self.queues[host].append((url, depth))
+        else:
+            # The sequence no. keeps urls of equal score in FIFO order
+            heappush(self.queues.setdefault(host, []), (self.score(url, depth), next(self.sequence), url, depth))
+
+    def _get(self, host):
+        queue = self.queues[host]
+        if self.score is None:
+            entry = queue.popleft()
+        else:
+            entry = heappop(queue)[2:]
+        if not queue:
+            del self.queues[host]
+        return entry
+
+    def _head(self, host):
+        """Return the score of the next url of a host"""
+
+        return self.queues[host][0][0]
+
+    def _round_robin(self):
+        for i in range(len(self.hosts)):
+            host = self.hosts[0]
+            self.hosts.rotate(-1)
+            if self._ready(host):
+                return host
+
+    def _best(self):
+        ready = [host for host in self.hosts if self._ready(host)]
+        return min(ready, key=self._head) if ready else None
+
+    def _select(self):
+        """Return the next ready host or ``None``"""
+
+        return self._round_robin() if self.score is None else self._best()
+
+    def push(self, url, depth=0):
+        """Add a parsed url found at link depth ``depth`` to its host's queue"""
+
+        host = get_host(url)
+
+        if host not in self.counts:
+            self.counts[host] = 0
+            self.hosts.append(host)
+
+        self._put(host, url, depth)
+        self.counts[host] += 1
+        self.size += 1
+
+    def pop(self):
+        """Return a 2-item tuple of (url, depth) of the next url of the
+        next ready host.
+
+        Returns ``None`` if no host is ready. Each url returned must be
+        passed to :meth:`done` once it has been fetched.
+        """
+
+        host = self._select()
+        if host is None:
+            return None
+
+        entry = self._get(host)
+
+        self.counts[host] -= 1
+        if not self.counts[host]:
+            del self.counts[host]
+            if self.hosts[-1] == host:
+                self.hosts.pop()
+            else:
+                self.hosts.remove(host)
+
+        if self.rate:
+            self._bucket(host).take()
+
+        self.inflight[host] = self.inflight.get(host, 0) + 1
+        self.size -= 1
+
+        return entry
+
+    def done(self, url):
+        """Mark a url returned by :meth:`pop` as fetched"""
+
+        host = get_host(url)
+
+        self.inflight[host] -= 1
+        if not self.inflight[host]:
+            del self.inflight[host]
+
+    def delay(self):
+        """Return the no. of seconds until a host may be ready.
+
+        Returns ``None`` if every host with queued urls is waiting on
+        requests in flight.
+        """
+
+        delays = [
+            self._bucket(host).delay() if self.rate else 0.0
+            for host in self.hosts if not self._blocked(host)
+        ]
+
+        return min(delays) if delays else None
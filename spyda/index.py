@@ -0,0 +1,422 @@
+# Module:   index
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Match Candidate Index
+
+An inverted index of the character n-grams of a list of strings so
+:func:`~spyda.utils.get_close_matches` need only score the few strings
+that can possibly be close to a word instead of every one of them.
+
+The candidates are exactly those that could score at least the cutoff
+with :class:`~difflib.SequenceMatcher`'s ``ratio()``. A ratio of at least
+``cutoff`` needs ``M`` matching characters where ``2.0 * M / (la + lb)
+>= cutoff``. An n-gram of one string is in the other if none of its
+characters is unmatched and it does not span two matching blocks.
+Every unmatched character of ``a`` breaks at most ``n`` of its n-grams.
+Every block boundary not at an unmatched character of ``a`` is at one of
+``b`` and breaks at most ``n - 1``. So the strings share at least
+``la - n + 1 - n * (la - M) - (n - 1) * (lb - M)`` n-grams. Any string
+sharing that many n-grams of a word shares one of the rarest few, whose
+postings are the only ones read, and the strings found are checked to
+share that many. The strings of lengths for which the bound is not
+positive are all candidates.
+
+The indexes of data sets (strings and their values) can be written to
+an index file (see :func:`write_index`) which is memory mapped by
+:func:`read_index` instead of rebuilding them. Its strings are sorted
+so values are found by binary search and only the sections read are
+paged in, shared by every process mapping the file.
+"""
+
+
+import sys
+from os import path, rename, stat
+from array import array
+from math import ceil
+from json import dumps, loads
+from threading import Lock
+from bisect import bisect_left
+from uuid import uuid4 as uuid
+from mmap import mmap, ACCESS_READ
+
+
+SIZE = 3  # No. of characters per n-gram
+
+MAGIC = "SPYDA-NGRAM-INDEX 1\n"
+
+ITEMSIZE = array("i").itemsize
+
+
+_mapped_lock = Lock()
+_mapped = {}  # Index files mapped by this process (keyed by path)
+
+
+def ngrams(s, size=SIZE):
+    """Return the n-grams of a string"""
+
+    return [s[i:i + size] for i in range(len(s) - size + 1)]
+
+
+def get_threshold(la, lb, cutoff, size=SIZE):
+    """Return the minimum no. of n-grams shared by two strings of length
+    ``la`` and ``lb`` whose ratio is at least ``cutoff``.
+
+    :returns: The no. of n-grams or ``None`` if no two strings of these
+              lengths have a ratio of at least ``cutoff``.
+    :rtype:   int or None
+    """
+
+    length = la + lb
+    if not length:
+        return 0
+
+    # The least no. of matching characters scoring at least cutoff
+    # (computed as SequenceMatcher.ratio() does to round alike)
+    matches = int(ceil(cutoff * length / 2.0))
+    while matches > 0 and 2.0 * (matches - 1) / length >= cutoff:
+        matches -= 1
+    while 2.0 * matches / length < cutoff:
+        matches += 1
+
+    if matches > min(la, lb):
+        return None
+
+    ua, ub = la - matches, lb - matches
+
+    return max(
+        la - size + 1 - size * ua - (size - 1) * ub,
+        lb - size + 1 - size * ub - (size - 1) * ua,
+    )
+
+
+class NGramIndex(object):
+    """Index of the n-grams of a list of strings.
+
+    :param possibilities: The strings to index.
+    :type  possibilities: list
+
+    :param size:          No. of characters per n-gram.
+    :type  size:          int
+    """
+
+    def __init__(self, possibilities, size=SIZE):
+        self.size = size
+        self.possibilities = list(possibilities)
+        self.lengths = array("i", (len(x) for x in self.possibilities))
+
+        self.by_length = {}
+        self.postings = {}
+        for i, x in enumerate(self.possibilities):
+            self.by_length.setdefault(len(x), array("i")).append(i)
+            for gram in set(ngrams(x, size)):
+                postings = self.postings.get(gram)
+                if postings is None:
+                    postings = self.postings[gram] = array("i")
+                postings.append(i)
+
+    def __len__(self):
+        return len(self.possibilities)
+
+    def __iter__(self):
+        return iter(self.possibilities)
+
+    def candidates(self, word, cutoff):
+        """Return the strings which may have a ratio of at least ``cutoff``
+        with ``word`` in the order they were indexed.
+
+        :param word:   The word to find close matches of.
+        :param cutoff: A float in [0.0, 1.0].
+        """
+
+        la = len(word)
+        grams = {}
+        for gram in ngrams(word, self.size):
+            grams[gram] = grams.get(gram, 0) + 1
+        total = sum(grams.values())
+
+        ids = set()
+
+        # The no. of the word's rarest n-grams one of which is shared by
+        # any string of each length sharing at least the threshold
+        thresholds, prefixes = {}, {}
+        for lb, strings in self.by_length.items():
+            threshold = get_threshold(la, lb, cutoff, self.size)
+            if threshold is None or threshold > total:
+                continue
+            if threshold <= 0:
+                ids.update(strings)
+            else:
+                thresholds[lb] = threshold
+                prefixes[lb] = total - threshold + 1
+
+        postings = dict((gram, self.postings.get(gram, ())) for gram in grams)
+        lengths = self.lengths
+        probed = set()
+        seen = 0
+        for gram in sorted(grams, key=lambda gram: len(postings[gram])):
+            probe = frozenset(lb for lb, prefix in prefixes.items() if prefix > seen)
+            if not probe:
+                break
+            probed.update(i for i in postings[gram] if lengths[i] in probe)
+            seen += grams[gram]
+
+        # Of those only the strings sharing at least the threshold (counting
+        # each of their n-grams which the word has) are candidates
+        size = self.size
+        for i in probed:
+            x = self.possibilities[i]
+            if sum(1 for j in range(len(x) - size + 1) if x[j:j + size] in grams) >= thresholds[len(x)]:
+                ids.add(i)
+
+        return [self.possibilities[i] for i in sorted(ids)]
+
+
+class Strings(object):
+    """Sequence of strings stored UTF-8 encoded in a memory mapped file.
+
+    :param buf:     The memory mapped file.
+    :param base:    The offset of the strings in the file.
+    :param offsets: The offsets of the strings relative to ``base`` (and
+                    of their end).
+    :type  offsets: array
+    """
+
+    def __init__(self, buf, base, offsets):
+        self.buf = buf
+        self.base = base
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buf[self.base + self.offsets[i]:self.base + self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class Postings(object):
+    """Mapping of the n-grams of a :class:`MappedNGramIndex` to the ids
+    of the strings having them, stored in a memory mapped file.
+
+    :param grams:   The n-grams in order.
+    :type  grams:   :class:`Strings`
+
+    :param buf:     The memory mapped file.
+    :param base:    The offset of the postings in the file.
+    :param offsets: The index of the postings of each n-gram (and of
+                    their end).
+    :type  offsets: array
+    """
+
+    def __init__(self, grams, buf, base, offsets):
+        self.grams = grams
+        self.buf = buf
+        self.base = base
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.grams)
+
+    def get(self, gram, default=None):
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return default
+        start, end = self.base + self.offsets[i] * ITEMSIZE, self.base + self.offsets[i + 1] * ITEMSIZE
+        return array("i", self.buf[start:end])
+
+
+class MappedNGramIndex(NGramIndex):
+    """:class:`NGramIndex` of the ``number``-th data set of an index file
+    (see :func:`write_index`), memory mapped instead of built.
+    """
+
+    def __init__(self, filename, number):
+        self.filename = filename
+        self.number = number
+
+        buf, header = map_index(filename)
+        section = header["datasets"][number]
+
+        self.size = header["size"]
+        self.possibilities = read_strings(buf, section["keys"])
+        self.lengths = read_array(buf, section["lengths"])
+        self.by_length = dict((int(lb), read_array(buf, ids)) for lb, ids in section["by_length"].items())
+        self.postings = Postings(
+            read_strings(buf, section["grams"]),
+            buf, section["postings"]["data"][0], read_array(buf, section["postings"]["offsets"])
+        )
+
+    def __reduce__(self):
+        return self.__class__, (self.filename, self.number)
+
+
+class MappedValues(object):
+    """Mapping of the strings of the ``number``-th data set of an index
+    file (see :func:`write_index`) to their values, memory mapped.
+    """
+
+    def __init__(self, filename, number):
+        self.filename = filename
+        self.number = number
+
+        buf, header = map_index(filename)
+        section = header["datasets"][number]
+
+        self._keys = read_strings(buf, section["keys"])
+        self._values = read_strings(buf, section["values"])
+
+    def __reduce__(self):
+        return self.__class__, (self.filename, self.number)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def __getitem__(self, key):
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            raise KeyError(key)
+        return loads(self._values[i])
+
+
+def write_section(f, data):
+    offset = f.tell()
+    f.write(data)
+    return [offset, len(data)]
+
+
+def write_strings(f, strings):
+    offsets, data = array("i", [0]), []
+    for s in strings:
+        s = s.encode("utf-8")
+        data.append(s)
+        offsets.append(offsets[-1] + len(s))
+    return {"data": write_section(f, "".join(data)), "offsets": write_section(f, offsets.tostring())}
+
+
+def read_strings(buf, section):
+    return Strings(buf, section["data"][0], read_array(buf, section["offsets"]))
+
+
+def read_array(buf, section):
+    offset, size = section
+    return array("i", buf[offset:offset + size])
+
+
+def write_index(filename, datasets, size=SIZE, **meta):
+    """Write the n-gram indexes of data sets and their values to a file
+    which is memory mapped by :func:`read_index`.
+
+    :param filename: The file to (over)write.
+    :type  filename: str
+
+    :param datasets: A list of dicts of the strings to index and their
+                     values (stored as JSON).
+    :type  datasets: list
+
+    :param size:     No. of characters per n-gram.
+    :type  size:     int
+
+    :param meta:     Values (JSON serializable) to store in the header of
+                     the file, such as the version of the data indexed.
+    """
+
+    tmpname = "{0:s}.{1:s}.tmp".format(filename, uuid().hex)
+
+    with open(tmpname, "wb") as f:
+        f.write(MAGIC)
+
+        sections = []
+        for dataset in datasets:
+            keys = sorted(dataset)
+            index = NGramIndex(keys, size)
+            grams = sorted(index.postings)
+
+            postings = write_section(f, "".join(index.postings[gram].tostring() for gram in grams))
+            offsets = array("i", [0])
+            for gram in grams:
+                offsets.append(offsets[-1] + len(index.postings[gram]))
+
+            sections.append({
+                "keys": write_strings(f, keys),
+                "values": write_strings(f, (dumps(dataset[key]) for key in keys)),
+                "lengths": write_section(f, index.lengths.tostring()),
+                "by_length": dict((str(lb), write_section(f, ids.tostring())) for lb, ids in index.by_length.items()),
+                "grams": write_strings(f, grams),
+                "postings": {"data": postings, "offsets": write_section(f, offsets.tostring())},
+            })
+
+        header = dict(meta, size=size, byteorder=sys.byteorder, itemsize=ITEMSIZE, datasets=sections)
+
+        offset = f.tell()
+        f.write(dumps(header))
+        f.write("{0:019d}\n".format(offset))
+
+    rename(tmpname, filename)
+
+
+def map_index(filename):
+    """Memory map an index file written by :func:`write_index`. Files
+    are only mapped once per process (unless they change).
+
+    :returns: A 2-item tuple of (buffer, header) of the mapped file and
+              its header.
+    :rtype:   tuple
+
+    :raises ValueError: If the file is not an index file (of this
+                        machine's byte order).
+    """
+
+    info = stat(filename)
+    key = path.abspath(filename)
+
+    with _mapped_lock:
+        mapped = _mapped.get(key)
+        if mapped is not None and mapped[0] == (info.st_size, info.st_mtime):
+            return mapped[1]
+
+        with open(filename, "rb") as f:
+            buf = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+        if buf[:len(MAGIC)] != MAGIC:
+            raise ValueError("{0:s} is not an index file".format(filename))
+
+        offset = int(buf[-20:])
+        header = loads(buf[offset:-20])
+
+        if header["byteorder"] != sys.byteorder or header["itemsize"] != ITEMSIZE:
+            raise ValueError("{0:s} is an index file of another machine".format(filename))
+
+        _mapped[key] = ((info.st_size, info.st_mtime), (buf, header))
+
+        return buf, header
+
+
+def read_index(filename):
+    """Memory map an index file written by :func:`write_index`.
+
+    :returns: A 2-item tuple of (meta, datasets) of the values stored in
+              the header of the file and a list of 2-item tuples of
+              (:class:`MappedValues`, :class:`MappedNGramIndex`) of each
+              data set.
+    :rtype:   tuple
+
+    :raises ValueError: If the file is not an index file (of this
+                        machine's byte order).
+    """
+
+    buf, header = map_index(filename)
+
+    meta = dict((key, value) for key, value in header.items() if key not in ("byteorder", "itemsize", "datasets"))
+    datasets = [(MappedValues(filename, i), MappedNGramIndex(filename, i)) for i in range(len(header["datasets"]))]
+
+    return meta, datasets
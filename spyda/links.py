@@ -0,0 +1,177 @@
+# Module:   links
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Link Extraction
+
+Backends extracting the hrefs of ``<a>`` elements from a page:
+
+- ``lxml``   -- libxml2's HTML parser walked with ``iterlinks()``
+- ``stream`` -- a DOM-free regex tokenizer that only looks at ``<a>``
+  start tags, skipping comments, scripts and styles
+- ``soup``   -- BeautifulSoup via ``lxml.html.soupparser``; the slowest
+  but most forgiving of broken markup
+
+The ``lxml`` and ``stream`` backends fall back to ``soup`` if they
+cannot parse a page.
+
+:class:`LinkParser` extracts the same links as ``lxml`` from a page fed
+to it in chunks as it is downloaded, without building a tree.
+
+Pages given as bytes without a charset are taken to be UTF-8 if they
+are valid UTF-8 (see :func:`get_encoding`).
+"""
+
+
+import re
+from HTMLParser import HTMLParser
+
+
+from lxml.etree import HTMLParser as FeedParser, LxmlError
+from lxml.html import fromstring as lxml_fromstring, HTMLParser as HtmlParser
+from lxml.html.soupparser import fromstring as soup_fromstring
+
+
+BADCHARS = "\"' \v\f\t\n\r"
+
+
+TOKENS = re.compile(
+    r"""<!--.*?-->|<(script|style)\b.*?</\1\s*>|<a\s((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.IGNORECASE | re.DOTALL
+)
+
+ATTRIBUTES = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?""")
+
+unescape = HTMLParser().unescape
+
+
+def soup_links(html):
+    return (tag.get("href") for tag in soup_fromstring(html).cssselect("a"))
+
+
+def get_encoding(html):
+    """Return ``"utf-8"`` if ``html`` is bytes of valid UTF-8 as libxml2
+    assumes latin-1 without a ``<meta>`` charset, otherwise ``None``.
+    """
+
+    if isinstance(html, bytes):
+        try:
+            html.decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+
+def lxml_links(html):
+    encoding = get_encoding(html)
+
+    try:
+        doc = lxml_fromstring(html, parser=HtmlParser(encoding=encoding) if encoding is not None else None)
+    except (ValueError, LxmlError):
+        return soup_links(html)
+
+    return (link for element, attribute, link, pos in doc.iterlinks() if element.tag == "a" and attribute == "href")
+
+
+def tag_href(attributes):
+    for m in ATTRIBUTES.finditer(attributes):
+        if m.group(1).lower() == "href":
+            return m.group(2) or m.group(3) or m.group(4) or ""
+
+
+def stream_links(html):
+    hrefs = [tag_href(m.group(2)) for m in TOKENS.finditer(html) if m.group(2) is not None]
+
+    if isinstance(html, bytes):
+        # Hrefs of bytes are taken to be UTF-8 as by the lxml backend
+        try:
+            hrefs = [href.decode("utf-8") if href is not None else None for href in hrefs]
+        except UnicodeDecodeError:
+            return soup_links(html)
+
+    return iter(unescape(href) if href is not None and "&" in href else href for href in hrefs)
+
+
+class LinkTarget(object):
+    """lxml parser target collecting the hrefs of ``<a>`` elements"""
+
+    def __init__(self):
+        self.hrefs = []
+
+    def start(self, tag, attrib):
+        if tag == "a":
+            self.hrefs.append(attrib.get("href"))
+
+    def close(self):
+        return self.hrefs
+
+
+class LinkParser(object):
+    """Incremental ``lxml`` link extraction.
+
+    :meth:`start` is called with the charset of the page (or ``None``),
+    then :meth:`feed` with each chunk of it. :meth:`close` returns the
+    hrefs or ``None`` if the page could not be parsed (or has non-ascii
+    hrefs and no charset), in which case :func:`get_links` should be
+    used on the whole page instead.
+    """
+
+    def __init__(self, badchars=BADCHARS):
+        self.badchars = badchars
+        self.charset = None
+        self.parser = None
+        self.failed = False
+
+    def start(self, charset=None):
+        self.charset = charset
+        try:
+            self.parser = FeedParser(target=LinkTarget(), encoding=charset)
+        except LookupError:
+            self.failed = True
+
+    def feed(self, data):
+        if self.parser is None or self.failed:
+            return
+
+        try:
+            self.parser.feed(data)
+        except LxmlError:
+            self.failed = True
+
+    def close(self):
+        if self.parser is None or self.failed:
+            return None
+
+        try:
+            hrefs = self.parser.close()
+        except LxmlError:
+            return None
+
+        # Without a charset libxml2 decodes non-ascii hrefs as latin-1
+        if self.charset is None and any(isinstance(href, unicode) for href in hrefs):
+            return None
+
+        return [href.strip(self.badchars) for href in hrefs if href is not None]
+
+
+BACKENDS = {
+    "lxml": lxml_links,
+    "soup": soup_links,
+    "stream": stream_links,
+}
+
+DEFAULT_BACKEND = "lxml"
+
+
+def get_links(html, badchars=BADCHARS, backend=DEFAULT_BACKEND):
+    """Return an iterable of the hrefs of all links in ``html``.
+
+    :param badchars: Characters stripped from both ends of each href.
+    :type  badchars: str
+
+    :param backend:  Name of the backend to use. One of ``BACKENDS``.
+    :type  backend:  str
+    """
+
+    hrefs = BACKENDS[backend](html)
+    return (href.strip(badchars) for href in hrefs if href is not None)
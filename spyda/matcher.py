@@ -3,6 +3,8 @@
 """Entity Matching Tool"""
 
 from glob import glob
+from os import path
+from hashlib import sha1
 from time import clock, time
 from json import dumps, loads
 from functools import partial
@@ -11,9 +13,14 @@ from optparse import OptionParser
 from multiprocessing.pool import Pool
 
 from . import __version__
-from .utils import fetch_url, is_url, get_close_matches, log
-
-USAGE = "%prog [options] [ data | url ] [ sources ]"
+from .index import read_index, write_index, NGramIndex
+from .vectors import get_vector_matches, numpy, VectorIndex
+from .utils import fetch_url, is_url, get_charset, get_close_matches, log
+from .cache import cache_options, configure as configure_cache, get_stats as get_cache_stats, CACHE_OPTIONS
+from .memo import count as memo_count, configure as configure_memo, get_memo, get_stats as get_memo_stats
+from .memo import memo_options, MEMO_OPTIONS, MISSING
+
+USAGE = "%prog [options] [ data | url ] [ sources ]\n       %prog [options] --build-index [ data | url ]"
 VERSION = "%prog v" + __version__
 DESCRIPTION = (
     "Tool to perform entity matching given an input data source and a set of source files. "
@@ -21,10 +28,20 @@ DESCRIPTION = (
     "Example: -m \"first_name,last_name\" "
     "Each set of match keys is joined by a single space and used as a data set to perform "
     "the entity matches again. If multiple match keys are provided then the first matching "
-    "entity found that matches any of the data sets is used."
+    "entity found that matches any of the data sets is used. "
+    "With -i/--index the data sets are memory mapped from an index file which is "
+    "(re)built whenever the data or the match keys change."
 )
 
 
+RATIO, VECTOR = "ratio", "vector"
+
+SCORERS = (RATIO, VECTOR)
+
+
+_datasets = []  # The data sets of a worker process (see init_worker)
+
+
 def parse_options():
     parser = OptionParser(description=DESCRIPTION, usage=USAGE, version=VERSION)
 
@@ -34,12 +51,34 @@ def parse_options():
         help="A cutoff in range [0.0, 1.0] affecting the closness of matches."
     )
 
+    parser.add_option(
+        "", "--scorer",
+        action="store", type="choice", choices=SCORERS, metavar="SCORER", default=RATIO, dest="scorer",
+        help=(
+            "Score matches by SequenceMatcher's ratio (ratio) or by the cosine similarity of character "
+            "n-gram vectors computed with NumPy for all the entities of a source at once (vector), "
+            "which scores lower and needs a lower cutoff (e.g. 0.5). Default: ratio"
+        )
+    )
+
     parser.add_option(
         "-m", "--match-keys",
         action="append", type="string", metavar="MATCH-KEYS", default=None, dest="match_keys",
         help="A comma separated list of keys to match against"
     )
 
+    parser.add_option(
+        "-i", "--index",
+        action="store", type="string", metavar="FILE", default=None, dest="index",
+        help="An index file of the data sets. Defaults to the data file with an .index extension for --build-index"
+    )
+
+    parser.add_option(
+        "", "--build-index",
+        action="store_true", default=False, dest="build_index",
+        help="(Re)build the index file of the data sets and exit"
+    )
+
     parser.add_option(
         "-j", "--jobs",
         action="store", type="int", metavar="JOBS", default=None, dest="jobs",
@@ -70,71 +109,244 @@ def parse_options():
         help="Enable verbose logging"
     )
 
+    cache_options(parser)
+    memo_options(parser)
+
     opts, args = parser.parse_args()
 
-    if len(args) < 2:
+    if len(args) < (1 if opts.build_index else 2):
         parser.print_help()
         raise SystemExit(1)
 
+    if opts.build_index and opts.index is None:
+        if is_url(args[0]):
+            print("ERROR: -i/--index is required to build the index of a url")
+            parser.print_help()
+            raise SystemExit(1)
+        opts.index = "{0:s}.index".format(args[0])
+
     if not opts.match_keys:
         print("ERROR: At least one -m/--match-keys must be a specified.")
         parser.print_help()
         raise SystemExit(1)
 
+    if opts.scorer == VECTOR and numpy is None:
+        print("ERROR: NumPy is required for --scorer=vector")
+        parser.print_help()
+        raise SystemExit(1)
+
     opts.match_keys = list(tuple((x.strip() for x in match_key.split(",") if x)) for match_key in opts.match_keys)
 
     return opts, args
 
 
-def build_datasets(opts, source):
-    records = loads(fetch_url(source)[1] if is_url(source) else open(source, "rb").read())
-    return list(dict(("{0:s} {1:s}".format(*itemgetter(*keys)(record)), record[opts.uri_key]) for record in records) for keys in opts.match_keys)
+def read_source(source):
+    """Return a 2-item tuple of (content, charset) of the bytes of a source
+    and the charset to decode them with (``None`` if unknown).
+    """
+
+    if is_url(source):
+        response, content = fetch_url(source, decode=False)
+        return content, get_charset(response)
+
+    return open(source, "rb").read(), None
+
+
+def load_source(content, charset=None):
+    return loads(content.decode(charset) if charset is not None else content)
+
+
+def get_datasets(opts, records):
+    return list(dict((u"{0:s} {1:s}".format(*itemgetter(*keys)(record)), record[opts.uri_key]) for record in records) for keys in opts.match_keys)
+
+
+def build_datasets(opts, records):
+    return list((dataset, NGramIndex(dataset)) for dataset in get_datasets(opts, records))
+
+
+def load_datasets(opts, source):
+    """Return the data sets memory mapped from the index file ``opts.index``
+    or build them if there is none.
+
+    The index file is (re)built if it was not built from the same version
+    of the source (its size and modification time or the digest of the
+    url's content) with the same match keys or if ``opts.build_index``.
+
+    :returns: A list of 3-item tuples of (name, dataset, index) of the
+              data sets. The name of a data set identifies the version of
+              the source and the keys it was built from.
+    :rtype:   list
+    """
+
+    content = None
+    if is_url(source):
+        content = read_source(source)
+        version = sha1(content[0]).hexdigest()
+    else:
+        version = [path.getsize(source), path.getmtime(source)]
+
+    meta = loads(dumps({"source": source, "version": version, "match_keys": opts.match_keys, "uri_key": opts.uri_key}))
+
+    digest = sha1(dumps(meta, sort_keys=True)).hexdigest()
+    names = ["{0:s}:{1:d}".format(digest, i) for i in range(len(opts.match_keys))]
+
+    datasets = None
 
+    if opts.index is None:
+        datasets = build_datasets(opts, load_source(*(content or read_source(source))))
+    elif not opts.build_index and path.exists(opts.index):
+        try:
+            header, datasets = read_index(opts.index)
+            if not all(header.get(key) == value for key, value in meta.items()):
+                datasets = None
+        except (EnvironmentError, ValueError) as e:
+            log("Error Reading Index {0:s} {1:s}", opts.index, e)
+
+    if datasets is None:
+        opts.verbose and log("Building Index: {0:s}", opts.index)
+
+        records = load_source(*(content or read_source(source)))
+        write_index(opts.index, get_datasets(opts, records), **meta)
+
+        datasets = read_index(opts.index)[1]
+
+    return list((name, dataset, index) for name, (dataset, index) in zip(names, datasets))
+
+
+def init_worker(datasets):
+    """Initialize a worker process with the data sets to match against.
+
+    The data sets are given to each worker once, inherited when it is
+    forked, instead of being pickled with every chunk of tasks.
+    """
+
+    global _datasets
+    _datasets = datasets
+
+
+def match(opts, name, dataset, index, entities):
+    """Return the best matches of entities in a data set, memoized.
+
+    :param index: The :class:`~spyda.index.NGramIndex` (or with the
+                  vector scorer the :class:`~spyda.vectors.VectorIndex`)
+                  of the data set.
+
+    :returns: A dict of each entity's best match as a 3-item tuple of
+              (match, score, uri) or ``None``.
+    :rtype:   dict
+    """
+
+    memo = get_memo()
+
+    best, missing = {}, []
+    for entity in entities:
+        value = memo.get((entity, opts.cutoff, opts.scorer, name), MISSING)
+        if value is MISSING:
+            missing.append(entity)
+        else:
+            best[entity] = value
+
+    if opts.scorer == VECTOR:
+        results = get_vector_matches(missing, index, n=1, cutoff=opts.cutoff)
+    else:
+        results = [get_close_matches(entity, index, cutoff=opts.cutoff) for entity in missing]
+
+    for entity, matches in zip(missing, results):
+        best[entity] = (matches[0][0], matches[0][1], dataset[matches[0][0]]) if matches else None
+        memo.put((entity, opts.cutoff, opts.scorer, name), best[entity])
+
+    return best
+
+
+def job(opts, source):
+    """Match the entities of a source.
+
+    :returns: A 3-item tuple of (success, source, stats) of whether the
+              source was processed and the statistics of the memo while
+              processing it (to add to those of the main process).
+    :rtype:   tuple
+    """
+
+    stats = get_memo_stats()
 
-def job(opts, datasets, source):
     try:
         opts.verbose and log("Processing: {0:s}", source)
 
         data = loads(open(source, "rb").read())
         source_entities = data.get(opts.source_key, [])
 
-        matched_entities = []
-
+        # Each distinct entity is matched against the first data set it matches
+        best, seen, unmatched = {}, set(), []
         for entity in source_entities:
-            for dataset in datasets:
-                matches = get_close_matches(entity, dataset.keys(), cutoff=opts.cutoff)
-                match, score = matches[0] if matches else (None, None)
-                if match is not None:
-                    matched_entities.append((match, score, dataset[match]))
-                    break
+            if entity not in seen:
+                seen.add(entity)
+                unmatched.append(entity)
+
+        for name, dataset, index in _datasets:
+            if not unmatched:
+                break
+            matches = match(opts, name, dataset, index, unmatched)
+            best.update((entity, value) for entity, value in matches.items() if value is not None)
+            unmatched = [entity for entity in unmatched if entity not in best]
 
-        data[opts.output_key] = list({"name": match, "score": score, "uri": uri} for name, score, uri in matched_entities)
+        get_memo().flush()
+
+        matched_entities = [best[entity] for entity in source_entities if entity in best]
+
+        data[opts.output_key] = list({"name": name, "score": score, "uri": uri} for name, score, uri in matched_entities)
 
         open(source, "wb").write(dumps(data))
 
-        return True, source
+        success = True
     except Exception as e:
         log("Error Processing {0:s} {1:s}", source, e)
-        return False, source
+        success = False
+
+    stats = dict((key, value - stats[key]) for key, value in get_memo_stats().items() if key != "hit_rate")
+
+    return success, source, stats
 
 
 def main():
     opts, args = parse_options()
 
-    datasets = build_datasets(opts, args[0])
+    configure_cache(**dict((key, getattr(opts, key)) for key in CACHE_OPTIONS))
+    configure_memo(**dict((key, getattr(opts, key)) for key in MEMO_OPTIONS))
+
+    datasets = load_datasets(opts, args[0])
+    if opts.build_index:
+        return
+
+    if opts.scorer == VECTOR:
+        datasets = [(name, dataset, VectorIndex(index)) for name, dataset, index in datasets]
+
     sources = glob(args[1])
 
     stime = time()
 
-    pool = Pool(opts.jobs)
+    pool = Pool(opts.jobs, init_worker, (datasets,))
+
+    results = pool.map(partial(job, opts), sources)
 
-    pool.map(partial(job, opts, datasets), sources)
+    [memo_count(key, value) for success, source, stats in results for key, value in stats.items()]
 
     cputime = clock()
     duration = time() - stime
 
     opts.verbose and log("Processed in in {0:0.2f}s using {1:0.2f}s of CPU time.", duration, cputime)
 
+    stats = get_cache_stats()
+    opts.verbose and opts.cache_dir is not None and log(
+        "{0:d} responses served from cache, {1:d} fetched ({2:d} stored, {3:d} evicted)",
+        stats["hits"], stats["misses"], stats["stores"], stats["evictions"]
+    )
+
+    stats = get_memo_stats()
+    opts.verbose and log(
+        "{0:d} entity matches memoized, {1:d} computed ({2:0.1f}% hit rate)",
+        stats["hits"], stats["misses"], stats["hit_rate"] * 100
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,210 @@
+# Module:   memo
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Match Memo
+
+Memoizes the best match of entities in the data sets of the matcher,
+as the same entities (people, organisations) recur across thousands of
+documents. Matches are kept in a bounded LRU cache in each process and
+optionally in an SQLite database which is shared by the worker
+processes of a run and kept for later runs.
+
+Matches are keyed by the entity, the cutoff, the scorer and the name of
+the data set, which identifies the version of the data it was built
+from (see :func:`spyda.matcher.load_datasets`).
+"""
+
+
+import sqlite3
+from os import getpid
+from json import dumps, loads
+from threading import Lock
+from optparse import OptionGroup
+
+from .utils import LRUCache
+
+
+SIZE = 100000  # Maximum no. of matches memoized in memory per process
+
+
+MEMO_OPTIONS = ("memo_size", "memo_file")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+MISSING = object()
+
+
+_lock = Lock()
+_memo = None
+_options = {
+    "memo_size": SIZE,
+    "memo_file": None,
+}
+
+_stats_lock = Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+class Memo(object):
+    """Memo of the best matches of entities.
+
+    :param size:     Maximum no. of matches kept in memory.
+    :type  size:     int
+
+    :param filename: An SQLite database to also keep matches in or
+                     ``None``.
+    :type  filename: str or None
+    """
+
+    def __init__(self, size=SIZE, filename=None):
+        self.cache = LRUCache(size)
+
+        self.db = None
+        if filename is not None:
+            self.db = sqlite3.connect(filename, timeout=60)
+            with self.db:
+                self.db.executescript(SCHEMA)
+
+    def get(self, key, default=None):
+        """Return the match memoized for a key or ``default``.
+
+        :param key: A tuple of (entity, cutoff, scorer, dataset).
+        """
+
+        value = self.cache.get(key, MISSING)
+
+        if value is MISSING and self.db is not None:
+            row = self.db.execute("SELECT value FROM matches WHERE key = ?", (dumps(key),)).fetchone()
+            if row is not None:
+                value = loads(row[0])
+                value = tuple(value) if value is not None else None
+                self.cache[key] = value
+
+        if value is MISSING:
+            count("misses")
+            return default
+
+        count("hits")
+
+        return value
+
+    def put(self, key, value):
+        """Memoize the match of a key.
+
+        :param key:   A tuple of (entity, cutoff, scorer, dataset).
+        :param value: A tuple of (match, score, uri) or ``None`` if there
+                      is no match.
+        """
+
+        self.cache[key] = value
+
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO matches (key, value) VALUES (?, ?)", (dumps(key), dumps(value)))
+
+    def flush(self):
+        """Commit the matches memoized since the last flush to the database"""
+
+        if self.db is not None:
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+
+
+def configure(**options):
+    """Configure the shared memo.
+
+    :param memo_size: Maximum no. of matches kept in memory per process.
+    :type  memo_size: int
+
+    :param memo_file: An SQLite database to also keep matches in or
+                      ``None``.
+    :type  memo_file: str or None
+    """
+
+    global _memo
+
+    with _lock:
+        _options.update(options)
+        if _memo is not None:
+            _memo[1].close()
+            _memo = None
+
+
+def get_memo():
+    """Return the shared memo.
+
+    Each process has its own memo (and connection to the database).
+    """
+
+    global _memo
+
+    with _lock:
+        if _memo is None or _memo[0] != getpid():
+            _memo = getpid(), Memo(_options["memo_size"], _options["memo_file"])
+
+        return _memo[1]
+
+
+def get_stats():
+    """Return statistics of the shared memo.
+
+    :returns: A dict of the no. of matches memoized (``hits``) and not
+              (``misses``) and the ``hit_rate`` (0.0 to 1.0).
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        stats = _stats.copy()
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = float(stats["hits"]) / lookups if lookups else 0.0
+
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def memo_options(parser):
+    group = OptionGroup(
+        parser,
+        "Memo Options",
+        "These options control the memo of the matches of entities "
+        "which recur across the sources."
+    )
+
+    group.add_option(
+        "", "--memo-size",
+        action="store", type="int", metavar="SIZE", default=SIZE, dest="memo_size",
+        help="Maximum no. of matches memoized in memory per job, 0 to disable (Default: {0:d})".format(SIZE)
+    )
+
+    group.add_option(
+        "", "--memo-file",
+        action="store", type="string", metavar="FILE", default=None, dest="memo_file",
+        help="Also memoize matches in FILE, shared by the jobs and kept for later runs"
+    )
+
+    parser.add_option_group(group)
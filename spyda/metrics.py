@@ -0,0 +1,301 @@
+# Module:   metrics
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Crawl Metrics
+
+Optional instrumentation of the phases of a crawl: fetching a page
+(including any incremental parsing of it), decoding it to unicode,
+parsing its links, normalizing and matching each link against the url
+rules and the HEAD request made per link. Each phase records its
+latencies in a histogram and the crawl counts pages, links, urls and
+errors.
+
+Once enabled with :func:`configure` the metrics, together with the
+connection, cache, duplicate, normalization and WARC statistics, are
+written to a file as JSON or in the Prometheus text exposition format
+every ``interval`` seconds and when the crawl ends. The file is
+replaced atomically so it can be read or scraped at any time.
+
+With a sharded crawl (see :mod:`spyda.shards`) the metrics of the
+worker processes are merged when they finish.
+"""
+
+
+from json import dumps
+from os import rename
+from bisect import bisect_left
+from optparse import OptionGroup
+from time import time
+from threading import Event, Lock, Thread
+
+
+PHASES = ("fetch", "decode", "parse", "normalize", "match", "head")
+
+COUNTERS = ("pages", "links", "urls", "errors")
+
+# Upper bounds in seconds of the histogram buckets
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FORMATS = ("json", "prometheus")
+
+INTERVAL = 10.0  # Seconds between writes of the metrics file
+
+
+METRICS_OPTIONS = ("metrics", "metrics_format", "metrics_interval")
+
+
+class Histogram(object):
+    """Latency histogram with fixed ``BUCKETS``"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def merge(self, other):
+        """Add the observations of a dict returned by :meth:`to_dict`"""
+
+        for i, n in enumerate(other["counts"]):
+            self.counts[i] += n
+        self.sum += other["sum"]
+        self.count += other["count"]
+
+    def cumulative(self):
+        """Return a list of 2-item tuples of (upper bound, no. of observations <= it)"""
+
+        total, result = 0, []
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return {"counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+_lock = Lock()
+_enabled = False
+_histograms = dict((phase, Histogram()) for phase in PHASES)
+_counters = dict((key, 0) for key in COUNTERS)
+_reporter = None
+
+
+def enabled():
+    """Return ``True`` if timings are being recorded"""
+
+    return _enabled
+
+
+def observe(phase, seconds):
+    with _lock:
+        _histograms[phase].observe(seconds)
+
+
+def count(key, n=1):
+    with _lock:
+        _counters[key] += n
+
+
+def get_stats():
+    """Return the recorded metrics.
+
+    :returns: A dict of the ``counters`` and the ``histograms`` of each
+              phase as dicts of their bucket ``counts``, ``sum`` and
+              ``count``.
+    :rtype:   dict
+    """
+
+    with _lock:
+        return {
+            "counters": _counters.copy(),
+            "histograms": dict((phase, histogram.to_dict()) for phase, histogram in _histograms.items()),
+        }
+
+
+def merge_stats(stats):
+    """Add metrics returned by :func:`get_stats` in another process"""
+
+    with _lock:
+        for key, value in stats["counters"].items():
+            _counters[key] += value
+        for phase, histogram in stats["histograms"].items():
+            _histograms[phase].merge(histogram)
+
+
+def reset_stats():
+    with _lock:
+        for key in _counters:
+            _counters[key] = 0
+        for phase in _histograms:
+            _histograms[phase] = Histogram()
+
+
+def snapshot():
+    """Return the recorded metrics and the statistics of the other
+    modules as a dict of ``counters`` and ``histograms``
+    (:class:`Histogram` objects).
+    """
+
+    from . import cache, dedup, normalize, sessions, warc
+
+    counters = {}
+
+    for module in (sessions, cache, dedup, normalize, warc):
+        name = module.__name__.rsplit(".", 1)[1]
+        for key, value in module.get_stats().items():
+            if isinstance(value, int):
+                counters["{0:s}_{1:s}".format(name, key)] = value
+
+    with _lock:
+        counters.update(_counters)
+        histograms = {}
+        for phase, histogram in _histograms.items():
+            histograms[phase] = Histogram()
+            histograms[phase].merge(histogram.to_dict())
+
+    return {"counters": counters, "histograms": histograms}
+
+
+def to_json(metrics):
+    return dumps({
+        "time": time(),
+        "counters": metrics["counters"],
+        "histograms": dict(
+            (phase, {
+                "buckets": [["+Inf" if bound == float("inf") else bound, n] for bound, n in histogram.cumulative()],
+                "sum": histogram.sum,
+                "count": histogram.count,
+            })
+            for phase, histogram in metrics["histograms"].items()
+        ),
+    }, indent=2, sort_keys=True)
+
+
+def to_prometheus(metrics):
+    lines = []
+
+    for key, value in sorted(metrics["counters"].items()):
+        name = "spyda_{0:s}_total".format(key)
+        lines.append("# TYPE {0:s} counter".format(name))
+        lines.append("{0:s} {1:d}".format(name, value))
+
+    lines.append("# HELP spyda_phase_seconds Time spent in each phase of the crawl.")
+    lines.append("# TYPE spyda_phase_seconds histogram")
+    for phase in PHASES:
+        histogram = metrics["histograms"][phase]
+        for bound, n in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append("spyda_phase_seconds_bucket{{phase=\"{0:s}\",le=\"{1:s}\"}} {2:d}".format(phase, le, n))
+        lines.append("spyda_phase_seconds_sum{{phase=\"{0:s}\"}} {1:s}".format(phase, repr(histogram.sum)))
+        lines.append("spyda_phase_seconds_count{{phase=\"{0:s}\"}} {1:d}".format(phase, histogram.count))
+
+    return "\n".join(lines) + "\n"
+
+
+def write(filename, format="json"):
+    """Write the current metrics to ``filename`` in ``format`` (one of ``FORMATS``)"""
+
+    metrics = snapshot()
+    data = to_json(metrics) if format == "json" else to_prometheus(metrics)
+
+    tmpname = "{0:s}.tmp".format(filename)
+    with open(tmpname, "w") as f:
+        f.write(data)
+    rename(tmpname, filename)
+
+
+class Reporter(Thread):
+    """Thread writing the metrics to ``filename`` every ``interval`` seconds"""
+
+    def __init__(self, filename, format="json", interval=INTERVAL):
+        super(Reporter, self).__init__()
+        self.daemon = True
+
+        self.filename = filename
+        self.format = format
+        self.interval = interval
+
+        self.stopped = Event()
+
+    def run(self):
+        # Event.wait() only returns the flag since Python 2.7
+        while not self.stopped.is_set():
+            self.stopped.wait(self.interval)
+            write(self.filename, self.format)
+
+    def stop(self):
+        """Stop the thread and write the final metrics"""
+
+        self.stopped.set()
+        self.join()
+        write(self.filename, self.format)
+
+
+def configure(metrics=None, metrics_format="json", metrics_interval=INTERVAL):
+    """Enable recording of metrics and start writing them to a file.
+
+    :param metrics:          File to write the metrics to or ``None``
+                             to disable metrics.
+    :type  metrics:          str or None
+
+    :param metrics_format:   Format of the file. One of ``FORMATS``.
+    :type  metrics_format:   str
+
+    :param metrics_interval: Seconds between writes of the file.
+    :type  metrics_interval: float
+    """
+
+    global _enabled, _reporter
+
+    stop()
+
+    _enabled = metrics is not None
+
+    if _enabled:
+        _reporter = Reporter(metrics, metrics_format, metrics_interval)
+        _reporter.start()
+
+
+def stop():
+    """Stop writing metrics, writing them a last time"""
+
+    global _reporter
+
+    if _reporter is not None:
+        _reporter.stop()
+        _reporter = None
+
+
+def metrics_options(parser):
+    group = OptionGroup(
+        parser,
+        "Metrics Options",
+        "These options record the time spent in each phase of the "
+        "crawl and write it with other counters to a file at intervals."
+    )
+
+    group.add_option(
+        "", "--metrics",
+        action="store", type="string", metavar="PATH", default=None, dest="metrics",
+        help="Write metrics to PATH"
+    )
+
+    group.add_option(
+        "", "--metrics-format",
+        action="store", type="choice", choices=FORMATS, metavar="FORMAT", default="json", dest="metrics_format",
+        help="Format of the metrics: json or prometheus (Default: json)"
+    )
+
+    group.add_option(
+        "", "--metrics-interval",
+        action="store", type="float", metavar="SECONDS", default=INTERVAL, dest="metrics_interval",
+        help="Seconds between writes of the metrics (Default: {0:0.0f})".format(INTERVAL)
+    )
+
+    parser.add_option_group(group)
@@ -0,0 +1,134 @@
+# Module:   normalize
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""URL Normalization
+
+Resolves the hrefs found on a page against the page's url and
+normalizes them (fragment removed, canonical form) as the crawler does
+for every link. Results are memoized in an LRU cache keyed by (base,
+href) so that the navigation and footer links repeated on every page of
+a site are only normalized once.
+
+The key only holds the part of the base url the href depends on, so
+entries are shared across pages: nothing for absolute hrefs (which also
+skip the join), the scheme for ``//host/path`` hrefs, the scheme and
+host for ``/path`` hrefs and the base's directory for relative paths.
+"""
+
+
+import re
+from threading import Lock
+from urlparse import urlsplit
+
+
+from url import parse as parse_url
+
+
+from .utils import LRUCache
+
+
+SIZE = 10000  # No. of normalized urls to cache
+
+
+ABSOLUTE = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+
+_stats_lock = Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+class Normalizer(object):
+    """Memoizing url normalizer.
+
+    :param size: Maximum no. of normalized urls to cache.
+                 0 disables caching.
+    :type  size: int
+    """
+
+    def __init__(self, size=SIZE):
+        self.cache = LRUCache(size)
+
+        self.base = None
+        self.base_keys = None
+
+    def _base_keys(self, base):
+        if base is not self.base:
+            url = base.utf8()
+            scheme, netloc, path, query, fragment = urlsplit(url)
+            origin = "{0:s}://{1:s}".format(scheme, netloc)
+            self.base = base
+            self.base_keys = url, origin + path[:path.rfind("/") + 1], origin, scheme
+        return self.base_keys
+
+    def normalize(self, base, href):
+        """Return a 2-item tuple of (url, str) of ``href`` resolved
+        against the parsed url ``base``, without its fragment and in
+        canonical form.
+
+        The returned url object may be shared between calls and must
+        not be modified.
+        """
+
+        absolute = ABSOLUTE.match(href) is not None
+
+        if absolute:
+            key = href
+        else:
+            url, directory, origin, scheme = self._base_keys(base)
+            if href[:2] == "//":
+                key = scheme, href
+            elif href[:1] == "/":
+                key = origin, href
+            elif not href or href[0] in "?#":
+                key = url, href
+            else:
+                key = directory, href
+
+        result = self.cache.get(key)
+        if result is None:
+            url = (parse_url(href) if absolute else base.relative(href)).defrag().canonical()
+            result = self.cache[key] = url, url.utf8()
+
+        return result
+
+    def close(self):
+        """Add this normalizer's cache hits and misses to the totals
+        returned by :func:`get_stats`.
+        """
+
+        count("hits", self.cache.hits)
+        count("misses", self.cache.misses)
+
+        self.cache.hits = self.cache.misses = 0
+
+
+def get_stats():
+    """Return cache statistics of all closed Normalizers.
+
+    :returns: A dict of the no. of ``hits`` and ``misses`` and the
+              ``hit_rate`` (0.0 to 1.0).
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        stats = _stats.copy()
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = float(stats["hits"]) / lookups if lookups else 0.0
+
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,194 @@
+# Module:   rules
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""URL Rules
+
+Matches urls against the crawler's patterns, blacklist and whitelist
+in a single pass. The regexes of each list are joined into one
+alternation and the three alternations into a single regex of
+optional lookaheads with a named group each, so one ``match()`` call
+answers all three questions. When every regex of a list starts with a
+literal prefix, a trie of those prefixes rules out most non-matching
+urls without running the regex at all.
+
+:class:`Scorer` ranks urls for a best-first crawl by how close they are
+to the patterns, their link depth and whether they are on the root
+url's host.
+"""
+
+
+import re
+from os.path import commonprefix
+
+
+METACHARS = ".^$*+?{}[]|()"
+
+GROUPS = ("_patterns", "_blacklist", "_whitelist")
+
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+MATCH = 10.0    # Score bonus of urls matching a pattern
+PREFIX = 5.0    # Score bonus of urls sharing all of a pattern's prefix
+OFFSITE = 1.0   # Score penalty of urls not on the root url's host
+
+
+def literal_prefix(regex):
+    """Return the literal text any string matched by ``regex`` starts with.
+
+    Returns an empty string if there is no such prefix or it cannot be
+    determined.
+    """
+
+    if "|" in regex or "(?" in regex:
+        return ""
+
+    i = 1 if regex.startswith("^") else 0
+    prefix = []
+
+    while i < len(regex):
+        c = regex[i]
+        if c == "\\":
+            if i + 1 >= len(regex) or regex[i + 1].isalnum():
+                break
+            c = regex[i + 1]
+            i += 1
+        elif c in "*?{":
+            prefix = prefix[:-1]
+            break
+        elif c in METACHARS:
+            break
+
+        prefix.append(c)
+        i += 1
+
+    return "".join(prefix)
+
+
+class PrefixTrie(object):
+    """Trie of strings answering whether any of them is a prefix of a string"""
+
+    def __init__(self, prefixes):
+        self.root = {}
+
+        for prefix in prefixes:
+            node = self.root
+            for c in prefix:
+                node = node.setdefault(c, {})
+            node[None] = True
+
+    def match(self, s):
+        node = self.root
+        for c in s:
+            if None in node:
+                return True
+            node = node.get(c)
+            if node is None:
+                return False
+        return None in node
+
+
+class Rules(object):
+    """Compiled url patterns, blacklist and whitelist.
+
+    :param patterns:  A list of regex patterns to match urls against.
+    :param blacklist: A list of regexes of urls not to traverse.
+    :param whitelist: A list of regexes of blacklisted urls to traverse.
+
+    Regexes are matched at the start of the url as with ``re.match``.
+    """
+
+    def __init__(self, patterns=None, blacklist=None, whitelist=None):
+        self.lists = tuple(list(regexes or ()) for regexes in (patterns, blacklist, whitelist))
+        self.regexes = tuple([re.compile(regex) for regex in regexes] for regexes in self.lists)
+
+        self.tries = []
+        for regexes in self.lists:
+            prefixes = [literal_prefix(regex) for regex in regexes]
+            self.tries.append(PrefixTrie(prefixes) if regexes and all(prefixes) else None)
+
+        self.combined = self._combine()
+
+    def _combine(self):
+        regexes = [regex for regexes in self.lists for regex in regexes]
+        if not regexes or any(BACKREFERENCE.search(regex) for regex in regexes):
+            return None
+
+        try:
+            return re.compile("".join(
+                "(?:(?=(?P<{0:s}>{1:s})))?".format(group, "|".join("(?:{0:s})".format(regex) for regex in regexes))
+                for group, regexes in zip(GROUPS, self.lists) if regexes
+            ))
+        except (re.error, AssertionError):  # Python 2 allows at most 100 groups
+            return None
+
+    def match(self, url):
+        """Match a url against the rules.
+
+        :returns: A 3-item tuple of (found, blacklisted, whitelisted).
+                  found is ``True`` if there are no patterns or the url
+                  matches one of them.
+        :rtype:   tuple
+        """
+
+        candidates = [
+            bool(regexes) and (trie is None or trie.match(url))
+            for regexes, trie in zip(self.lists, self.tries)
+        ]
+
+        if not (candidates[0] or candidates[1] or candidates[2]):
+            matches = candidates
+        elif self.combined is not None:
+            groups = self.combined.match(url).groupdict()
+            matches = [groups.get(group) is not None for group in GROUPS]
+        else:
+            matches = [
+                candidate and any(regex.match(url) is not None for regex in regexes)
+                for candidate, regexes in zip(candidates, self.regexes)
+            ]
+
+        return (not self.lists[0] or matches[0]), matches[1], matches[2]
+
+
+class Scorer(object):
+    """Score urls for a best-first crawl, lower scores first.
+
+    A url scores its link depth less ``MATCH`` if it matches one of the
+    patterns, or else less up to ``PREFIX`` for the fraction of the
+    longest literal pattern prefix it shares, plus ``OFFSITE`` if it is
+    not on the host of ``root_url``. Without patterns urls are crawled
+    breadth first, the root url's host first.
+
+    :param patterns: A list of regex patterns to match urls against.
+    :type  patterns: list or None
+
+    :param root_url: The parsed root url of the crawl.
+    """
+
+    def __init__(self, patterns=None, root_url=None):
+        self.rules = Rules(patterns)
+        self.prefixes = [prefix for prefix in (literal_prefix(regex) for regex in patterns or ()) if prefix]
+        self.host = (root_url._host, root_url._port) if root_url is not None else None
+
+    def proximity(self, url):
+        """Return the largest fraction (0.0 to 1.0) of a pattern prefix ``url`` starts with"""
+
+        return max([
+            float(len(commonprefix([url, prefix]))) / len(prefix)
+            for prefix in self.prefixes
+        ] or [0.0])
+
+    def __call__(self, url, depth):
+        _url = url.utf8()
+        score = float(depth)
+
+        if self.rules.lists[0]:
+            if self.rules.match(_url)[0]:
+                score -= MATCH
+            else:
+                score -= PREFIX * self.proximity(_url)
+
+        if self.host is not None and (url._host, url._port) != self.host:
+            score += OFFSITE
+
+        return score
@@ -0,0 +1,203 @@
+# Module:   sessions
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""HTTP Sessions
+
+A single requests Session is shared by the crawler, extractor and
+matcher so that connections to each host are pooled and kept alive
+across requests instead of opening a new TCP (and TLS) connection for
+every request.
+"""
+
+
+from os import getpid
+from threading import Lock
+from optparse import OptionGroup
+
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.poolmanager import PoolManager
+
+
+POOL_CONNECTIONS = 10  # No. of hosts to keep connection pools for
+POOL_MAXSIZE = 10      # No. of connections to keep alive per host
+
+
+SESSION_OPTIONS = ("pool_connections", "pool_maxsize", "keep_alive")
+
+
+_lock = Lock()
+_session = None
+_options = {
+    "pool_connections": POOL_CONNECTIONS,
+    "pool_maxsize": POOL_MAXSIZE,
+    "keep_alive": True,
+}
+
+_stats_lock = Lock()
+_stats = {
+    "requests": 0,
+    "connections": 0,
+    "received": 0,
+    "decoded": 0,
+    "saved": 0,
+    "aborted": 0,
+}
+
+_connection_classes = {}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+class CountingConnection(object):
+    """Connection mixin counting every (re)connect to a host"""
+
+    def connect(self):
+        count("connections")
+        return super(CountingConnection, self).connect()
+
+
+def counting_connection(cls):
+    if cls not in _connection_classes:
+        _connection_classes[cls] = type("Counting{0:s}".format(cls.__name__), (CountingConnection, cls), {})
+    return _connection_classes[cls]
+
+
+class CountingPoolManager(PoolManager):
+
+    def _new_pool(self, scheme, host, port):
+        pool = super(CountingPoolManager, self)._new_pool(scheme, host, port)
+        pool.ConnectionCls = counting_connection(pool.ConnectionCls)
+        return pool
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter counting requests and the connections opened for them"""
+
+    def init_poolmanager(self, connections, maxsize, block=False):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+
+        self.poolmanager = CountingPoolManager(num_pools=connections, maxsize=maxsize, block=block)
+
+    def send(self, request, **kwargs):
+        count("requests")
+        return super(PooledAdapter, self).send(request, **kwargs)
+
+
+def new_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, keep_alive=True):
+    """Create a new Session with the given connection pool settings.
+
+    :param pool_connections: No. of hosts to keep connection pools for.
+    :type  pool_connections: int
+
+    :param pool_maxsize:     No. of connections to keep alive per host.
+    :type  pool_maxsize:     int
+
+    :param keep_alive:       If ``False`` connections are closed after
+                             each request.
+    :type  keep_alive:       bool
+    """
+
+    session = Session()
+
+    adapter = PooledAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def configure(**options):
+    """Configure the shared Session. See :func:`new_session` for options.
+
+    Any existing shared Session is closed and replaced.
+    """
+
+    global _session
+
+    with _lock:
+        _options.update(options)
+        if _session is not None:
+            _session[1].close()
+            _session = None
+
+
+def get_session():
+    """Return the shared Session creating it if necessary.
+
+    Each process gets its own Session as pooled connections cannot be
+    shared with forked processes.
+    """
+
+    global _session
+
+    with _lock:
+        if _session is None or _session[0] != getpid():
+            _session = getpid(), new_session(**_options)
+        return _session[1]
+
+
+def get_stats():
+    """Return connection statistics of all Sessions.
+
+    :returns: A dict of the no. of ``requests`` made, ``connections``
+              opened and connections ``reused`` for them, the no. of
+              bytes of response bodies ``received`` on the wire and
+              ``decoded`` from them (uncompressed), the no. of bodies
+              not downloaded in full (``aborted``) and the no. of bytes
+              ``saved`` by not downloading them as far as known from
+              their Content-Length.
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        stats = _stats.copy()
+
+    stats["reused"] = max(stats["requests"] - stats["connections"], 0)
+
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def session_options(parser):
+    group = OptionGroup(
+        parser,
+        "Connection Options",
+        "These options control the pool of keep-alive "
+        "connections shared by all requests."
+    )
+
+    group.add_option(
+        "", "--pool-size",
+        action="store", type="int", metavar="SIZE", default=POOL_MAXSIZE, dest="pool_maxsize",
+        help="Maximum no. of connections to keep alive per host"
+    )
+
+    group.add_option(
+        "", "--pool-hosts",
+        action="store", type="int", metavar="HOSTS", default=POOL_CONNECTIONS, dest="pool_connections",
+        help="Maximum no. of hosts to keep connection pools for"
+    )
+
+    group.add_option(
+        "", "--no-keep-alive",
+        action="store_false", default=True, dest="keep_alive",
+        help="Close connections after each request"
+    )
+
+    parser.add_option_group(group)
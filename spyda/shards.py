@@ -0,0 +1,233 @@
+# Module:   shards
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Sharded Crawling
+
+Runs a crawl across several worker processes so that fetching and
+parsing scale beyond a single core. Hosts are partitioned between the
+workers by a hash of their name and port; each worker runs
+:func:`~spyda.crawler.crawl_iter` with its own frontier and only
+crawls the hosts it owns. Links to hosts owned by another worker are
+forwarded to it over a queue, once per url and batched per page, and
+results are sent back to the coordinating process which merges them.
+
+The crawl ends when no page is being fetched, no link is being
+forwarded and every frontier is empty (or the page limit
+``max_pages`` has been reached). These counts are kept in shared memory
+and updated atomically as work moves between workers.
+"""
+
+
+from zlib import crc32
+from Queue import Empty
+from threading import Thread
+from multiprocessing import Array, Process, Queue
+
+
+from .frontier import get_host
+from . import cache, dedup, metrics, normalize, sessions, warc
+
+
+POLL = 0.1  # Seconds between checks of whether the crawl has ended
+
+
+ACTIVE, QUEUED, FETCHED = range(3)
+
+
+def get_shard(url, workers):
+    """Return the index of the worker owning the host of a parsed url"""
+
+    host, port = get_host(url)
+    return (crc32("{0:s}:{1}".format(host, port)) & 0xffffffff) % workers
+
+
+class Shard(object):
+    """A worker's view of a sharded crawl.
+
+    :param index:   Index of this worker.
+    :param inboxes: Queue of forwarded links of each worker.
+    :param results: Queue of results sent to the coordinator.
+    :param counts:  Shared Array of the no. of pages and links in
+                    flight, urls queued and pages fetched.
+    """
+
+    def __init__(self, index, inboxes, results, counts):
+        self.index = index
+        self.inboxes = inboxes
+        self.results = results
+        self.counts = counts
+
+        self.forwarded = set()
+        self.outgoing = {}
+
+    def owns(self, url):
+        return get_shard(url, len(self.inboxes)) == self.index
+
+    def forward(self, url, depth):
+        """Forward a parsed url found at link depth ``depth`` to the
+        worker owning its host.
+
+        Urls are sent by :meth:`done` and each url is only sent once.
+        """
+
+        _url = url.utf8()
+        if _url not in self.forwarded:
+            self.forwarded.add(_url)
+            self.outgoing.setdefault(get_shard(url, len(self.inboxes)), []).append((_url, depth))
+
+    def flush(self):
+        if not self.outgoing:
+            return
+
+        with self.counts.get_lock():
+            self.counts[ACTIVE] += len(self.outgoing)
+
+        for index, urls in self.outgoing.items():
+            self.inboxes[index].put(urls)
+
+        self.outgoing = {}
+
+    def take(self, max_pages=0):
+        """Account for a url taken from the frontier to be fetched.
+
+        Returns ``False`` if ``max_pages`` pages have been fetched.
+        """
+
+        with self.counts.get_lock():
+            if max_pages and self.counts[FETCHED] >= max_pages:
+                return False
+            self.counts[FETCHED] += 1
+            self.counts[QUEUED] -= 1
+            self.counts[ACTIVE] += 1
+            return True
+
+    def done(self, queued):
+        """Account for a fetched page or forwarded links that have been
+        processed, adding ``queued`` urls to the frontier, and send the
+        links to forward.
+        """
+
+        self.flush()
+
+        with self.counts.get_lock():
+            self.counts[QUEUED] += queued
+            self.counts[ACTIVE] -= 1
+
+    def listen(self, results):
+        """Put links forwarded to this worker into ``results`` as
+        ``(None, urls, None, None)`` and ``(None, None, None, None)``
+        once the crawl has ended.
+        """
+
+        def reader():
+            for urls in iter(self.inboxes[self.index].get, None):
+                results.put((None, urls, None, None))
+            results.put((None, None, None, None))
+
+        thread = Thread(target=reader)
+        thread.daemon = True
+        thread.start()
+
+
+def get_stats():
+    stats = sessions.get_stats()
+
+    return {
+        "sessions": dict((key, value) for key, value in stats.items() if key != "reused"),
+        "cache": cache.get_stats(),
+        "dedup": dedup.get_stats(),
+        "normalize": dict((key, value) for key, value in normalize.get_stats().items() if key != "hit_rate"),
+        "warc": warc.get_stats(),
+        "metrics": metrics.get_stats(),
+    }
+
+
+def merge_stats(stats):
+    """Add the statistics of a worker to those of this process"""
+
+    for module in (sessions, cache, dedup, normalize, warc):
+        for key, value in stats[module.__name__.rsplit(".", 1)[1]].items():
+            module.count(key, value)
+
+    metrics.merge_stats(stats["metrics"])
+
+
+def reset_stats():
+    for module in (sessions, cache, dedup, metrics, normalize, warc):
+        module.reset_stats()
+
+
+def work(shard, root_url, options):
+    from .crawler import crawl_iter
+
+    reset_stats()
+
+    try:
+        for result in crawl_iter(root_url, shard=shard, **options):
+            shard.results.put(result)
+    finally:
+        shard.results.put(("stats", get_stats()))
+
+
+def crawl_shards(root_url, workers, options):
+    """Crawl a given url with ``workers`` processes yielding urls and
+    errors as found.
+
+    ``options`` is a dict of the keyword arguments of
+    :func:`~spyda.crawler.crawl_iter`. Crawl state (``state_dir``) is
+    not supported.
+    """
+
+    if options.get("state_dir") is not None:
+        raise ValueError("Sharded crawls do not support state_dir")
+
+    max_pages = options.get("max_pages", 0)
+
+    counts = Array("i", 3)
+    counts[QUEUED] = 1  # The root url
+
+    inboxes = [Queue() for i in range(workers)]
+    results = Queue()
+
+    processes = [
+        Process(target=work, args=(Shard(i, inboxes, results, counts), root_url, options))
+        for i in range(workers)
+    ]
+
+    for process in processes:
+        process.daemon = True
+        process.start()
+
+    try:
+        running = workers
+        stopping = False
+
+        while running:
+            try:
+                kind, value = results.get(True, POLL)
+            except Empty:
+                with counts.get_lock():
+                    ended = not counts[ACTIVE] and (
+                        not counts[QUEUED] or (max_pages and counts[FETCHED] >= max_pages)
+                    )
+
+                if ended and not stopping:
+                    stopping = True
+                    for inbox in inboxes:
+                        inbox.put(None)
+                elif not any(process.is_alive() for process in processes):  # pragma: no cover
+                    raise RuntimeError("Crawl workers exited unexpectedly")
+
+                continue
+
+            if kind == "stats":
+                merge_stats(value)
+                running -= 1
+            else:
+                yield kind, value
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
@@ -0,0 +1,212 @@
+# Module:   state
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Crawl State
+
+Persists the state of a crawl (frontier, seen and visited urls and the
+results found so far) in an SQLite database so that an interrupted
+crawl can be resumed where it left off. Only the list of hosts with
+queued urls is held in memory, so crawls larger than memory are
+possible.
+
+Changes are committed every time :meth:`State.checkpoint` is called.
+If the process dies in between, the crawl resumes from the last
+checkpoint and urls fetched since then are fetched again.
+"""
+
+
+import sqlite3
+from os import makedirs, path
+
+
+from url import parse as parse_url
+
+
+from .frontier import Frontier
+
+
+DATABASE = "state.db"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT,
+    port INTEGER,
+    url TEXT,
+    depth INTEGER DEFAULT 0,
+    score REAL DEFAULT 0,
+    taken INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS frontier_score ON frontier (host, port, taken, score, id);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS limited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS urls (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT);
+CREATE TABLE IF NOT EXISTS errors (id INTEGER PRIMARY KEY AUTOINCREMENT, status INTEGER, url TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+class DiskSet(object):
+    """Set of strings stored in a table"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+
+        self.size = db.execute("SELECT COUNT(*) FROM {0:s}".format(table)).fetchone()[0]
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, value):
+        return self.db.execute("SELECT 1 FROM {0:s} WHERE url = ?".format(self.table), (value,)).fetchone() is not None
+
+    def __iter__(self):
+        return (row[0] for row in self.db.execute("SELECT url FROM {0:s}".format(self.table)))
+
+    def add(self, value):
+        self.size += self.db.execute("INSERT OR IGNORE INTO {0:s} (url) VALUES (?)".format(self.table), (value,)).rowcount
+
+    def discard(self, value):
+        self.size -= self.db.execute("DELETE FROM {0:s} WHERE url = ?".format(self.table), (value,)).rowcount
+
+
+class DiskList(object):
+    """Append-only list of rows stored in a table.
+
+    Rows of a single column are stored and returned as plain values.
+    """
+
+    def __init__(self, db, table, columns=("url",)):
+        self.db = db
+        self.table = table
+        self.columns = columns
+
+        self.size = db.execute("SELECT COUNT(*) FROM {0:s}".format(table)).fetchone()[0]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        rows = self.db.execute("SELECT {0:s} FROM {1:s} ORDER BY id".format(", ".join(self.columns), self.table))
+        if len(self.columns) == 1:
+            return (row[0] for row in rows)
+        return (tuple(row) for row in rows)
+
+    def append(self, value):
+        row = (value,) if len(self.columns) == 1 else tuple(value)
+        self.db.execute(
+            "INSERT INTO {0:s} ({1:s}) VALUES ({2:s})".format(
+                self.table, ", ".join(self.columns), ", ".join(["?"] * len(self.columns))
+            ),
+            row
+        )
+        self.size += 1
+
+
+class DiskFrontier(Frontier):
+    """:class:`~spyda.frontier.Frontier` storing its queues in a table.
+
+    Urls handed out by :meth:`pop` stay in the table until :meth:`done`
+    is called so that urls in flight when the crawl is interrupted are
+    fetched again when it is resumed.
+
+    With a ``score`` function each host's urls are handed out lowest
+    score first but hosts are still served in round-robin order, as
+    finding the best host would take a query per host.
+    """
+
+    _select = Frontier._round_robin
+
+    def __init__(self, db, *args, **kwargs):
+        super(DiskFrontier, self).__init__(*args, **kwargs)
+
+        self.db = db
+        self.taken = {}
+
+        db.execute("UPDATE frontier SET taken = 0 WHERE taken = 1")
+
+        for host, port, count in db.execute("SELECT host, port, COUNT(*) FROM frontier GROUP BY host, port ORDER BY MIN(id)"):
+            self.hosts.append((host, port))
+            self.counts[(host, port)] = count
+            self.size += count
+
+    def _put(self, host, url, depth):
+        score = self.score(url, depth) if self.score is not None else 0
+        self.db.execute(
+            "INSERT INTO frontier (host, port, url, depth, score) VALUES (?, ?, ?, ?, ?)",
+            host + (url.utf8(), depth, score)
+        )
+
+    def _get(self, host):
+        id, url, depth = self.db.execute(
+            "SELECT id, url, depth FROM frontier WHERE host = ? AND port IS ? AND taken = 0 "
+            "ORDER BY score, id LIMIT 1", host
+        ).fetchone()
+
+        self.db.execute("UPDATE frontier SET taken = 1 WHERE id = ?", (id,))
+        self.taken.setdefault(url, []).append(id)
+
+        return parse_url(url), depth
+
+    def done(self, url):
+        super(DiskFrontier, self).done(url)
+
+        url = url.utf8()
+        ids = self.taken[url]
+
+        self.db.execute("DELETE FROM frontier WHERE id = ?", (ids.pop(0),))
+
+        if not ids:
+            del self.taken[url]
+
+
+class State(object):
+    """Persistent state of a crawl stored in the directory ``directory``.
+
+    The remaining arguments are passed to the
+    :class:`~spyda.frontier.Frontier`.
+    """
+
+    def __init__(self, directory, *args, **kwargs):
+        self.directory = directory
+
+        if not path.isdir(directory):
+            makedirs(directory)
+
+        self.db = sqlite3.connect(path.join(directory, DATABASE))
+        self.db.text_factory = str
+        self.db.executescript(SCHEMA)
+
+        self.frontier = DiskFrontier(self.db, *args, **kwargs)
+        self.visited = DiskSet(self.db, "visited")
+        self.seen = DiskSet(self.db, "seen")
+        self.limited = DiskSet(self.db, "limited")
+        self.urls = DiskList(self.db, "urls")
+        self.errors = DiskList(self.db, "errors", ("status", "url"))
+
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'fetched'").fetchone()
+        self.fetched = row[0] if row is not None else 0
+
+    @property
+    def new(self):
+        """``True`` if nothing has been queued or crawled yet"""
+
+        return not (self.frontier or self.visited)
+
+    def checkpoint(self):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched', ?)", (self.fetched,))
+        self.db.commit()
+
+    def close(self, checkpoint=True):
+        """Close the state discarding changes since the last checkpoint
+        unless ``checkpoint`` is ``True``.
+        """
+
+        if checkpoint:
+            self.checkpoint()
+        self.db.close()
+
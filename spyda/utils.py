@@ -9,24 +9,41 @@
 import re
 import sys
 import htmlentitydefs
+from time import time
+from codecs import lookup as lookup_codec
 from heapq import nlargest
+from operator import itemgetter
 from traceback import format_exc
 from difflib import SequenceMatcher
 
 
-from restclient import GET
-from nltk import clean_html as html_to_text
-from lxml.html import tostring as doc_to_str
+from lxml.etree import LxmlError, XML, XSLT
+from lxml.html import document_fromstring, HTMLParser
 from lxml.html.soupparser import fromstring as html_to_doc
 
 
 from . import __version__
+from .links import get_links
+from . import metrics
+from .sessions import count as session_count, get_session
+from .cache import count as cache_count, get_cache
+from .warc import get_writer as get_warc_writer
 
 
 HEADERS = {
-    "User-Agent": "{0} v{1}".format(__name__, __version__)
+    "User-Agent": "{0} v{1}".format(__name__, __version__),
+    "Accept-Encoding": "gzip, deflate",
 }
 
+CHUNK_SIZE = 1 << 16  # Bytes of a response body read at a time
+
+CHARSET = re.compile(r"""charset\s*=\s*["']?([^\s;"']+)""", re.IGNORECASE)
+
+
+SPACES = " \t\n\f\r"  # Whitespace collapsed by BeautifulSoup
+
+PRESERVE_WHITESPACE = ("pre", "textarea")
+
 
 UNICHAR_REPLACEMENTS = (
     (u"\xa0",   u" "),      # non breaking space
@@ -40,6 +57,92 @@ UNICHAR_REPLACEMENTS = (
 )
 
 
+# Strips the markup of an element as nltk's ``clean_html`` did its
+# serialization: every start and end tag (void elements and empty <li>
+# have none) is replaced by a space and comments, scripts and styles
+# are removed.
+TEXT = XSLT(XML("""\
+<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+  <xsl:output method="text" encoding="utf-8"/>
+  <xsl:template match="script|style|comment()"/>
+  <xsl:template match="processing-instruction()">
+    <xsl:text> </xsl:text>
+  </xsl:template>
+  <xsl:template match="area|base|basefont|br|col|hr|img|input|isindex|link|meta|param|li[not(node())]">
+    <xsl:text> </xsl:text>
+    <xsl:apply-templates/>
+  </xsl:template>
+  <xsl:template match="*">
+    <xsl:text> </xsl:text>
+    <xsl:apply-templates/>
+    <xsl:text> </xsl:text>
+  </xsl:template>
+</xsl:stylesheet>
+"""))
+
+
+class Response(dict):
+    """HTTP response headers (keyed by lower case name) with status and reason"""
+
+    def __init__(self, response):
+        super(Response, self).__init__((k.lower(), v) for k, v in response.headers.items())
+
+        self.status = response.status_code
+        self.reason = response.reason
+
+
+class LRUCache(object):
+    """Dict-like cache holding at most ``size`` items.
+
+    An approximate LRU cache using two generations of plain dicts so
+    that a hit costs a single dict lookup: new items go into the young
+    generation and once it holds half of ``size`` items it replaces the
+    old generation, evicting every item not used since. Lookups with
+    :meth:`get` count as uses and are counted as ``hits`` or ``misses``.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.young = {}
+        self.old = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.young) + len(self.old)
+
+    def __contains__(self, key):
+        return key in self.young or key in self.old
+
+    def _add(self, key, value):
+        self.young[key] = value
+
+        if len(self.young) >= self.size // 2:
+            self.old = self.young
+            self.young = {}
+
+    def get(self, key, default=None):
+        try:
+            value = self.young[key]
+        except KeyError:
+            try:
+                value = self.old.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._add(key, value)
+
+        self.hits += 1
+
+        return value
+
+    def __setitem__(self, key, value):
+        if self.size > 1:
+            self.old.pop(key, None)
+            self._add(key, value)
+
+
 def is_url(s):
     return s.find("://") > 0
 
@@ -95,7 +198,8 @@ def get_close_matches(word, possibilities, n=3, cutoff=0.6):
 
     word is a sequence for which close matches are desired (typically a string).
 
-    possibilities is a list of sequences against which to match word (typically a list of strings).
+    possibilities is a list of sequences against which to match word (typically a list of strings)
+    or a :class:`~spyda.index.NGramIndex` of strings, of which only the candidates are scored.
 
     Optional arg n (default 3) is the maximum number of close matches to return. n must be > 0.
 
@@ -106,6 +210,10 @@ def get_close_matches(word, possibilities, n=3, cutoff=0.6):
     in a list, sorted by similarity score, most similar first.
     """
 
+    candidates = getattr(possibilities, "candidates", None)
+    if candidates is not None:
+        possibilities = candidates(word, cutoff)
+
     result = []
     s = SequenceMatcher()
     s.set_seq2(word)
@@ -115,17 +223,203 @@ def get_close_matches(word, possibilities, n=3, cutoff=0.6):
             result.append((x, s.ratio()))
 
     # Return n largest best scorers and their matches.
-    return nlargest(n, result)
+    return nlargest(n, result, key=itemgetter(1, 0))
+
+
+def get_mimetype(content_type):
+    """Return the media type of a Content-Type header without its parameters"""
+
+    return content_type.split(";", 1)[0].strip().lower() if content_type else None
+
+
+def close_response(r):
+    """Close a streamed response whose body will not be read.
+
+    The connection is closed rather than reused as the unread body
+    would otherwise be read as the start of the next response.
+    """
+
+    connection = getattr(r.raw, "_connection", None)
+    if connection is not None:
+        connection.close()
+    r.close()
+
+
+def get_content_length(response):
+    """Return the Content-Length of a :class:`Response` or ``None``"""
+
+    try:
+        return int(response["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def count_body(r, size):
+    """Count the bytes of a response body received on the wire and
+    ``size`` bytes decoded from them.
+    """
+
+    session_count("received", r.raw.tell())
+    session_count("decoded", size)
+
+
+def abort_response(r, response, size=0):
+    """Close a streamed response of which ``size`` bytes of the body
+    have been read and decoded, counting the bytes saved.
+
+    Content-Length is the size of the body on the wire (compressed if
+    the response has a Content-Encoding).
+    """
+
+    length = get_content_length(response)
+
+    count_body(r, size)
+    session_count("aborted")
+    if length is not None:
+        session_count("saved", max(length - r.raw.tell(), 0))
+
+    close_response(r)
+
+
+def read_body(r, response, max_size=0, parser=None):
+    """Read the body of a streamed response in chunks.
+
+    :param max_size: Maximum size of the body in bytes, 0 for unlimited.
+    :type  max_size: int
+
+    :param parser:   An incremental parser fed each chunk of the body
+                     (see :class:`~spyda.links.LinkParser`).
+
+    :returns:        The (decoded) body as bytes or ``None`` if it is
+                     larger than ``max_size``, in which case the
+                     download is aborted as soon as that is known.
+    """
 
+    length = get_content_length(response)
+    if max_size and length is not None and length > max_size:
+        abort_response(r, response)
+        return None
 
-def fetch_url(url):
-    response, content = GET(url, headers=HEADERS, resp=True)
-    if "content-type" in response and "charset=" in response["content-type"]:
-        charset = response["content-type"].split("charset=")[1]
+    chunks = []
+    size = 0
+
+    for chunk in r.iter_content(CHUNK_SIZE):
+        size += len(chunk)
+
+        if max_size and size > max_size:
+            abort_response(r, response, size)
+            return None
+
+        chunks.append(chunk)
+        if parser is not None:
+            parser.feed(chunk)
+
+    count_body(r, size)
+
+    return "".join(chunks)
+
+
+def get_charset(response):
+    """Return the charset of a :class:`Response` or ``None`` if it has
+    none or it is not a known encoding.
+    """
+
+    m = CHARSET.search(response.get("content-type") or "")
+    if m is None:
+        return None
+
+    try:
+        lookup_codec(m.group(1))
+    except LookupError:
+        return None
+
+    return m.group(1)
+
+
+def fetch_url(url, content_types=None, max_size=0, parser=None, decode=True):
+    """Fetch the given url returning a 2-item tuple of (response, content).
+
+    If ``content_types`` is given and the response has a Content-Type
+    which is not one of them the body is not downloaded and content is
+    ``None``.
+
+    gzip and deflate compressed bodies are requested and decoded
+    transparently. The body is streamed and content is also ``None`` if
+    it is larger than ``max_size`` bytes (0 for unlimited) decoded. If
+    given, ``parser`` is started with the response's charset
+    (``parser.start(charset)``) and fed each chunk of the body as it is
+    downloaded.
+
+    content is decoded to unicode if the response has a known charset,
+    unless ``decode`` is ``False`` in which case it is left as bytes to
+    be decoded by the consumer (e.g. :func:`parse_html`) with the
+    charset returned by :func:`get_charset`.
+
+    If metrics are enabled (see :mod:`spyda.metrics`) the time taken to
+    fetch the page and to decode it are recorded.
+
+    If the HTTP cache is enabled (see :mod:`spyda.cache`) a cached
+    response is revalidated and served from the cache if unmodified.
+
+    If WARC archiving is enabled (see :mod:`spyda.warc`) every response
+    whose body is downloaded is written to the archive.
+    """
+
+    timing = metrics.enabled()
+    start = timing and time()
+
+    cache = get_cache()
+    entry = cache.get(url) if cache is not None else None
+
+    headers = HEADERS if entry is None else dict(HEADERS, **entry.validators())
+
+    r = get_session().get(url, headers=headers, stream=True)
+
+    if entry is not None and r.status_code == 304:
+        r.close()
+        cache_count("hits")
+        r = entry
+
+    response = Response(r)
+
+    mimetype = get_mimetype(response.get("content-type"))
+    if content_types is not None and mimetype is not None and mimetype not in content_types:
+        if r is not entry:
+            abort_response(r, response)
+        return response, None
+
+    charset = get_charset(response)
+
+    if parser is not None:
+        parser.start(charset)
+
+    if r is entry:
+        content = entry.content
+        if parser is not None:
+            parser.feed(content)
     else:
-        charset = None
+        content = read_body(r, response, max_size, parser)
+        if content is None:
+            return response, None
+
+    if cache is not None and r is not entry:
+        cache_count("misses")
+        cache.put(url, r, content)
 
-    return response, (content.decode(charset) if charset is not None else content)
+    warc = get_warc_writer()
+    if warc is not None:
+        warc.write(url, r, content)
+
+    if timing:
+        now = time()
+        metrics.observe("fetch", now - start)
+        start = now
+
+    if charset is not None and decode:
+        content = content.decode(charset)
+        timing and metrics.observe("decode", time() - start)
+
+    return response, content
 
 
 def log(msg, *args, **kwargs):
@@ -142,15 +436,77 @@ def status(msg, *args):
     log("\r\x1b[K{0:s}", msg.format(*args), n="")
 
 
-def parse_html(html):
+def collapse_whitespace(doc):
+    """Collapse whitespace only text of ``doc`` to a newline (if it has
+    one) or a space as BeautifulSoup does.
+    """
+
+    preserved, preserved_tails = set(), set()
+    for element in doc.iter(*PRESERVE_WHITESPACE):
+        preserved.update(element.iter())
+        preserved_tails.update(element.iterdescendants())
+
+    for element in doc.iter():
+        text = element.text
+        if text and isinstance(element.tag, basestring) and not text.strip(SPACES) and element not in preserved:
+            element.text = "\n" if "\n" in text else " "
+
+        text = element.tail
+        if text and not text.strip(SPACES) and element not in preserved_tails:
+            element.tail = "\n" if "\n" in text else " "
+
+
+def parse_html(html, encoding=None):
+    """Parse an HTML document returning its root element.
+
+    The document is parsed by libxml2's native HTML parser, preferably
+    given as bytes with its ``encoding`` (e.g. from :func:`get_charset`)
+    so it is decoded only once in the parser. Without an encoding bytes
+    are taken to be UTF-8 if they are valid UTF-8, otherwise libxml2
+    detects the encoding from the document. Documents libxml2 cannot
+    parse are parsed with BeautifulSoup instead.
+
+    Whitespace is collapsed as BeautifulSoup does (see
+    :func:`collapse_whitespace`) so either parser gives the same tree.
+    """
+
+    native = isinstance(html, bytes)
+
+    if native and encoding is None:
+        # libxml2 assumes latin-1 without a <meta> charset
+        try:
+            html.decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+    try:
+        parser = HTMLParser(encoding=encoding) if native and encoding is not None else None
+        doc = document_fromstring(html, parser=parser)
+    except (ValueError, LookupError, LxmlError):
+        pass
+    else:
+        collapse_whitespace(doc)
+        return doc
+
+    if native and encoding is not None:
+        try:
+            html = html.decode(encoding, "replace")
+        except LookupError:
+            pass
+
     return html_to_doc(html)
 
 
 def doc_to_text(doc):
-    return unichar_to_text(html_to_text(unescape(doc_to_str(doc))))
+    """Return the plain text of an element and its tail.
+
+    The markup is stripped in a single pass by libxslt (see ``TEXT``),
+    double spaces are collapsed and common unicode characters are
+    replaced (see ``UNICHAR_REPLACEMENTS``). Text containing ``<`` or
+    ``>`` is kept as is.
+    """
 
+    text = unicode(TEXT(doc)) + (doc.tail or u"")
 
-def get_links(html, badchars="\"' \v\f\t\n\r"):
-    tags = parse_html(html).cssselect("a")
-    hrefs = (tag.get("href") for tag in tags)
-    return (href.strip(badchars) for href in hrefs if href is not None)
+    return unichar_to_text(text.replace(u"  ", u" ").replace(u"  ", u" ").strip())
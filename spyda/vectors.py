@@ -0,0 +1,191 @@
+# Module:   vectors
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""Vector Scorer
+
+Scores entities against the strings of a data set by the cosine
+similarity of their character n-gram vectors instead of scoring one
+pair at a time with :class:`~difflib.SequenceMatcher`.
+
+Each string is lower cased, padded with a space on either side and
+turned into a vector of the tf-idf weights of its n-grams normalized to
+unit length. The vectors of the strings are stored by n-gram (a sparse
+matrix in compressed column form), so the scores of all the entities of
+a document against every string sharing an n-gram with them are the
+sparse product of the two matrices, computed with NumPy in a few array
+operations: the postings of the entities' n-grams are gathered, their
+weights multiplied and the products summed by (entity, string) pair.
+
+Cosine similarities are lower than ``SequenceMatcher.ratio()`` for the
+same pair of strings, so lower cutoffs are used with this scorer (see
+``benchmarks/scorers.py``).
+
+Requires NumPy.
+"""
+
+
+from math import log
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # NOQA
+
+from .index import ngrams, SIZE
+
+
+EPSILON = 1e-9  # Tolerance of rounding errors of scores
+
+
+def get_ngrams(s, size=SIZE):
+    """Return the n-grams of a string lower cased and padded by spaces"""
+
+    return ngrams(u" {0:s} ".format(s.lower()) if isinstance(s, unicode) else " {0:s} ".format(s.lower()), size)
+
+
+class VectorIndex(object):
+    """Character n-gram vectors of a list of strings.
+
+    :param possibilities: The strings to index.
+    :type  possibilities: list
+
+    :param size:          No. of characters per n-gram.
+    :type  size:          int
+    """
+
+    def __init__(self, possibilities, size=SIZE):
+        self.size = size
+        self.possibilities = list(possibilities)
+
+        self.vocabulary = {}
+        rows, columns, counts = [], [], []
+        for i, x in enumerate(self.possibilities):
+            grams = {}
+            for gram in get_ngrams(x, size):
+                grams[gram] = grams.get(gram, 0) + 1
+            for gram, n in grams.items():
+                rows.append(i)
+                columns.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+                counts.append(n)
+
+        rows = numpy.array(rows, dtype=numpy.int32)
+        columns = numpy.array(columns, dtype=numpy.int64)
+
+        # Smoothed inverse document frequencies (as if every n-gram was
+        # in one more string) so unknown n-grams of entities are weighted
+        self.frequencies = numpy.bincount(columns, minlength=len(self.vocabulary))
+        self.idf = numpy.log((1.0 + len(self)) / (1.0 + self.frequencies)) + 1.0
+
+        weights = numpy.array(counts, dtype=numpy.float64) * self.idf[columns]
+        weights /= numpy.sqrt(numpy.bincount(rows, weights ** 2, minlength=len(self)))[rows]
+
+        order = numpy.argsort(columns, kind="mergesort")
+        self.ids = rows[order]
+        self.weights = weights[order]
+        self.indptr = numpy.concatenate(([0], numpy.cumsum(self.frequencies))).astype(numpy.int64)
+
+    def __len__(self):
+        return len(self.possibilities)
+
+    def __iter__(self):
+        return iter(self.possibilities)
+
+    def vectorize(self, words):
+        """Return the vectors of words as 3 arrays of (rows, columns,
+        weights) of their n-grams in the vocabulary.
+        """
+
+        unknown = log(1.0 + len(self)) + 1.0
+
+        rows, columns, weights = [], [], []
+        for i, word in enumerate(words):
+            grams = {}
+            for gram in get_ngrams(word, self.size):
+                grams[gram] = grams.get(gram, 0) + 1
+
+            vector = [(self.vocabulary.get(gram), n) for gram, n in grams.items()]
+            vector = [(column, n * (self.idf[column] if column is not None else unknown)) for column, n in vector]
+            norm = sum(weight ** 2 for column, weight in vector) ** 0.5
+
+            for column, weight in vector:
+                if column is not None:
+                    rows.append(i)
+                    columns.append(column)
+                    weights.append(weight / norm)
+
+        return (
+            numpy.array(rows, dtype=numpy.int64),
+            numpy.array(columns, dtype=numpy.int64),
+            numpy.array(weights, dtype=numpy.float64),
+        )
+
+    def scores(self, words):
+        """Return the cosine similarities of words and the strings sharing
+        an n-gram with them as 3 arrays of (rows, ids, scores).
+        """
+
+        rows, columns, weights = self.vectorize(words)
+
+        starts = self.indptr[columns]
+        lengths = self.indptr[columns + 1] - starts
+        total = lengths.sum()
+
+        if not total:
+            empty = numpy.array([], dtype=numpy.int64)
+            return empty, empty, numpy.array([], dtype=numpy.float64)
+
+        # The positions of the postings of every n-gram of every word
+        positions = numpy.repeat(starts - (numpy.cumsum(lengths) - lengths), lengths) + numpy.arange(total)
+
+        pairs = numpy.repeat(rows, lengths) * len(self) + self.ids[positions]
+        products = numpy.repeat(weights, lengths) * self.weights[positions]
+
+        pairs, inverse = numpy.unique(pairs, return_inverse=True)
+        scores = numpy.bincount(inverse, weights=products)
+
+        return pairs // len(self), pairs % len(self), numpy.minimum(scores, 1.0)
+
+
+def get_vector_matches(words, index, n=3, cutoff=0.6):
+    """Return lists of close matches of words by the cosine similarity of
+    their character n-gram vectors, computed for all words at once.
+
+    :param words:  The words to find close matches of.
+    :type  words:  list
+
+    :param index:  The :class:`VectorIndex` of the possibilities.
+    :type  index:  :class:`VectorIndex`
+
+    :param n:      The maximum no. of close matches of each word.
+    :type  n:      int
+
+    :param cutoff: A float in [0.0, 1.0]. Possibilities that don't
+                   score at least that similar to a word are ignored.
+    :type  cutoff: float
+
+    :returns: A list for each word of the best (no more than n) matches
+              as 2-item tuples of (possibility, score), most similar
+              first.
+    :rtype:   list
+    """
+
+    results = [[] for word in words]
+    if not words:
+        return results
+
+    rows, ids, scores = index.scores(words)
+
+    keep = scores + EPSILON >= cutoff
+    rows, ids, scores = rows[keep], ids[keep], scores[keep]
+
+    order = numpy.lexsort((ids, -scores, rows))
+    rows, ids, scores = rows[order], ids[order], scores[order]
+
+    ranks = numpy.arange(len(rows)) - numpy.searchsorted(rows, rows)
+    best = ranks < n
+
+    for row, i, score in zip(rows[best], ids[best], scores[best]):
+        results[row].append((index.possibilities[i], float(score)))
+
+    return results
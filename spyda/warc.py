@@ -0,0 +1,355 @@
+# Module:   warc
+# Date:     18th October 2026
+# Author:   James Mills, j dot mills at griffith dot edu dot au
+
+"""WARC Archives
+
+An optional archive of the responses fetched by a crawl in the WARC
+(Web ARChive) format so their pages can be processed later, for example
+by the extractor, without fetching them again.
+
+Each response whose body was downloaded is written as a ``response``
+record to a file named ``<prefix>-<timestamp>-<pid>-<serial>.warc``.
+When a file grows beyond its size limit the next record starts a new
+file with the next serial. With compression each record is written as
+a separate gzip member (``.warc.gz``) so the file can still be read
+from any record. Every file starts with a ``warcinfo`` record.
+
+Bodies are stored as decoded: the ``Content-Encoding`` and
+``Transfer-Encoding`` headers are dropped from the archived response
+and its ``Content-Length`` is that of the decoded body.
+"""
+
+
+from time import strftime
+from hashlib import sha1
+from gzip import GzipFile
+from base64 import b32encode
+from datetime import datetime
+from uuid import uuid4 as uuid
+from threading import Lock
+from optparse import OptionGroup
+from os import getpid, makedirs, path
+
+
+from . import __version__
+from .cache import store_megabytes
+
+
+SIZE = 1 << 30  # Size of a WARC file in bytes after which a new one is started
+
+VERSION = "WARC/1.0"
+
+EXTENSIONS = (".warc", ".warc.gz")
+
+HOP_BY_HOP = ("content-encoding", "content-length", "transfer-encoding")
+
+
+WARC_OPTIONS = ("warc", "warc_size", "warc_compress")
+
+
+_lock = Lock()
+_writer = None
+_options = {
+    "warc": None,
+    "warc_size": SIZE,
+    "warc_compress": False,
+}
+
+_stats_lock = Lock()
+_stats = {
+    "records": 0,
+    "files": 0,
+}
+
+
+def count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def is_warc(filename):
+    """Return ``True`` if ``filename`` has a WARC file extension"""
+
+    return filename.lower().endswith(EXTENSIONS)
+
+
+def get_date():
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def format_record(kind, headers, block):
+    """Return a WARC record of type ``kind`` as bytes.
+
+    :param headers: A list of 2-item tuples of (name, value) of extra
+                    WARC headers.
+    :param block:   The content block of the record as bytes.
+    """
+
+    lines = [
+        VERSION,
+        "WARC-Type: {0:s}".format(kind),
+        "WARC-Record-ID: <urn:uuid:{0:s}>".format(str(uuid())),
+        "WARC-Date: {0:s}".format(get_date()),
+    ]
+    lines.extend("{0:s}: {1:s}".format(name, value) for name, value in headers)
+    lines.append("Content-Length: {0:d}".format(len(block)))
+
+    return "{0:s}\r\n\r\n{1:s}\r\n\r\n".format("\r\n".join(lines), block)
+
+
+def format_response(url, response, content):
+    """Return the ``response`` record of a requests Response (or
+    :class:`~spyda.cache.Entry`) and its decoded body.
+    """
+
+    lines = ["HTTP/1.1 {0:d} {1:s}".format(response.status_code, response.reason or "")]
+    lines.extend(
+        "{0:s}: {1:s}".format(name, value)
+        for name, value in response.headers.items()
+        if name.lower() not in HOP_BY_HOP
+    )
+    lines.append("Content-Length: {0:d}".format(len(content)))
+
+    block = "{0:s}\r\n\r\n{1:s}".format("\r\n".join(lines), content)
+
+    return format_record("response", [
+        ("WARC-Target-URI", url),
+        ("WARC-Payload-Digest", "sha1:{0:s}".format(b32encode(sha1(content).digest()))),
+        ("Content-Type", "application/http; msgtype=response"),
+    ], block)
+
+
+class WARCWriter(object):
+    """Writer of rolling WARC files.
+
+    :param prefix:   Path and file name prefix of the WARC files.
+    :type  prefix:   str
+
+    :param size:     Size of a file in bytes after which a new file is
+                     started.
+    :type  size:     int
+
+    :param compress: If ``True`` gzip compress each record.
+    :type  compress: bool
+    """
+
+    def __init__(self, prefix, size=SIZE, compress=False):
+        self.prefix = prefix
+        self.size = size
+        self.compress = compress
+
+        directory = path.dirname(path.abspath(prefix))
+        if not path.isdir(directory):
+            makedirs(directory)
+
+        self.lock = Lock()
+        self.timestamp = strftime("%Y%m%d%H%M%S")
+        self.serial = 0
+        self.file = None
+        self.filenames = []
+
+    def _open(self):
+        filename = "{0:s}-{1:s}-{2:d}-{3:05d}{4:s}".format(
+            self.prefix, self.timestamp, getpid(), self.serial, EXTENSIONS[self.compress]
+        )
+
+        self.serial += 1
+        self.file = open(filename, "wb")
+        self.filenames.append(filename)
+
+        count("files")
+
+        self._write(format_record("warcinfo", [
+            ("WARC-Filename", path.basename(filename)),
+            ("Content-Type", "application/warc-fields"),
+        ], "software: spyda/{0:s}\r\nformat: WARC File Format 1.0\r\n".format(__version__)))
+
+    def _write(self, data):
+        if self.compress:
+            f = GzipFile(filename="", mode="wb", fileobj=self.file)
+            f.write(data)
+            f.close()
+        else:
+            self.file.write(data)
+
+        # Worker processes of a sharded crawl exit without flushing
+        self.file.flush()
+
+    def write(self, url, response, content):
+        """Write a response and its decoded body as a ``response`` record.
+
+        :param response: A requests Response (or :class:`~spyda.cache.Entry`).
+        :param content:  The body of the response as bytes.
+        """
+
+        data = format_response(url, response, content)
+
+        with self.lock:
+            if self.file is None:
+                self._open()
+
+            self._write(data)
+
+            if self.file.tell() >= self.size:
+                self.file.close()
+                self.file = None
+
+        count("records")
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class Record(object):
+    """A ``response`` record read from a WARC file.
+
+    ``headers`` are the HTTP headers of the response keyed by lower
+    case name and ``content`` its body as bytes.
+    """
+
+    def __init__(self, url, date, status, reason, headers, content):
+        self.url = url
+        self.date = date
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+
+def parse_response(url, date, block):
+    head, content = block.split("\r\n\r\n", 1) if "\r\n\r\n" in block else (block, "")
+    lines = head.split("\r\n")
+
+    status = lines[0].split(" ", 2)
+    headers = dict(
+        (name.strip().lower(), value.strip())
+        for name, value in (line.split(":", 1) for line in lines[1:] if ":" in line)
+    )
+
+    return Record(url, date, int(status[1]), status[2] if len(status) > 2 else "", headers, content)
+
+
+def read_records(filename):
+    """Read the ``response`` records of a (gzip compressed) WARC file.
+
+    :returns: A generator of :class:`Record` objects.
+    :rtype:   generator
+    """
+
+    f = GzipFile(filename, "rb") if filename.lower().endswith(".gz") else open(filename, "rb")
+
+    try:
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            if not line.startswith("WARC/"):
+                raise ValueError("Invalid WARC record in {0:s}: {1!r}".format(filename, line))
+
+            headers = {}
+            for line in iter(f.readline, ""):
+                if not line.strip():
+                    break
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+            block = f.read(int(headers["content-length"]))
+
+            if headers.get("warc-type") == "response" and headers.get("content-type", "").startswith("application/http"):
+                yield parse_response(headers.get("warc-target-uri"), headers.get("warc-date"), block)
+    finally:
+        f.close()
+
+
+def configure(**options):
+    """Configure the shared WARC writer.
+
+    :param warc:          Path and file name prefix of the WARC files or
+                          ``None`` to disable archiving.
+    :type  warc:          str or None
+
+    :param warc_size:     Size of a file in bytes after which a new file
+                          is started.
+    :type  warc_size:     int
+
+    :param warc_compress: If ``True`` gzip compress the records.
+    :type  warc_compress: bool
+    """
+
+    global _writer
+
+    with _lock:
+        _options.update(options)
+        if _writer is not None:
+            _writer[1].close()
+            _writer = None
+
+
+def get_writer():
+    """Return the shared WARC writer or ``None`` if archiving is disabled.
+
+    Each process writes its own files.
+    """
+
+    global _writer
+
+    with _lock:
+        if _options["warc"] is None:
+            return None
+
+        if _writer is None or _writer[0] != getpid():
+            _writer = getpid(), WARCWriter(_options["warc"], _options["warc_size"], _options["warc_compress"])
+
+        return _writer[1]
+
+
+def get_stats():
+    """Return statistics of the WARC writers.
+
+    :returns: A dict of the no. of ``records`` and ``files`` written.
+    :rtype:   dict
+    """
+
+    with _stats_lock:
+        return _stats.copy()
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def warc_options(parser):
+    group = OptionGroup(
+        parser,
+        "WARC Options",
+        "These options archive the fetched responses in WARC files "
+        "which can be given to the extractor instead of urls."
+    )
+
+    group.add_option(
+        "", "--warc",
+        action="store", type="string", metavar="PATH", default=None, dest="warc",
+        help="Write responses to WARC files named PATH-<timestamp>-<pid>-<serial>.warc"
+    )
+
+    group.add_option(
+        "", "--warc-size",
+        action="callback", callback=store_megabytes, type="int", metavar="MB", default=SIZE, dest="warc_size",
+        help="Size of a WARC file in MB after which a new one is started (Default: {0:d})".format(SIZE >> 20)
+    )
+
+    group.add_option(
+        "", "--warc-compress",
+        action="store_true", default=False, dest="warc_compress",
+        help="Compress the WARC files with gzip"
+    )
+
+    parser.add_option_group(group)
@@ -8,10 +8,13 @@ import pytest
 
 from os import path
 from time import sleep
+from gzip import GzipFile
+from StringIO import StringIO
 from collections import deque
 
 from circuits.net.events import close
 from circuits.web import Controller, Server, Static
+from circuits.web.headers import Headers
 from circuits import handler, BaseComponent, Component, Debugger, Manager
 
 TIMEOUT = 0.1
@@ -40,6 +43,11 @@ class Watcher(BaseComponent):
             sleep(TIMEOUT)
 
 
+MIRROR = "<html><body><p>{0:s}</p>{1:s}<a href=\"/child/{2:s}\">child</a></body></html>"
+
+MIRROR_TEXT = " ".join("word{0:d}".format(i) for i in range(200))
+
+
 class Root(Controller):
 
     def hello(self):
@@ -49,9 +57,87 @@ class Root(Controller):
         self.response.headers["Content-Type"] = "text/plain; charset=utf-8"
         return u"Hello World!"
 
+    def records(self):
+        self.response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return u'[{"first_name": "Jos\\u00e9", "last_name": "Mart\u00ed", "uri": "http://example.com/marti"}]'
+
+    def untyped(self):
+        return "<a href=\"hello\">hello</a>"
+
+    def big(self):
+        return "<a href=\"foo/\">foo</a>" + " " * (1 << 17)
+
+    def compressed(self):
+        body = StringIO()
+        f = GzipFile(fileobj=body, mode="wb")
+        f.write("Hello World!" * 100)
+        f.close()
+
+        self.response.headers["Content-Encoding"] = "gzip"
+        return body.getvalue()
+
+    def encodings(self):
+        return self.request.headers.get("Accept-Encoding", "")
+
+    def mirrors(self):
+        return "".join(
+            "<a href=\"{0:s}\">{0:s}</a>".format(href)
+            for href in ("mirror/1", "mirror/2", "variant/3", "variant/4")
+        )
+
+    def child(self, n):
+        return "Child {0:s}".format(n)
+
+    def mirror(self, n):
+        return MIRROR.format(MIRROR_TEXT, "", n)
+
+    def variant(self, n):
+        return MIRROR.format(MIRROR_TEXT, "<p>Visitor {0:s}</p>".format(n), n)
+
     def external(self):
         return "<a href=\"http://www.google.com\">Google</a>"
 
+    def hosts(self):
+        port = self.request.headers["Host"].split(":")[1]
+        return "".join(
+            "<a href=\"http://{0:s}:{1:s}/foo/\">{0:s}</a>".format(host, port)
+            for host in ("127.0.0.1", "localhost")
+        )
+
+
+class HeadFix(Component):
+    """Close connections after HEAD requests.
+
+    circuits.web does not finish HEAD responses so the next request on a
+    keep-alive connection would get no body.
+    """
+
+    channel = "web"
+
+    @handler("response", priority=1.0)
+    def _on_response(self, res):
+        if res.request.method == "HEAD":
+            res.headers["Connection"] = "close"
+
+
+class UntypedHeaders(Headers):
+    """Headers without the default Content-Type of circuits.web"""
+
+    def setdefault(self, key, value):
+        if key != "Content-Type":
+            return super(UntypedHeaders, self).setdefault(key, value)
+
+
+class Untyped(Component):
+    """Send the response of /untyped without a Content-Type"""
+
+    channel = "web"
+
+    @handler("response", priority=1.0)
+    def _on_response(self, res):
+        if res.request.path == "/untyped":
+            res.headers = UntypedHeaders(res.headers.items())
+
 
 class WebApp(Component):
 
@@ -62,6 +148,8 @@ class WebApp(Component):
 
         self.server = Server(0).register(self)
         Root().register(self)
+        HeadFix().register(self)
+        Untyped().register(self)
         Static(docroot=self.docroot).register(self)
 
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+import pytest
+
+from spyda.crawler import crawl
+from spyda.utils import fetch_url
+from spyda.cache import configure, get_cache, get_stats, reset_stats, HTTPCache
+
+
+from .helpers import urljoin
+
+
+class Response(object):
+
+    def __init__(self, headers, status_code=200, reason="OK"):
+        self.headers = headers
+        self.status_code = status_code
+        self.reason = reason
+
+
+@pytest.fixture()
+def http_cache(request, tmpdir):
+    configure(cache_dir=str(tmpdir.join("cache")))
+    reset_stats()
+
+    def finalizer():
+        configure(cache_dir=None)
+
+    request.addfinalizer(finalizer)
+
+    return get_cache()
+
+
+def test_put_get(tmpdir):
+    c = HTTPCache(str(tmpdir))
+
+    assert c.get("http://example.com/") is None
+
+    response = Response({"Content-Type": "text/html", "ETag": "\"abc\""})
+    assert c.put("http://example.com/", response, "Hello World!")
+
+    entry = c.get("http://example.com/")
+    assert entry.status_code == 200
+    assert entry.headers["Content-Type"] == "text/html"
+    assert entry.content == "Hello World!"
+    assert entry.validators() == {"If-None-Match": "\"abc\""}
+
+    assert len(c) == 1
+    assert c.total == len("Hello World!")
+
+
+def test_put_uncacheable(tmpdir):
+    c = HTTPCache(str(tmpdir))
+
+    assert not c.put("http://example.com/", Response({}), "Hello World!")
+    assert not c.put("http://example.com/", Response({"ETag": "x"}, 404, "Not Found"), "")
+    assert len(c) == 0
+
+
+def test_evict(tmpdir):
+    c = HTTPCache(str(tmpdir), size=10)
+    response = Response({"Last-Modified": "Sun, 18 Oct 2026 00:00:00 GMT"})
+
+    c.put("http://example.com/a", response, "aaaa")
+    c.put("http://example.com/b", response, "bbbb")
+    c.get("http://example.com/a")
+    c.put("http://example.com/c", response, "cccc")
+
+    assert c.get("http://example.com/b") is None
+    assert c.get("http://example.com/a").content == "aaaa"
+    assert c.get("http://example.com/c").content == "cccc"
+    assert c.total == 8
+    assert not c.put("http://example.com/d", response, "d" * 11)
+
+
+def test_shared(tmpdir):
+    a = HTTPCache(str(tmpdir))
+    b = HTTPCache(str(tmpdir))
+
+    a.put("http://example.com/", Response({"ETag": "x"}), "Hello World!")
+    assert b.get("http://example.com/").content == "Hello World!"
+
+
+def test_fetch_url(baseurl, http_cache):
+    url = urljoin(baseurl, "foo/")
+
+    res, data = fetch_url(url)
+    assert res.status == 200
+    assert len(http_cache) == 1
+
+    res, cached = fetch_url(url)
+    assert res.status == 200
+    assert res["content-type"] == "text/html"
+    assert cached == data
+
+    stats = get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["stores"] == 1
+
+
+def test_fetch_url_content_types(baseurl, http_cache):
+    url = urljoin(baseurl, "foo/")
+
+    fetch_url(url)
+
+    res, data = fetch_url(url, content_types=["text/plain"])
+    assert res.status == 200
+    assert data is None
+    assert get_stats()["hits"] == 1
+
+
+def test_fetch_url_uncacheable(baseurl, http_cache):
+    res, data = fetch_url(urljoin(baseurl, "hello"))
+    assert data == "Hello World!"
+    assert len(http_cache) == 0
+
+
+def test_crawl(baseurl, http_cache):
+    first = crawl(baseurl, use_head=False)
+    assert get_stats()["hits"] == 0
+
+    second = crawl(baseurl, use_head=False)
+    assert get_stats()["hits"] > 0
+
+    assert sorted(first["urls"]) == sorted(second["urls"])
+    assert first["errors"] == second["errors"]
+
+
+def test_disabled():
+    assert get_cache() is None
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 
+import re
+
 import pytest
 
 from os import path
 
-from spyda.crawler import crawl
+from spyda import crawler
+from spyda.crawler import crawl, crawl_iter, predict_content_type
 
 from .helpers import urljoin
 
@@ -32,6 +35,107 @@ def test_crawl(baseurl, expected_links):
     assert sorted(result["urls"]) == expected_links
 
 
+def test_crawl_iter(baseurl, expected_links):
+    result = list(crawl_iter(baseurl))
+    assert [value for kind, value in result if kind == "error"] == [(404, urljoin(baseurl, "asdf/"))]
+    assert sorted(value for kind, value in result if kind == "url") == expected_links
+
+
+def test_crawl_iter_close(baseurl, expected_links, tmpdir):
+    state_dir = str(tmpdir.join("state"))
+
+    results = crawl_iter(baseurl, checkpoint=1, state_dir=state_dir)
+    first = next(results)
+    results.close()
+
+    rest = list(crawl_iter(baseurl, checkpoint=1, state_dir=state_dir))
+    assert rest
+    assert first not in rest
+
+    result = crawl(baseurl, state_dir=state_dir)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_concurrency(baseurl, expected_links):
+    result = crawl(baseurl, concurrency=4)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_host_limits(baseurl, expected_links):
+    result = crawl(baseurl, concurrency=4, host_concurrency=2, host_rate=100, host_burst=2)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_state_dir(baseurl, expected_links, tmpdir):
+    state_dir = str(tmpdir.join("state"))
+
+    result = crawl(baseurl, max_pages=1, state_dir=state_dir)
+    assert sorted(result["urls"]) == list(
+        x.format(baseurl)
+        for x in ("{0:s}/asdf/", "{0:s}/download.tar.gz", "{0:s}/foo/")
+    )
+
+    result = crawl(baseurl, state_dir=state_dir)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_no_head(baseurl, expected_links):
+    result = crawl(baseurl, use_head=False)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_no_head_untyped(baseurl):
+    # Pages without a Content-Type are parsed as they are followed with HEAD
+    for use_head in (True, False):
+        result = crawl(urljoin(baseurl, "untyped"), max_depth=1, use_head=use_head)
+        assert result["urls"] == [urljoin(baseurl, "hello")]
+
+
+def test_crawl_predict_types(baseurl, expected_links):
+    result = crawl(baseurl, predict_types=True, use_head=False)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+@pytest.mark.parametrize("link_parser", ["soup", "stream"])
+def test_crawl_link_parser(baseurl, expected_links, link_parser):
+    result = crawl(baseurl, link_parser=link_parser)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_workers(baseurl, expected_links):
+    result = crawl(baseurl, workers=2)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+
+def test_crawl_workers_max_depth(baseurl):
+    result = crawl(baseurl, max_depth=1, workers=2)
+    assert not result["errors"]
+    assert sorted(result["urls"]) == list(
+        x.format(baseurl)
+        for x in ("{0:s}/asdf/", "{0:s}/download.tar.gz", "{0:s}/foo/")
+    )
+
+
+def test_crawl_workers_state_dir(baseurl, tmpdir):
+    with pytest.raises(ValueError):
+        crawl(baseurl, workers=2, state_dir=str(tmpdir))
+
+
+def test_predict_content_type():
+    assert predict_content_type("http://localhost/download.tar.gz") == "application/x-tar"
+    assert predict_content_type("http://localhost/index.html") == "text/html"
+    assert predict_content_type("http://localhost/index.php") is None
+    assert predict_content_type("http://localhost/foo/") is None
+
+
 def test_crawl_allowed_urls(baseurl):
     result = crawl(
         urljoin(baseurl, "external"),
@@ -64,6 +168,13 @@ def test_crawl_whitelist(baseurl):
     assert not result["errors"]
 
 
+def test_crawl_whitelist_only(baseurl):
+    result = crawl(baseurl, blacklist=[".*"], whitelist=["^.*\/foo\/$"])
+
+    assert urljoin(baseurl, "foo/bar/") in result["urls"]
+    assert not result["errors"]
+
+
 def test_crawl_max_depth(baseurl):
     result = crawl(baseurl, max_depth=1)
     assert not result["errors"]
@@ -73,6 +184,82 @@ def test_crawl_max_depth(baseurl):
     )
 
 
+def test_crawl_max_depth_links(baseurl, expected_links, capsys):
+    result = crawl(baseurl, max_depth=2, verbose=True)
+    assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
+    assert sorted(result["urls"]) == expected_links
+
+    out, err = capsys.readouterr()
+    assert "  (D): {0:s}\n".format(urljoin(baseurl, "foo/bar/")) in err
+
+
+def test_crawl_max_pages(baseurl):
+    result = crawl(baseurl, max_pages=2)
+    assert not result["errors"]
+    assert urljoin(baseurl, "foo/bar/") in result["urls"]
+
+
+def test_crawl_max_size(baseurl):
+    result = crawl(baseurl, max_size=100)
+    assert not result["errors"]
+    assert not result["urls"]
+
+
+@pytest.mark.parametrize("dedup,expected", [
+    (None, ("1", "2", "3", "4")),
+    ("exact", ("1", "3", "4")),
+    ("near", ("1",)),
+])
+def test_crawl_dedup(baseurl, dedup, expected):
+    result = crawl(urljoin(baseurl, "mirrors"), dedup=dedup)
+    assert not result["errors"]
+    assert sorted(url for url in result["urls"] if "child" in url) == [
+        urljoin(baseurl, "child/{0:s}".format(n)) for n in expected
+    ]
+
+
+def test_crawl_dedup_expand(baseurl, capsys):
+    result = crawl(urljoin(baseurl, "mirrors"), dedup="near", expand_duplicates=True, verbose=True)
+    assert len([url for url in result["urls"] if "child" in url]) == 4
+
+    out, err = capsys.readouterr()
+    assert "  (U): {0:s} exact duplicate of {1:s}\n".format(
+        urljoin(baseurl, "mirror/2"), urljoin(baseurl, "mirror/1")
+    ) in err
+    assert "  (U): {0:s} near duplicate of {1:s}\n".format(
+        urljoin(baseurl, "variant/3"), urljoin(baseurl, "mirror/1")
+    ) in err
+
+
+class Response(dict):
+
+    status, reason = 200, "OK"
+
+
+def test_crawl_priority(baseurl, monkeypatch, tmpdir):
+    patterns = [re.escape(urljoin(baseurl, "asdf/x"))]
+
+    result = crawl(baseurl, max_pages=2, patterns=patterns)
+    assert not result["errors"]
+
+    result = crawl(baseurl, max_pages=2, patterns=patterns, priority=True)
+    assert result["errors"] == [(404, urljoin(baseurl, "asdf/"))]
+
+    # /mx is found at the depth limit via /m2 before it is found via /q
+    graph = {"/": ["/m1", "/q"], "/m1": ["/m2"], "/m2": ["/mx"], "/q": ["/mx"], "/mx": ["/mxy"]}
+
+    def fetch_links(url, *args):
+        return url, Response({"content-type": "text/html"}), ["http://h" + x for x in graph.get(url.utf8()[8:], [])]
+
+    monkeypatch.setattr(crawler, "fetch_links", fetch_links)
+
+    for priority, state_dir in ((False, None), (True, None), (True, str(tmpdir.join("state")))):
+        result = crawl(
+            "http://h/", patterns=[r"http://h/m.*"], max_depth=3, priority=priority, state_dir=state_dir, use_head=False
+        )
+        assert sorted(result["urls"]) == ["http://h/m1", "http://h/m2", "http://h/mx", "http://h/mxy"]
+
+
 def test_crawl_patterns(baseurl):
     result = crawl(baseurl, patterns=["^.*\/foo\/$"])
     assert set(result["errors"]) == set([(404, urljoin(baseurl, "asdf/"))])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+from random import Random
+
+from spyda.dedup import distance, get_stats, reset_stats, simhash, Duplicates, Fingerprint, SimhashIndex
+
+
+def words(n, seed=0):
+    random = Random(seed)
+    return ["w{0:d}".format(random.randrange(5000)) for i in range(n)]
+
+
+def test_fingerprint_exact():
+    a = Fingerprint("<p>Hello <b>World</b></p><script>var x;</script>")
+    b = Fingerprint(u"hello\nworld")
+
+    assert a.digest == b.digest
+    assert a.simhash is None
+    assert Fingerprint("<p></p>").empty
+
+
+def test_simhash():
+    page = words(500)
+    edited = list(page)
+    edited[100] = edited[400] = "edited"
+
+    assert distance(simhash(page), simhash(edited)) <= 4
+    assert distance(simhash(page), simhash(words(500, seed=1))) > 16
+
+
+def test_simhash_index():
+    index = SimhashIndex(distance=3)
+    index.add(0xff00ff00ff00ff00, "a")
+
+    assert index.find(0xff00ff00ff00ff00 ^ 0x8000000000000003) == "a"
+    assert index.find(0xff00ff00ff00ff00 ^ 0x8000000000000007) is None
+
+
+def test_duplicates():
+    reset_stats()
+
+    page = " ".join(words(200))
+    duplicates = Duplicates()
+
+    assert duplicates.check("a", Fingerprint(page, near=True)) is None
+    assert duplicates.check("b", Fingerprint("<b>" + page, near=True)) == ("exact", "a")
+    assert duplicates.check("c", Fingerprint(page + " more", near=True)) == ("near", "a")
+    assert duplicates.check("d", Fingerprint(" ".join(words(200, seed=1)), near=True)) is None
+
+    assert get_stats() == {"pages": 4, "exact": 1, "near": 1}
+    reset_stats()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+import pytest
+
+from url import parse as parse_url
+
+from spyda.frontier import Frontier, TokenBucket
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(request):
+    return Clock()
+
+
+def urls(*urls):
+    return [parse_url(url) for url in urls]
+
+
+def pop_all(frontier):
+    result = []
+    entry = frontier.pop()
+    while entry is not None:
+        result.append(entry[0].utf8())
+        entry = frontier.pop()
+    return result
+
+
+def test_token_bucket(clock):
+    bucket = TokenBucket(2, burst=2, clock=clock)
+
+    assert bucket.delay() == 0
+    bucket.take()
+    assert bucket.delay() == 0
+    bucket.take()
+    assert bucket.delay() == 0.5
+
+    clock.now = 0.5
+    assert bucket.delay() == 0
+
+
+def test_frontier_round_robin():
+    frontier = Frontier()
+    for url in urls("http://a/1", "http://a/2", "http://a/3", "http://b/1", "http://c/1"):
+        frontier.push(url)
+
+    assert len(frontier) == 5
+    assert pop_all(frontier) == ["http://a/1", "http://b/1", "http://c/1", "http://a/2", "http://a/3"]
+    assert not frontier
+
+
+def test_frontier_max_per_host():
+    frontier = Frontier(max_per_host=1)
+    a1, a2, b1 = urls("http://a/1", "http://a/2", "http://b/1")
+    for url in (a1, a2, b1):
+        frontier.push(url)
+
+    assert pop_all(frontier) == ["http://a/1", "http://b/1"]
+    assert frontier.delay() is None
+
+    frontier.done(a1)
+    assert frontier.delay() == 0
+    assert pop_all(frontier) == ["http://a/2"]
+
+
+def test_frontier_rate(clock):
+    frontier = Frontier(rate=1, clock=clock)
+    for url in urls("http://a/1", "http://a/2", "http://b/1"):
+        frontier.push(url)
+
+    assert pop_all(frontier) == ["http://a/1", "http://b/1"]
+    assert frontier.delay() == 1.0
+
+    clock.now = 1.0
+    assert pop_all(frontier) == ["http://a/2"]
+
+
+def test_frontier_hosts_ports():
+    frontier = Frontier(max_per_host=1)
+    for url in urls("http://a:8000/", "http://a:8001/"):
+        frontier.push(url)
+
+    assert pop_all(frontier) == ["http://a:8000/", "http://a:8001/"]
+
+
+def test_frontier_depth():
+    frontier = Frontier()
+    a1, a2 = urls("http://a/1", "http://a/2")
+    frontier.push(a1)
+    frontier.push(a2, 3)
+
+    assert frontier.pop() == (a1, 0)
+    assert frontier.pop() == (a2, 3)
+
+
+def test_frontier_score():
+    frontier = Frontier(score=lambda url, depth: -len(url.utf8()) + depth)
+    for url in urls("http://a/1", "http://a/333", "http://a/22", "http://b/4444"):
+        frontier.push(url)
+
+    assert pop_all(frontier) == ["http://b/4444", "http://a/333", "http://a/22", "http://a/1"]
+    assert not frontier.hosts
+
+
+def test_frontier_score_ready_hosts():
+    frontier = Frontier(max_per_host=1, score=lambda url, depth: depth)
+    a1, a2, b1 = urls("http://a/1", "http://a/2", "http://b/1")
+    frontier.push(a1, 0)
+    frontier.push(a2, 0)
+    frontier.push(b1, 5)
+
+    assert pop_all(frontier) == ["http://a/1", "http://b/1"]
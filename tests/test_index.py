@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import pytest
+
+import pickle
+from random import Random
+
+from spyda.utils import get_close_matches
+from spyda.index import get_threshold, ngrams, read_index, write_index, NGramIndex
+
+
+def strings(random, n, alphabet="abcdef "):
+    return ["".join(random.choice(alphabet) for i in range(random.randint(0, 12))) for j in range(n)]
+
+
+def test_ngrams():
+    assert ngrams("abcd") == ["abc", "bcd"]
+    assert ngrams("abcd", 2) == ["ab", "bc", "cd"]
+    assert ngrams("ab") == []
+
+
+def test_get_threshold():
+    assert get_threshold(10, 10, 1.0) == 8
+    assert get_threshold(10, 5, 0.8) is None
+    assert get_threshold(0, 0, 0.5) == 0
+    assert get_threshold(3, 4, 0.5) <= 0
+
+
+@pytest.mark.parametrize("cutoff", [0.0, 0.5, 0.6, 0.85, 1.0])
+@pytest.mark.parametrize("size", [2, 3])
+def test_get_close_matches(cutoff, size):
+    random = Random(size)
+    possibilities = strings(random, 200)
+    index = NGramIndex(possibilities, size)
+
+    assert len(index) == 200
+    assert list(index) == possibilities
+
+    for word in possibilities[:20] + strings(random, 20):
+        assert get_close_matches(word, index, n=200, cutoff=cutoff) == get_close_matches(word, possibilities, n=200, cutoff=cutoff)
+
+
+def test_candidates():
+    index = NGramIndex(["Barack Obama", "Michelle Obama", "Barack Obamma", "Joe Biden"])
+
+    assert index.candidates("Barack Obama", 0.85) == ["Barack Obama", "Barack Obamma"]
+    assert index.candidates("Barack Obama", 0.0) == list(index)
+
+
+def test_write_read_index(tmpdir):
+    random = Random(0)
+    possibilities = strings(random, 200, u"abc\xe9\u4e2d ")
+    datasets = [dict((x, {"uri": i}) for i, x in enumerate(possibilities)), {u"Joe Biden": u"biden"}]
+
+    filename = str(tmpdir.join("test.index"))
+    write_index(filename, datasets, source="test")
+
+    meta, mapped = read_index(filename)
+    assert meta == {"source": "test", "size": 3}
+    assert len(mapped) == 2
+
+    (values, index), (other, _) = mapped
+    assert list(index) == sorted(datasets[0])
+    assert all(values[x] == datasets[0][x] for x in possibilities)
+    assert u"Joe Biden" in other and u"Joe" not in other
+    with pytest.raises(KeyError):
+        other[u"Joe"]
+
+    expected = NGramIndex(datasets[0])
+    for word in possibilities[:20]:
+        assert get_close_matches(word, index, n=200) == get_close_matches(word, expected, n=200)
+
+    values, index = pickle.loads(pickle.dumps((values, index)))
+    assert values[possibilities[0]] == datasets[0][possibilities[0]]
+    assert list(index) == sorted(datasets[0])
+
+
+def test_read_index_invalid(tmpdir):
+    filename = tmpdir.join("test.index")
+    filename.write("foo")
+
+    with pytest.raises(ValueError):
+        read_index(str(filename))
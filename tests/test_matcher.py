@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import json
+
+from optparse import Values
+
+import pytest
+
+from spyda.index import MappedNGramIndex
+from spyda.memo import configure as configure_memo, SIZE
+from spyda.matcher import init_worker, job, load_datasets
+from spyda.vectors import VectorIndex
+
+from .helpers import urljoin
+
+
+RECORDS = [
+    {"first_name": "Barack", "last_name": "Obama", "uri": "http://example.com/obama"},
+    {"first_name": "Joe", "last_name": "Biden", "uri": "http://example.com/biden"},
+]
+
+
+def options(**kwargs):
+    defaults = {
+        "index": None, "build_index": False, "match_keys": [("first_name", "last_name")], "uri_key": "uri",
+        "cutoff": 0.85, "scorer": "ratio", "source_key": "entities", "output_key": "entities", "verbose": False
+    }
+    defaults.update(kwargs)
+    return Values(defaults)
+
+
+def test_load_datasets(tmpdir):
+    source = tmpdir.join("data.json")
+    source.write(json.dumps(RECORDS))
+
+    [(name, dataset, index)] = load_datasets(options(), str(source))
+    assert dataset == {"Barack Obama": "http://example.com/obama", "Joe Biden": "http://example.com/biden"}
+    assert sorted(index) == sorted(dataset)
+
+
+def test_load_datasets_url(baseurl):
+    [(name, dataset, index)] = load_datasets(options(), urljoin(baseurl, "records"))
+    assert dataset == {u"Jos\xe9 Mart\xed": "http://example.com/marti"}
+
+
+def test_load_datasets_index(tmpdir):
+    source = tmpdir.join("data.json")
+    source.write(json.dumps(RECORDS))
+    filename = tmpdir.join("data.index")
+
+    [(name, values, index)] = load_datasets(options(index=str(filename)), str(source))
+    assert isinstance(index, MappedNGramIndex)
+    assert values["Joe Biden"] == "http://example.com/biden"
+
+    mtime = filename.mtime()
+    assert load_datasets(options(index=str(filename)), str(source))[0][0] == name
+    assert filename.mtime() == mtime
+
+    source.write(json.dumps(RECORDS[:1]))
+    source.setmtime(source.mtime() + 10)
+
+    [(other, values, index)] = load_datasets(options(index=str(filename)), str(source))
+    assert list(index) == ["Barack Obama"]
+    assert other != name
+
+    [(other, values, index)] = load_datasets(options(index=str(filename), match_keys=[("last_name", "first_name")]), str(source))
+    assert list(index) == ["Obama Barack"]
+
+
+def test_job(tmpdir):
+    source = tmpdir.join("data.json")
+    source.write(json.dumps(RECORDS))
+
+    configure_memo(memo_size=SIZE, memo_file=None)
+    init_worker(load_datasets(options(), str(source)))
+
+    document = tmpdir.join("document.json")
+    for i in range(2):
+        document.write(json.dumps({"entities": ["Barak Obama", "Nobody", "Barak Obama"]}))
+        assert job(options(), str(document)) == (True, str(document), {"hits": 2 * i, "misses": 2 - 2 * i})
+
+    assert json.loads(document.read())["entities"] == [
+        {"name": "Barack Obama", "score": 22 / 23.0, "uri": "http://example.com/obama"}
+    ] * 2
+
+
+def test_job_vector(tmpdir):
+    pytest.importorskip("numpy")
+
+    source = tmpdir.join("data.json")
+    source.write(json.dumps(RECORDS))
+
+    configure_memo(memo_size=SIZE, memo_file=None)
+    init_worker([(name, dataset, VectorIndex(index)) for name, dataset, index in load_datasets(options(), str(source))])
+
+    document = tmpdir.join("document.json")
+    document.write(json.dumps({"entities": ["Barak Obama", "Nobody", "Joe Bidem"]}))
+    assert job(options(scorer="vector", cutoff=0.5), str(document)) == (True, str(document), {"hits": 0, "misses": 3})
+
+    assert [entity["uri"] for entity in json.loads(document.read())["entities"]] == [
+        "http://example.com/obama", "http://example.com/biden"
+    ]
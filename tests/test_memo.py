@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+from spyda.memo import configure, get_memo, get_stats, reset_stats, Memo, MISSING
+
+
+def test_memo():
+    reset_stats()
+
+    memo = Memo(size=10)
+    key = (u"Barak Obama", 0.85, "data:0")
+
+    assert memo.get(key, MISSING) is MISSING
+    memo.put(key, (u"Barack Obama", 0.95, u"http://example.com/obama"))
+    memo.put((u"Nobody", 0.85, "data:0"), None)
+
+    assert memo.get(key) == (u"Barack Obama", 0.95, u"http://example.com/obama")
+    assert memo.get((u"Nobody", 0.85, "data:0"), MISSING) is None
+    assert memo.get((u"Nobody", 0.6, "data:0"), MISSING) is MISSING
+
+    stats = get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+
+
+def test_memo_disabled():
+    memo = Memo(size=0)
+    memo.put("key", None)
+
+    assert memo.get("key", MISSING) is MISSING
+
+
+def test_memo_file(tmpdir):
+    filename = str(tmpdir.join("memo.db"))
+    key = (u"Barak Obama", 0.85, "data:0")
+
+    memo = Memo(filename=filename)
+    memo.put(key, (u"Barack Obama", 0.95, u"http://example.com/obama"))
+    memo.put((u"Nobody", 0.85, "data:0"), None)
+    memo.flush()
+
+    other = Memo(size=0, filename=filename)
+    assert other.get(key) == (u"Barack Obama", 0.95, u"http://example.com/obama")
+    assert other.get((u"Nobody", 0.85, "data:0"), MISSING) is None
+
+    memo.close()
+    other.close()
+
+
+def test_configure(tmpdir):
+    filename = str(tmpdir.join("memo.db"))
+
+    configure(memo_file=filename)
+    try:
+        memo = get_memo()
+        assert memo is get_memo()
+        assert memo.db is not None
+    finally:
+        configure(memo_file=None)
+
+    assert get_memo() is not memo
+    assert get_memo().db is None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+from json import loads
+
+from spyda import metrics
+from spyda.crawler import crawl
+from spyda.metrics import Histogram, BUCKETS
+
+
+def test_histogram():
+    histogram = Histogram()
+    for seconds in (0.00005, 0.001, 0.002, 60):
+        histogram.observe(seconds)
+
+    cumulative = dict(histogram.cumulative())
+    assert cumulative[0.0001] == 1
+    assert cumulative[0.001] == 2
+    assert cumulative[0.0025] == 3
+    assert cumulative[BUCKETS[-1]] == 3
+    assert cumulative[float("inf")] == 4
+    assert histogram.count == 4
+
+    other = Histogram()
+    other.merge(histogram.to_dict())
+    assert other.cumulative() == histogram.cumulative()
+    assert other.sum == histogram.sum
+
+
+def test_to_prometheus():
+    metrics.reset_stats()
+    metrics.observe("fetch", 0.003)
+    metrics.count("pages")
+
+    text = metrics.to_prometheus(metrics.snapshot())
+    lines = text.splitlines()
+
+    assert "spyda_pages_total 1" in lines
+    assert "spyda_phase_seconds_bucket{phase=\"fetch\",le=\"0.0025\"} 0" in lines
+    assert "spyda_phase_seconds_bucket{phase=\"fetch\",le=\"0.005\"} 1" in lines
+    assert "spyda_phase_seconds_bucket{phase=\"fetch\",le=\"+Inf\"} 1" in lines
+    assert "spyda_phase_seconds_count{phase=\"fetch\"} 1" in lines
+    assert "spyda_phase_seconds_count{phase=\"head\"} 0" in lines
+
+    metrics.reset_stats()
+
+
+def test_crawl_metrics(baseurl, tmpdir):
+    filename = str(tmpdir.join("metrics.json"))
+
+    metrics.reset_stats()
+    metrics.configure(filename, "json", 60)
+    try:
+        assert metrics.enabled()
+        crawl(baseurl)
+    finally:
+        metrics.configure(None)
+
+    assert not metrics.enabled()
+
+    data = loads(open(filename).read())
+    assert data["counters"]["pages"] == 4
+    assert data["counters"]["errors"] == 1
+    assert data["counters"]["urls"] == 4
+    assert data["counters"]["sessions_requests"] > 0
+
+    for phase in ("fetch", "parse", "normalize", "match", "head"):
+        histogram = data["histograms"][phase]
+        assert histogram["count"] > 0
+        assert histogram["buckets"][-1] == ["+Inf", histogram["count"]]
+
+    metrics.reset_stats()
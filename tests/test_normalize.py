@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+import pytest
+
+from url import parse as parse_url
+
+from spyda.normalize import get_stats, reset_stats, Normalizer
+
+
+BASE = "http://example.com/foo/bar.html"
+
+BASES = [
+    BASE,
+    "http://example.com/foo/qux.html?a=1",
+    "http://example.com/foo/",
+    "http://example.com",
+    "https://example.com/foo/bar.html",
+    "http://other.com:8080/foo/bar.html",
+]
+
+HREFS = [
+    "baz.html",
+    "./baz.html",
+    "../../baz.html",
+    "//cdn.example.com/x.js",
+    "",
+    "../qux/#top",
+    "/index.html?b=2&a=1",
+    "http://Other.com",
+    "HTTP://other.com:80/a/../b#x",
+    "mailto:foo@bar.com",
+    "?page=2",
+    "#top",
+]
+
+
+@pytest.mark.parametrize("href", HREFS)
+def test_normalize(href):
+    base = parse_url(BASE)
+    expected = base.relative(href).defrag().canonical().utf8()
+
+    normalizer = Normalizer()
+    url, _url = normalizer.normalize(base, href)
+    assert _url == expected
+    assert url.utf8() == expected
+
+    assert normalizer.normalize(parse_url(BASE), href)[1] == expected
+    assert normalizer.cache.hits == 1
+
+
+def test_normalize_shared():
+    normalizer = Normalizer()
+
+    for i in range(2):
+        for base in BASES:
+            base = parse_url(base)
+            for href in HREFS:
+                expected = base.relative(href).defrag().canonical().utf8()
+                assert normalizer.normalize(base, href)[1] == expected
+
+    assert normalizer.cache.hits > normalizer.cache.misses
+
+
+def test_normalize_absolute():
+    normalizer = Normalizer()
+
+    normalizer.normalize(parse_url("http://example.com/a/"), "http://other.com/")
+    normalizer.normalize(parse_url("http://example.com/b/"), "http://other.com/")
+    normalizer.normalize(parse_url("http://example.com/b/"), "c/")
+    normalizer.normalize(parse_url("http://example.com/a/"), "c/")
+
+    assert (normalizer.cache.hits, normalizer.cache.misses) == (1, 3)
+
+
+def test_normalize_disabled():
+    normalizer = Normalizer(0)
+    base = parse_url(BASE)
+
+    assert normalizer.normalize(base, "baz.html") == normalizer.normalize(base, "baz.html")
+    assert len(normalizer.cache) == 0
+
+
+def test_stats():
+    reset_stats()
+
+    normalizer = Normalizer()
+    base = parse_url(BASE)
+    for i in range(4):
+        normalizer.normalize(base, "baz.html")
+    normalizer.close()
+
+    stats = get_stats()
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
+
+    reset_stats()
+    assert get_stats()["hit_rate"] == 0.0
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import re
+
+import pytest
+
+from url import parse as parse_url
+
+from spyda.rules import literal_prefix, PrefixTrie, Rules, Scorer
+
+
+@pytest.mark.parametrize("regex,prefix", [
+    ("http://example.com/", "http://example"),
+    (r"^http://example\.com/.*", "http://example.com/"),
+    (r"https?://example\.com/", "http"),
+    ("http://a+b", "http://a"),
+    ("http://ab{2}", "http://a"),
+    (r"\d+", ""),
+    ("a|b", ""),
+    ("(?i)http://", ""),
+    ("[ab]c", ""),
+    (r".*\.pdf$", ""),
+])
+def test_literal_prefix(regex, prefix):
+    assert literal_prefix(regex) == prefix
+
+
+def test_prefix_trie():
+    trie = PrefixTrie(["http://a", "http://ab", "https://"])
+
+    assert trie.match("http://a")
+    assert trie.match("http://abc")
+    assert trie.match("https://b")
+    assert not trie.match("http://")
+    assert not trie.match("http://b")
+    assert not trie.match("ftp://a")
+
+
+def test_rules_empty():
+    rules = Rules()
+
+    assert rules.match("http://example.com/") == (True, False, False)
+
+
+@pytest.mark.parametrize("url", [
+    "http://example.com/",
+    "http://example.com/private/",
+    "http://example.com/private/public/index.html",
+    "http://example.com/index.html",
+    "http://example.com/foo.pdf",
+    "http://other.com/private/",
+    "https://example.com/",
+])
+@pytest.mark.parametrize("lists", [
+    ([r".*\.html$"], [r"http://example\.com/private/"], [r"http://example\.com/private/public/"]),
+    ([r"http://example\.com/"], [".*"], [r"https?://example\.com/$"]),
+    (None, [r"http://(example|other)\.com/private"], None),
+    ([r"http://example\.com/.*\.(html|pdf)$"], None, None),
+    (None, [r"(.)\1"], [r"http://(?P<host>[^/]+)/(?P=host)"]),
+])
+def test_rules(lists, url):
+    patterns, blacklist, whitelist = [[re.compile(regex) for regex in regexes or ()] for regexes in lists]
+
+    expected = (
+        not patterns or any(regex.match(url) for regex in patterns),
+        any(regex.match(url) is not None for regex in blacklist),
+        any(regex.match(url) is not None for regex in whitelist),
+    )
+
+    assert Rules(*lists).match(url) == expected
+
+
+def test_rules_backreference():
+    rules = Rules(None, [r"http://(a)\1"], None)
+
+    assert rules.combined is None
+    assert rules.match("http://aa") == (True, True, False)
+    assert rules.match("http://ab") == (True, False, False)
+
+
+def test_rules_many_groups():
+    rules = Rules(None, [r"http://(a{0:d})/".format(i) for i in range(200)], None)
+
+    assert rules.match("http://a150/") == (True, True, False)
+    assert rules.match("http://b150/") == (True, False, False)
+
+
+def test_scorer():
+    scorer = Scorer([r"http://a/docs/.*\.pdf$"], parse_url("http://a/"))
+
+    pdf, docs, other, offsite = [
+        scorer(parse_url(url), 1)
+        for url in ("http://a/docs/x.pdf", "http://a/docs/", "http://a/news/", "http://b/docs/")
+    ]
+
+    assert pdf < docs < other < offsite
+    assert scorer(parse_url("http://a/news/"), 2) > other
+
+
+def test_scorer_no_patterns():
+    scorer = Scorer(None, parse_url("http://a/"))
+
+    assert scorer(parse_url("http://a/x"), 1) == 1.0
+    assert scorer(parse_url("http://b/x"), 1) == 2.0
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+from spyda.sessions import configure, get_session, get_stats, reset_stats
+from spyda.utils import fetch_url
+
+from .helpers import urljoin
+
+
+def test_session_shared():
+    assert get_session() is get_session()
+
+
+def test_session_reuse(baseurl):
+    configure()
+    reset_stats()
+
+    for i in range(3):
+        res, data = fetch_url(urljoin(baseurl, "hello"))
+        assert res.status == 200
+
+    stats = get_stats()
+    assert stats["requests"] == 3
+    assert stats["connections"] == 1
+    assert stats["reused"] == 2
+
+
+def test_session_no_keep_alive(baseurl):
+    configure(keep_alive=False)
+    reset_stats()
+
+    try:
+        assert get_session().headers["Connection"] == "close"
+
+        for i in range(2):
+            res, data = fetch_url(urljoin(baseurl, "hello"))
+            assert res.status == 200
+
+        stats = get_stats()
+        assert stats["requests"] == 2
+        assert stats["connections"] == 2
+        assert stats["reused"] == 0
+    finally:
+        configure(keep_alive=True)
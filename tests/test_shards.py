@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+from url import parse as parse_url
+
+from spyda.crawler import crawl
+from spyda.shards import get_shard
+
+
+from .helpers import urljoin
+
+
+def test_get_shard():
+    a = parse_url("http://example.com/a")
+    b = parse_url("http://example.com/b?c=d")
+
+    assert get_shard(a, 4) == get_shard(b, 4)
+    assert set(get_shard(parse_url("http://{0:d}.example.com/".format(i)), 4) for i in range(32)) == set(range(4))
+
+
+def test_crawl_workers_hosts(baseurl):
+    url = urljoin(baseurl, "hosts")
+    other = url.replace("127.0.0.1", "localhost")
+
+    workers = [
+        n for n in range(2, 10)
+        if get_shard(parse_url(url), n) != get_shard(parse_url(other), n)
+    ][0]
+
+    expected = crawl(url)
+    result = crawl(url, workers=workers)
+
+    assert sorted(result["urls"]) == sorted(expected["urls"])
+    assert sorted(result["errors"]) == sorted(expected["errors"])
+    assert any(u.startswith("http://localhost") for u in result["urls"])
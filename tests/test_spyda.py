@@ -2,7 +2,10 @@
 
 import pytest
 
+from spyda import links
 from spyda.utils import fetch_url, get_links
+from spyda.links import BACKENDS, LinkParser
+from spyda.sessions import get_stats, reset_stats
 
 
 from .helpers import urljoin
@@ -58,6 +61,106 @@ def test_fetch_url_unicode(baseurl):
     assert data == u"Hello World!"
 
 
-def test_get_links(sample_content, sample_links):
-    actual_links = list(get_links(sample_content))
+def test_fetch_url_content_types(baseurl):
+    res, data = fetch_url(urljoin(baseurl, "unicode"), content_types=["text/html"])
+    assert res.status == 200
+    assert data is None
+
+
+def test_fetch_url_max_size(baseurl):
+    reset_stats()
+
+    res, data = fetch_url(urljoin(baseurl, "big"), max_size=1024)
+    assert res.status == 200
+    assert data is None
+
+    res, data = fetch_url(urljoin(baseurl, "big"), max_size=1 << 20)
+    assert len(data) > 1 << 17
+
+    stats = get_stats()
+    assert stats["aborted"] == 1
+    assert stats["saved"] == len(data)
+    assert stats["received"] == stats["decoded"] == len(data)
+
+
+def test_fetch_url_compressed(baseurl):
+    res, data = fetch_url(urljoin(baseurl, "encodings"))
+    assert "gzip" in data and "deflate" in data
+
+    reset_stats()
+
+    res, data = fetch_url(urljoin(baseurl, "compressed"))
+    assert data == "Hello World!" * 100
+
+    stats = get_stats()
+    assert stats["decoded"] == len(data)
+    assert 0 < stats["received"] < stats["decoded"]
+
+
+def test_fetch_url_parser(baseurl):
+    parser = LinkParser()
+    res, data = fetch_url(urljoin(baseurl, "big"), parser=parser)
+    assert parser.close() == ["foo/"]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_get_links(sample_content, sample_links, backend):
+    actual_links = list(get_links(sample_content, backend=backend))
     assert actual_links == sample_links
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_get_links_empty(backend):
+    assert list(get_links("", backend=backend)) == []
+
+
+def test_get_links_fallback(monkeypatch):
+    def fromstring(html, parser=None):
+        raise ValueError("broken")
+
+    monkeypatch.setattr(links, "lxml_fromstring", fromstring)
+
+    assert list(get_links("<a href=\"foo/\">", backend="lxml")) == ["foo/"]
+
+
+def test_get_links_stream():
+    html = "<!-- <a href=\"no/\"> --><script>\"<a href='no/'>\"</script><A title=\"a>b\" HREF='a&amp;b'>"
+    assert list(get_links(html, backend="stream")) == ["a&b"]
+
+    # Non-ascii bytes are decoded as UTF-8 or fall back to BeautifulSoup
+    assert list(get_links("<a href=\"caf\xc3\xa9&amp;\">", backend="stream")) == [u"caf\xe9&"]
+    assert list(get_links("<a href=\"caf\xe9&amp;\">", backend="stream")) == [u"caf\xe9&"]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_get_links_non_ascii(backend):
+    assert list(get_links("<a href=\"/caf\xc3\xa9/\">caf\xc3\xa9</a>", backend=backend)) == [u"/caf\xe9/"]
+    assert list(get_links(u"<a href=\"/caf\xe9/\">caf\xe9</a>", backend=backend)) == [u"/caf\xe9/"]
+
+
+def test_link_parser(sample_content, sample_links):
+    parser = LinkParser()
+    parser.start("utf-8")
+    for i in range(0, len(sample_content), 7):
+        parser.feed(sample_content[i:i + 7])
+    assert parser.close() == sample_links
+
+
+def test_link_parser_non_ascii():
+    parser = LinkParser()
+    parser.start("utf-8")
+    parser.feed("<a href=\"/caf\xc3\xa9/\">")
+    assert parser.close() == [u"/caf\xe9/"]
+
+    # Without a charset the page is left to get_links()
+    parser = LinkParser()
+    parser.start(None)
+    parser.feed("<a href=\"/caf\xc3\xa9/\">")
+    assert parser.close() is None
+
+
+def test_link_parser_unknown_charset():
+    parser = LinkParser()
+    parser.start("x-unknown")
+    parser.feed("<a href=\"foo/\">")
+    assert parser.close() is None
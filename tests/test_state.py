@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from url import parse as parse_url
+
+from spyda.state import State
+
+
+def test_state_new(tmpdir):
+    state = State(str(tmpdir.join("state")))
+    assert state.new
+    assert state.fetched == 0
+    state.close()
+
+
+def test_state_resume(tmpdir):
+    path = str(tmpdir)
+
+    state = State(path)
+    for url in ("http://a/1", "http://a/2", "http://b/1"):
+        state.frontier.push(parse_url(url))
+
+    state.visited.add("http://a/")
+    state.seen.add("http://a/1")
+    state.seen.add("http://a/1")
+    state.urls.append("http://a/1")
+    state.errors.append((404, "http://a/x"))
+
+    done, depth = state.frontier.pop()
+    state.frontier.done(done)
+    state.frontier.pop()  # in flight when interrupted
+    state.fetched = 2
+    state.close()
+
+    state = State(path)
+    assert not state.new
+    assert state.fetched == 2
+    assert len(state.frontier) == 2
+    assert "http://a/" in state.visited
+    assert "http://a/1" in state.seen
+    assert len(state.seen) == 1
+    assert list(state.urls) == ["http://a/1"]
+    assert list(state.errors) == [(404, "http://a/x")]
+
+    urls = []
+    entry = state.frontier.pop()
+    while entry is not None:
+        urls.append(entry[0].utf8())
+        entry = state.frontier.pop()
+
+    assert sorted(urls) == ["http://a/2", "http://b/1"]
+    state.close()
+
+
+def test_state_uncommitted(tmpdir):
+    path = str(tmpdir)
+
+    state = State(path)
+    state.frontier.push(parse_url("http://a/1"))
+    state.checkpoint()
+    state.frontier.push(parse_url("http://a/2"))
+    state.db.close()
+
+    state = State(path)
+    assert len(state.frontier) == 1
+    state.close()
+
+
+def test_state_depth_score(tmpdir):
+    path = str(tmpdir)
+
+    state = State(path, score=lambda url, depth: -depth)
+    for depth, url in enumerate(("http://a/1", "http://a/2", "http://a/3")):
+        state.frontier.push(parse_url(url), depth)
+    state.close()
+
+    state = State(path, score=lambda url, depth: -depth)
+    url, depth = state.frontier.pop()
+    assert (url.utf8(), depth) == ("http://a/3", 2)
+    state.close()
+
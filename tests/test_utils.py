@@ -2,7 +2,11 @@ from keyword import kwlist
 
 import pytest
 
-from spyda.utils import dict_to_text, get_close_matches, unichar_to_text, unescape, UNICHAR_REPLACEMENTS
+from lxml.html import tostring
+
+from spyda import utils
+from spyda.utils import dict_to_text, doc_to_text, get_charset, get_close_matches, html_to_doc, parse_html
+from spyda.utils import unichar_to_text, unescape, LRUCache, UNICHAR_REPLACEMENTS
 
 
 TEST_ENTITIES = (
@@ -67,3 +71,71 @@ def test_unescape_invalid():
 def test_unichar_to_text(unichar, expected):
     actual = unichar_to_text(unichar)
     assert actual == expected
+
+
+def test_lru_cache():
+    cache = LRUCache(4)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["c"] = 3
+
+    assert cache.get("a") == 1
+    cache["d"] = 4
+
+    assert len(cache) == 3
+    assert "a" in cache and "c" in cache and "d" in cache
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(0)
+    cache["a"] = 1
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+@pytest.mark.parametrize("content_type,expected", [
+    ("text/html; charset=utf-8", "utf-8"),
+    ("text/html; Charset=\"ISO-8859-1\"; foo=bar", "ISO-8859-1"),
+    ("text/html;charset='utf-8'", "utf-8"),
+    ("text/html; charset=x-unknown", None),
+    ("text/html", None),
+    (None, None),
+])
+def test_get_charset(content_type, expected):
+    assert get_charset({"content-type": content_type}) == expected
+
+
+def test_parse_html():
+    html = u"<html><body>\n  <p>caf\xe9</p>  <pre> a\n  <b> </b></pre>\n</body></html>"
+
+    for content, encoding in ((html.encode("latin-1"), "latin-1"), (html.encode("utf-8"), None), (html, None)):
+        doc = parse_html(content, encoding)
+        assert doc.cssselect("p")[0].text == u"caf\xe9"
+        assert tostring(doc) == tostring(html_to_doc(html))
+
+
+def test_parse_html_fallback(monkeypatch):
+    def document_fromstring(html, parser=None):
+        raise ValueError("broken")
+
+    monkeypatch.setattr(utils, "document_fromstring", document_fromstring)
+
+    assert parse_html("<p>caf\xc3\xa9</p>", "utf-8").cssselect("p")[0].text == u"caf\xe9"
+
+
+@pytest.mark.parametrize("html,expected", [
+    ("<p>Hello <b>World</b>!</p>", u"Hello World !"),
+    ("<p><i>a</i><i>b</i></p>", u"a b"),
+    ("<p>a<br>b</p>", u"a b"),
+    ("<p>1 &lt; 2 &amp;&amp; 3 &gt; 2</p>", u"1 < 2 && 3 > 2"),
+    ("<p><a title='x > y'>a</a></p>", u"a"),
+    ("<p>a<script>var b = 1 < 2;</script><style>p {}</style><!-- c -->d</p>", u"ad"),
+    ("<p>&ldquo;caf&eacute;&rdquo;&nbsp;&mdash;&hellip;</p>", u"\"caf\xe9\" -..."),
+])
+def test_doc_to_text(html, expected):
+    doc = parse_html(html)
+    assert doc_to_text(doc) == expected
+    assert doc_to_text(doc.cssselect("p")[0]) == expected
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import pytest
+
+from math import log
+from random import Random
+
+numpy = pytest.importorskip("numpy")
+
+from spyda.vectors import get_ngrams, get_vector_matches, VectorIndex  # NOQA
+
+
+def strings(random, n, alphabet="abcdef "):
+    return ["".join(random.choice(alphabet) for i in range(random.randint(0, 12))) for j in range(n)]
+
+
+def cosine(a, b, index):
+    """Return the cosine similarity of two strings computed naively"""
+
+    unknown = log(1.0 + len(index)) + 1.0
+
+    def vector(s):
+        v = {}
+        for gram in get_ngrams(s, index.size):
+            column = index.vocabulary.get(gram)
+            v[gram] = v.get(gram, 0.0) + (index.idf[column] if column is not None else unknown)
+        norm = sum(x ** 2 for x in v.values()) ** 0.5
+        return dict((gram, x / norm) for gram, x in v.items())
+
+    va, vb = vector(a), vector(b)
+    return sum(x * vb.get(gram, 0.0) for gram, x in va.items())
+
+
+def test_get_ngrams():
+    assert get_ngrams("Ab") == [" ab", "ab "]
+    assert get_ngrams(u"Ab", 2) == [u" a", u"ab", u"b "]
+
+
+@pytest.mark.parametrize("cutoff", [0.0, 0.3, 0.6, 1.0])
+def test_get_vector_matches(cutoff):
+    random = Random(0)
+    possibilities = strings(random, 200)
+    index = VectorIndex(possibilities)
+
+    assert len(index) == 200
+    assert list(index) == possibilities
+
+    words = possibilities[:20] + strings(random, 20)
+    for word, matches in zip(words, get_vector_matches(words, index, n=200, cutoff=cutoff)):
+        expected = [(x, cosine(word, x, index)) for x in possibilities]
+        expected = [(x, score) for x, score in expected if score > 0 and score + 1e-9 >= cutoff]
+
+        assert sorted(x for x, score in matches) == sorted(x for x, score in expected)
+        assert all(abs(score - dict(expected)[x]) < 1e-9 for x, score in matches)
+        assert [score for x, score in matches] == sorted((score for x, score in matches), reverse=True)
+
+
+def test_get_vector_matches_best():
+    index = VectorIndex(["Barack Obama", "Michelle Obama", "Joe Biden"])
+
+    [[(match, score)], [], []] = get_vector_matches(["Barak Obama", "Nobody", ""], index, n=1, cutoff=0.5)
+    assert match == "Barack Obama"
+    assert 0.5 < score < 1.0
+
+    [[(match, score)]] = get_vector_matches(["Joe Biden"], index, cutoff=0.99)
+    assert match == "Joe Biden" and score == pytest.approx(1.0)
+    assert get_vector_matches([], index) == []
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import pytest
+
+from glob import glob
+
+from spyda.crawler import crawl
+from spyda.utils import fetch_url, get_charset
+from spyda.extractor import extract, get_sources
+from spyda.warc import configure, get_stats, get_writer, is_warc, read_records, reset_stats, WARCWriter
+
+
+from .helpers import urljoin
+
+
+class Response(object):
+
+    def __init__(self, headers, status_code=200, reason="OK"):
+        self.headers = headers
+        self.status_code = status_code
+        self.reason = reason
+
+
+@pytest.fixture()
+def warc(request, tmpdir):
+    prefix = str(tmpdir.join("warc", "crawl"))
+
+    configure(warc=prefix)
+    reset_stats()
+
+    def finalizer():
+        configure(warc=None)
+
+    request.addfinalizer(finalizer)
+
+    return prefix
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_write_read(tmpdir, compress):
+    writer = WARCWriter(str(tmpdir.join("test")), compress=compress)
+
+    headers = {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip", "Content-Length": "3"}
+    writer.write("http://example.com/", Response(headers), "Hello World!")
+    writer.write("http://example.com/foo", Response({}, 404, "Not Found"), "")
+    writer.close()
+
+    assert len(writer.filenames) == 1
+    assert writer.filenames[0].endswith(".warc.gz" if compress else ".warc")
+    assert is_warc(writer.filenames[0])
+
+    records = list(read_records(writer.filenames[0]))
+    assert [(record.url, record.status, record.reason) for record in records] == [
+        ("http://example.com/", 200, "OK"),
+        ("http://example.com/foo", 404, "Not Found"),
+    ]
+
+    assert records[0].content == "Hello World!"
+    assert records[0].headers == {"content-type": "text/html; charset=utf-8", "content-length": "12"}
+    assert get_charset(records[0].headers) == "utf-8"
+
+
+def test_rollover(tmpdir):
+    writer = WARCWriter(str(tmpdir.join("test")), size=1, compress=True)
+
+    for i in range(3):
+        writer.write("http://example.com/{0:d}".format(i), Response({}), "x" * i)
+    writer.close()
+
+    assert len(writer.filenames) == 3
+    assert [[record.content for record in read_records(filename)] for filename in writer.filenames] == [
+        [""], ["x"], ["xx"]
+    ]
+
+
+def test_fetch_url(baseurl, warc):
+    url = urljoin(baseurl, "hello")
+
+    response, content = fetch_url(url)
+    assert content == "Hello World!"
+
+    records = list(read_records(get_writer().filenames[0]))
+    assert [(record.url, record.content) for record in records] == [(url, "Hello World!")]
+    assert get_stats() == {"records": 1, "files": 1}
+
+
+def test_crawl_extract(baseurl, warc, tmpdir):
+    result = crawl(baseurl)
+    configure(warc=None)
+
+    filenames = glob("{0:s}-*".format(warc))
+    urls = sorted(record.url for filename in filenames for record in read_records(filename))
+    assert urls == sorted(set(urls))
+    assert baseurl + "/" in urls
+    assert set(urls) - set([baseurl + "/"]) <= set(result["urls"])
+
+    records = list(get_sources(filenames))
+    assert all(record.status == 200 for record in records)
+    assert urljoin(baseurl, "asdf/") not in [record.url for record in records]
+
+    record = [record for record in records if record.url == urljoin(baseurl, "foo/")][0]
+    assert extract(record.url, ["title=title", "links.href=a"], record.content, get_charset(record.headers))["links"] == [".", "..", "bar/"]